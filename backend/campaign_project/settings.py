@@ -37,7 +37,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "onboarding.middleware.AsyncWhiteNoiseMiddleware",  # WhiteNoise, async-capable for ASGI
+    "onboarding.middleware.PrerenderMiddleware",  # serves prerendered /temp/<slug> pages
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -94,6 +95,28 @@ else:
     MEDIA_ROOT = BASE_DIR / "media"
     MEDIA_URL = "/media/"
 
+# Shared cache (GHL custom-field registry and other cross-worker state).
+# Redis when REDIS_URL is set; otherwise the database cache table
+# (python manage.py createcachetable), in development too: the web server and
+# the job worker are separate processes and must see the same mirror versions,
+# OTP state and circuit breakers. Rate-limit counters use Redis when it is the
+# cache and a database table otherwise (see onboarding/counters.py).
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+        }
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -131,6 +154,8 @@ STATICFILES_DIRS = [
 
 # CORS Settings
 CORS_ALLOW_ALL_ORIGINS = True
+# Let cross-origin clients read rate-limit state (onboarding/throttling.py)
+CORS_EXPOSE_HEADERS = ['RateLimit-Limit', 'RateLimit-Remaining', 'RateLimit-Reset', 'Retry-After', 'X-Mirror-Token']
 
 # CSRF Settings
 CSRF_TRUSTED_ORIGINS = [
@@ -161,6 +186,38 @@ else:
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+STORAGES = {
+    # Uploaded media is stored once per distinct content (see onboarding/storage.py)
+    "default": {
+        "BACKEND": "onboarding.storage.ContentAddressedStorage",
+    },
+    # Django 5.1+ ignores STATICFILES_STORAGE; this keeps the storage actually in use
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
+# Uploaded images are normalized before GHL provisioning (see onboarding/images.py):
+# EXIF orientation applied then stripped, capped to these (width, height), re-encoded
+IMAGE_MAX_DIMENSIONS = {
+    'headshot': (1200, 1200),
+    'background_picture': (2400, 1600),
+    'action_shot_1': (1600, 1600),
+    'action_shot_2': (1600, 1600),
+    'action_shot_3': (1600, 1600),
+}
+IMAGE_JPEG_QUALITY = int(os.environ.get('IMAGE_JPEG_QUALITY', '82'))
+# On-demand renditions for the mirror page (see onboarding/renditions.py)
+IMAGE_RENDITION_WIDTHS = [320, 640, 960, 1280, 1920, 2400]  # requested widths are rounded up to one of these
+IMAGE_RENDITION_DEFAULT_WIDTH = 960
+IMAGE_RENDITION_DEFAULT_QUALITY = 75
+IMAGE_RENDITION_QUALITY_RANGE = (30, 90)
+RENDITION_CACHE_DIR = os.environ.get('RENDITION_CACHE_DIR', os.path.join(BASE_DIR, 'rendition_cache'))
+RENDITION_CACHE_MAX_BYTES = int(os.environ.get('RENDITION_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+# Open Graph share cards (see onboarding/share_card.py); Pillow's built-in font is used if these are missing
+SHARE_CARD_FONT = os.environ.get('SHARE_CARD_FONT', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf')
+SHARE_CARD_FONT_BOLD = os.environ.get('SHARE_CARD_FONT_BOLD', '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf')
+
 # GHL (GoHighLevel) API Settings
 GHL_API_TOKEN = os.environ.get('GHL_API_TOKEN', '')  # Agency-level PIT for location creation
 GHL_COMPANY_ID = os.environ.get('GHL_COMPANY_ID', '')
@@ -171,6 +228,37 @@ GHL_OTP_LOCATION_ID = os.environ.get('GHL_OTP_LOCATION_ID', 'DAl4SWtHOBVUw1E9EYP
 GHL_APP_OTP_FIELD_ID = os.environ.get('GHL_APP_OTP_FIELD_ID', '03MbSDQPsw1nvfCjU8At')  # Custom field ID for app_otp
 GHL_CUSTOM_MESSAGE_FIELD_ID = os.environ.get('GHL_CUSTOM_MESSAGE_FIELD_ID', 'kOjq1tdFv7lepGf90pI3')  # Custom field ID for custom_message
 GHL_API_BASE_URL = 'https://services.leadconnectorhq.com'
+# Pooled keep-alive HTTP session for GHL calls (see onboarding/ghl_client.py)
+GHL_HTTP_POOL_CONNECTIONS = int(os.environ.get('GHL_HTTP_POOL_CONNECTIONS', '4'))  # number of host pools to keep
+GHL_HTTP_POOL_MAXSIZE = int(os.environ.get('GHL_HTTP_POOL_MAXSIZE', '10'))  # max open connections per host
+GHL_UPLOAD_MAX_WORKERS = int(os.environ.get('GHL_UPLOAD_MAX_WORKERS', '5'))  # concurrent image uploads per contact
+GHL_HTTP_TIMEOUT = int(os.environ.get('GHL_HTTP_TIMEOUT', '30'))  # default timeout (seconds) when a call doesn't set one
+# Route the OTP and share endpoints to their async views (onboarding/async_views.py).
+# asgi.py turns this on; WSGI deployments keep the sync views.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', '0') == '1'
+# Async GHL client used by the ASGI views (onboarding/ghl_async.py)
+GHL_HTTP2 = os.environ.get('GHL_HTTP2', '1') != '0'  # needs the h2 package
+GHL_ASYNC_MAX_CONNECTIONS = int(os.environ.get('GHL_ASYNC_MAX_CONNECTIONS', '100'))
+GHL_CUSTOM_FIELD_CACHE_TTL = int(os.environ.get('GHL_CUSTOM_FIELD_CACHE_TTL', '3600'))  # seconds
+# Token-bucket rate limiting per GHL location/token, shared across workers through the cache.
+# GHL allows bursts of 100 requests per 10 seconds per location.
+GHL_RATE_LIMIT_CAPACITY = int(os.environ.get('GHL_RATE_LIMIT_CAPACITY', '100'))
+GHL_RATE_LIMIT_REFILL_PER_SECOND = float(os.environ.get('GHL_RATE_LIMIT_REFILL_PER_SECOND', '10'))
+GHL_RATE_LIMIT_DEFAULT_RETRY_AFTER = 10  # seconds, when a 429 has no Retry-After header
+# Priority lanes: 'share' is the fraction of the bucket a lane may drain, 'max_wait' (seconds)
+# is how long a call waits for a token before failing fast
+GHL_RATE_LIMIT_LANES = {
+    'interactive': {'share': 1.0, 'max_wait': 2},  # OTP request/verify
+    'default': {'share': 0.8, 'max_wait': 10},
+    'bulk': {'share': 0.6, 'max_wait': 30},  # provisioning, share fan-out
+}
+# Circuit breakers per GHL endpoint family (contacts, customFields upload, locations, conversations)
+GHL_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('GHL_BREAKER_FAILURE_THRESHOLD', '5'))  # failures within the window to open
+GHL_BREAKER_WINDOW = int(os.environ.get('GHL_BREAKER_WINDOW', '60'))  # seconds
+GHL_BREAKER_COOLDOWN = int(os.environ.get('GHL_BREAKER_COOLDOWN', '30'))  # seconds open before a half-open probe
+# Retry budget: retries may not exceed this fraction of GHL calls per minute (plus a floor)
+GHL_RETRY_BUDGET_RATIO = float(os.environ.get('GHL_RETRY_BUDGET_RATIO', '0.2'))
+GHL_RETRY_BUDGET_MIN = int(os.environ.get('GHL_RETRY_BUDGET_MIN', '10'))
 GHL_DEFAULT_ADMIN_PASSWORD = os.environ.get('GHL_DEFAULT_ADMIN_PASSWORD')
 # Scopes for the new admin user
 GHL_ADMIN_USER_SCOPES = [
@@ -181,5 +269,48 @@ GHL_ADMIN_USER_SCOPES = [
     "socialplanner/account.write", "socialplanner/post.write"
 ]
 BACKUP_OTP_CODE = os.environ.get('BACKUP_OTP_CODE')
+# Local OTP store (see onboarding/otp.py)
+OTP_TTL_SECONDS = int(os.environ.get('OTP_TTL_SECONDS', '600'))
+OTP_MAX_ATTEMPTS = int(os.environ.get('OTP_MAX_ATTEMPTS', '5'))  # wrong codes before a new OTP is required
+OTP_DISPATCH_MAX_ATTEMPTS = 3  # tries to upsert the contact and send the SMS in the background
+# Repeat OTP requests for a phone within this window reuse the in-flight dispatch
+OTP_SINGLE_FLIGHT_SECONDS = int(os.environ.get('OTP_SINGLE_FLIGHT_SECONDS', '30'))
+
+# Sliding-window limits per endpoint (throttle_scope) and identity, see onboarding/throttling.py.
+# Rates are '<count>/<period>' with periods like 'minute', 'hour', 'day' or '10m'; None disables one.
+RATE_LIMITS = {
+    'otp_request': {'ip': '20/hour', 'phone': '5/hour', 'email': '10/hour'},
+    # Each OTP also allows only OTP_MAX_ATTEMPTS wrong codes; this caps guessing across OTPs
+    'otp_verify': {'ip': '60/hour', 'phone': '30/hour'},
+    'share': {'ip': '30/hour', 'phone': '10/hour', 'email': '10/hour'},
+    'submission': {'ip': '10/hour', 'phone': '5/day', 'email': '5/day'},
+}
+# Proxies in front of the app (Railway's edge), so throttles key on the real client IP
+REST_FRAMEWORK = {
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', '1')) if IS_RAILWAY_PROD else None,
+}
+
+# Public address of the campaign pages, for absolute links (og:url, og:image)
+BASE_URL = os.environ.get('BASE_URL', 'https://go.thetrumpet.app')
+
+# Mirror page payloads, cached per slug and version (onboarding/mirror_cache.py)
+MIRROR_CACHE_TTL = int(os.environ.get('MIRROR_CACHE_TTL', '86400'))
+# Lifetime of the signed token issued after a protected page's password is checked
+MIRROR_ACCESS_TOKEN_MAX_AGE = int(os.environ.get('MIRROR_ACCESS_TOKEN_MAX_AGE', '43200'))
+# Static snapshots of public campaign pages (onboarding/prerender.py); point a CDN or nginx here to skip Django
+PRERENDER_ROOT = os.environ.get('PRERENDER_ROOT', str(BASE_DIR / 'prerendered'))
+
+# Per-process index of taken slugs behind /api/slugs/check/ (onboarding/slug_index.py)
+SLUG_INDEX_REFRESH_SECONDS = 5  # pick up slugs taken by other workers
+SLUG_INDEX_REBUILD_SECONDS = 3600  # full reload, also drops slugs deleted elsewhere
+SLUG_INDEX_CAPACITY = 100_000  # Bloom filter size; grows automatically past this
+SLUG_INDEX_ERROR_RATE = 0.01
+
+# Background jobs (python manage.py run_jobs)
+JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', '1.0'))  # seconds between polls when idle
+JOB_LOCK_TIMEOUT = int(os.environ.get('JOB_LOCK_TIMEOUT', '900'))  # reclaim 'running' jobs older than this
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '5'))
+JOB_RETRY_BASE_DELAY = 5  # seconds, doubled per attempt (with jitter)
+JOB_RETRY_MAX_DELAY = 900
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -4,9 +4,12 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import TemplateView
 
+from onboarding.views import CampaignPageView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('onboarding.urls')),
+    re_path(r"^temp/(?P<slug>[A-Za-z0-9_-]+)(?:/(?P<template_type>[^/]+))?/?$", CampaignPageView.as_view()),
     re_path(r"^(?!api/|admin/|static/|media/|assets/).*", TemplateView.as_view(template_name="index.html")),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
@@ -1,6 +1,8 @@
 from django.contrib import admin
-from .models import CampaignSubmission, PillarDescription
+from .models import BackgroundJob, CampaignSubmission, GHLUploadedFile, PillarDescription
 
 # Register your models here.
 admin.site.register(CampaignSubmission)
 admin.site.register(PillarDescription)
+admin.site.register(BackgroundJob)
+admin.site.register(GHLUploadedFile)
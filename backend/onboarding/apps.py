@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class OnboardingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "onboarding"
+
+    def ready(self):
+        # Register background job handlers
+        from . import tasks  # noqa: F401
+        # Keep the slug availability index current
+        from . import signals  # noqa: F401
@@ -0,0 +1,128 @@
+"""
+Async variants of the OTP and share endpoints, routed instead of the sync
+views when the app runs under ASGI (settings.ASYNC_VIEWS, see urls.py).
+
+Share requests await GHL through the async client (onboarding/ghl_async.py)
+instead of holding a thread per call. The OTP views no longer call GHL in the
+request (the SMS goes out from the job worker), so their short cache and
+database work runs in the thread pool, off the event loop.
+
+Requires adrf and httpx; WSGI deployments never import this module.
+"""
+import logging
+
+from adrf.views import APIView as AsyncAPIView
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .ghl_async import aghl
+from .ghl_breaker import FAMILY_CONTACTS, FAMILY_CONVERSATIONS
+from .ghl_client import GHL_MESSAGES_API_VERSION, ghl_headers
+from .ghl_ratelimit import LANE_BULK, ghl_lane
+from .views import OTPRequestView, OTPStatusView, OTPVerifyView, ShareCampaignView, ghl_unavailable_response
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncOTPRequestView(OTPRequestView, AsyncAPIView):
+    async def post(self, request):
+        return await sync_to_async(super().post, thread_sensitive=False)(request)
+
+
+class AsyncOTPStatusView(OTPStatusView, AsyncAPIView):
+    async def get(self, request, request_id):
+        return await sync_to_async(super().get, thread_sensitive=False)(request, request_id)
+
+
+class AsyncOTPVerifyView(OTPVerifyView, AsyncAPIView):
+    async def post(self, request):
+        return await sync_to_async(super().post, thread_sensitive=False)(request)
+
+
+class AsyncShareCampaignView(ShareCampaignView, AsyncAPIView):
+    @ghl_lane(LANE_BULK)
+    async def post(self, request):
+        """
+        Share campaign via SMS or Email using GHL, awaiting the GHL calls
+        """
+        phone = request.data.get('phone')
+        email = request.data.get('email')
+        message = request.data.get('message')
+
+        error = self.validate_share(phone, email, message)
+        if error:
+            return error
+
+        location_id = settings.GHL_OTP_LOCATION_ID
+        api_token = settings.GHL_LOCATION_API_TOKEN
+
+        unavailable = await sync_to_async(ghl_unavailable_response, thread_sensitive=False)(
+            FAMILY_CONTACTS, FAMILY_CONVERSATIONS
+        )
+        if unavailable:
+            return unavailable
+
+        contact_id = await self.aupsert_contact(phone, email, message, location_id, api_token)
+        if not contact_id:
+            return self.share_response(None, False)
+
+        messages_url = f"{settings.GHL_API_BASE_URL}/conversations/messages"
+        if phone:
+            payload = self.sms_payload(contact_id, phone, message)
+        else:
+            payload = self.email_payload(contact_id, email, message, request.data.get('subject'))
+        success = await self.asend_message(messages_url, payload, api_token)
+
+        return self.share_response(contact_id, success)
+
+    async def aupsert_contact(self, phone, email, message, location_id, api_token):
+        """upsert_contact() over the async client"""
+        headers = ghl_headers(api_token)
+        payload = self.contact_payload(phone, email, message)
+
+        search_query = self.contact_search_query(phone, email)
+        if not search_query:
+            return None
+
+        try:
+            response = await aghl.get(
+                f"{settings.GHL_API_BASE_URL}/contacts/",
+                headers=headers, params={"locationId": location_id, "query": search_query}, timeout=10
+            )
+            contact_id = None
+            if response.status_code == 200:
+                contacts = response.json().get('contacts', [])
+                if contacts:
+                    contact_id = contacts[0]['id']
+
+            if contact_id:
+                response = await aghl.put(
+                    f"{settings.GHL_API_BASE_URL}/contacts/{contact_id}", json=payload, headers=headers, timeout=10
+                )
+            else:
+                payload["locationId"] = location_id
+                response = await aghl.post(
+                    f"{settings.GHL_API_BASE_URL}/contacts/", json=payload, headers=headers, timeout=10
+                )
+
+            if response.status_code in [200, 201]:
+                return response.json().get('contact', {}).get('id')
+            logger.error(f"Failed to upsert contact: {response.status_code} - {response.text}")
+            return None
+        except Exception as e:
+            logger.error(f"Error upserting contact: {str(e)}")
+            return None
+
+    async def asend_message(self, url, payload, api_token):
+        """send_sms() / send_email() over the async client"""
+        headers = ghl_headers(api_token, GHL_MESSAGES_API_VERSION)
+        try:
+            response = await aghl.post(url, json=payload, headers=headers, timeout=10)
+            if response.status_code in [200, 201]:
+                logger.info(f"{payload['type']} shared successfully")
+                return True
+            logger.error(f"Failed to share {payload['type']}: {response.status_code} - {response.text}")
+            return False
+        except Exception as e:
+            logger.error(f"Error sharing {payload['type']}: {str(e)}")
+            return False
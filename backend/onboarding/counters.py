@@ -0,0 +1,85 @@
+"""
+Atomic counters shared by every process (web workers and the job worker),
+for rate limits and attempt limits.
+
+With Redis as the default cache (REDIS_URL) a counter is a Redis key changed
+with INCR/DECR and the database is never touched. Otherwise a counter is a
+Counter row changed with a single UPDATE ... SET value = value + 1: the
+database cache's incr() reads and then writes the value, so concurrent
+requests could all read the same count and get past a limit.
+
+Counters expire `ttl` seconds after they are created; an expired counter
+starts again from zero.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from .models import Counter
+
+
+def _in_redis():
+    return isinstance(caches['default'], RedisCache)
+
+
+def incr_counter(key, ttl, delta=1):
+    """Add delta to the counter and return its new value"""
+    if _in_redis():
+        cache.add(key, 0, ttl)
+        try:
+            return cache.incr(key, delta)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.set(key, delta, ttl)
+            return delta
+
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=ttl)
+    live = Q(expires_at__gt=now)
+    with transaction.atomic():
+        # One statement, so the read and the write of the value can't interleave
+        # with another request's; an expired row is reset in the same statement
+        updated = Counter.objects.filter(key=key).update(
+            value=Case(When(live, then=F('value') + delta), default=Value(delta)),
+            expires_at=Case(When(live, then=F('expires_at')), default=Value(expires_at)),
+        )
+        if not updated:
+            try:
+                with transaction.atomic():
+                    Counter.objects.create(key=key, value=delta, expires_at=expires_at)
+            except IntegrityError:
+                # Created by a concurrent request first
+                return incr_counter(key, ttl, delta)
+            Counter.objects.filter(expires_at__lte=now).delete()
+            return delta
+        # The UPDATE holds the row until commit, so this is the value it wrote
+        return Counter.objects.filter(key=key).values_list('value', flat=True).get()
+
+
+def decr_counter(key, delta=1):
+    """Take delta off a live counter (e.g. to refund a rejected request)"""
+    if _in_redis():
+        try:
+            cache.decr(key, delta)
+        except ValueError:
+            pass
+        return
+    Counter.objects.filter(key=key, expires_at__gt=timezone.now()).update(value=F('value') - delta)
+
+
+def get_counter(key):
+    """Current value of the counter, 0 if it doesn't exist or has expired"""
+    if _in_redis():
+        return cache.get(key, 0)
+    return Counter.objects.filter(key=key, expires_at__gt=timezone.now()).values_list('value', flat=True).first() or 0
+
+
+def delete_counters(*keys):
+    if _in_redis():
+        cache.delete_many(keys)
+        return
+    Counter.objects.filter(key__in=keys).delete()
@@ -0,0 +1,123 @@
+"""
+Async HTTP client for the GoHighLevel (GHL) API, for views served under ASGI.
+
+`aghl` mirrors the sync `ghl` client in onboarding/ghl_client.py - the same
+circuit breakers, rate-limit lanes and 429 handling - but awaits GHL instead
+of holding a worker thread, so one ASGI worker can keep hundreds of GHL
+calls in flight. Each event loop gets one pooled httpx.AsyncClient, speaking
+HTTP/2 when GHL_HTTP2 is on and the h2 package is installed.
+
+Requires httpx (pip install "httpx[http2]"); WSGI deployments never import
+this module.
+"""
+import asyncio
+import logging
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+import httpx
+
+from .ghl_breaker import before_call, endpoint_family, is_failure_response, record_failure, record_success
+from .ghl_client import _token_from_headers
+from .ghl_retry import record_call
+from .ghl_ratelimit import aacquire, block, bucket_key, infer_location_id, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# One client per event loop: httpx connections can't be shared across loops
+_clients = weakref.WeakKeyDictionary()
+
+
+def _http2_available():
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_async_client():
+    """Return the pooled AsyncClient for the running event loop, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        http2 = settings.GHL_HTTP2 and _http2_available()
+        client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.GHL_ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GHL_HTTP_POOL_MAXSIZE,
+            ),
+            timeout=settings.GHL_HTTP_TIMEOUT,
+        )
+        _clients[loop] = client
+        logger.info(
+            f"Created async GHL client (http2={http2}, max_connections={settings.GHL_ASYNC_MAX_CONNECTIONS})"
+        )
+    return client
+
+
+def _off_loop(func):
+    # Breaker/budget state lives in the cache, which may be database-backed
+    return sync_to_async(func, thread_sensitive=False)
+
+
+class AsyncGHLClient:
+    """
+    Async counterpart of GHLClient with the same get/post/put API. Responses
+    are httpx.Response objects (status_code, json(), text and headers behave
+    like requests').
+    """
+
+    async def request(self, method, url, location_id=None, **kwargs):
+        api_token = _token_from_headers(kwargs.get('headers'))
+        if location_id is None:
+            location_id = infer_location_id(
+                url, api_token, params=kwargs.get('params'), json_body=kwargs.get('json'), data=kwargs.get('data')
+            )
+        bucket = bucket_key(location_id, api_token)
+
+        # Fail fast while GHL is degraded, before waiting on the rate limiter
+        family = endpoint_family(url)
+        probe = await _off_loop(before_call)(family)
+
+        await aacquire(bucket)
+        response = await self._send(method, url, family, probe, **kwargs)
+
+        if response.status_code == 429:
+            await _off_loop(block)(bucket, parse_retry_after(response))
+            # The rejected call was never processed, so it is safe to send it
+            # again once the lane is allowed to wait out Retry-After
+            await aacquire(bucket)
+            response = await self._send(method, url, family, False, **kwargs)
+            if response.status_code == 429:
+                await _off_loop(block)(bucket, parse_retry_after(response))
+
+        return response
+
+    async def _send(self, method, url, family, probe, **kwargs):
+        await _off_loop(record_call)()
+        try:
+            response = await get_async_client().request(method, url, **kwargs)
+        except httpx.TransportError:
+            await _off_loop(record_failure)(family, probe)
+            raise
+
+        if is_failure_response(response):
+            await _off_loop(record_failure)(family, probe)
+        else:
+            await _off_loop(record_success)(family, probe)
+        return response
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    async def put(self, url, **kwargs):
+        return await self.request('PUT', url, **kwargs)
+
+
+aghl = AsyncGHLClient()
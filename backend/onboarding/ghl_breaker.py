@@ -0,0 +1,128 @@
+"""
+Circuit breakers for GHL endpoint families.
+
+Breaker state is kept in the shared Django cache so every process sees it:
+
+- closed: calls go through; connection errors, timeouts and 5xx responses are
+  counted over GHL_BREAKER_WINDOW seconds
+- open: after GHL_BREAKER_FAILURE_THRESHOLD failures calls fail fast with
+  GHLCircuitOpen for GHL_BREAKER_COOLDOWN seconds
+- half-open: after the cooldown a single probe call is let through; success
+  closes the breaker, failure opens it again
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+import requests
+
+logger = logging.getLogger(__name__)
+
+FAMILY_CONTACTS = 'contacts'
+FAMILY_CUSTOM_FIELDS_UPLOAD = 'custom_fields_upload'
+FAMILY_LOCATIONS = 'locations'
+FAMILY_CONVERSATIONS = 'conversations'
+FAMILY_OTHER = 'other'
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+# A tripped breaker stays half-open (waiting for a probe) at most this long
+TRIPPED_TTL = 3600
+
+
+class GHLCircuitOpen(requests.exceptions.RequestException):
+    """Raised instead of calling GHL while the endpoint family's breaker is open"""
+
+    def __init__(self, family, retry_after):
+        super().__init__(f"GHL circuit open for {family}, retry in {retry_after:.0f}s")
+        self.family = family
+        self.retry_after = retry_after
+
+
+def endpoint_family(url):
+    path = url.split('://', 1)[-1]
+    path = path[path.find('/'):] if '/' in path else ''
+    if '/customFields/upload' in path:
+        return FAMILY_CUSTOM_FIELDS_UPLOAD
+    if path.startswith('/conversations'):
+        return FAMILY_CONVERSATIONS
+    if path.startswith('/contacts'):
+        return FAMILY_CONTACTS
+    if path.startswith('/locations'):
+        return FAMILY_LOCATIONS
+    return FAMILY_OTHER
+
+
+def _key(family, suffix):
+    return f"ghl:breaker:{family}:{suffix}"
+
+
+def get_state(family):
+    if cache.get(_key(family, 'open_until')):
+        return STATE_OPEN
+    if cache.get(_key(family, 'tripped')):
+        return STATE_HALF_OPEN
+    return STATE_CLOSED
+
+
+def retry_after(family):
+    """Seconds until an open breaker lets a probe through (0 if not open)"""
+    open_until = cache.get(_key(family, 'open_until'))
+    return max(open_until - time.time(), 0) if open_until else 0
+
+
+def before_call(family):
+    """
+    Check the breaker before calling GHL.
+    Raises GHLCircuitOpen when the call must fail fast. Returns True when this
+    call is the half-open probe.
+    """
+    state = get_state(family)
+    if state == STATE_OPEN:
+        raise GHLCircuitOpen(family, retry_after(family))
+    if state == STATE_HALF_OPEN:
+        # Only one caller across all workers gets to probe
+        if not cache.add(_key(family, 'probe'), 1, settings.GHL_HTTP_TIMEOUT * 2):
+            raise GHLCircuitOpen(family, 1)
+        logger.info(f"GHL circuit for {family} is half-open, sending probe")
+        return True
+    return False
+
+
+def record_success(family, probe=False):
+    if probe or get_state(family) != STATE_CLOSED:
+        cache.delete_many([_key(family, 'tripped'), _key(family, 'failures'), _key(family, 'probe')])
+        logger.info(f"✓ GHL circuit for {family} closed")
+
+
+def record_failure(family, probe=False):
+    if probe:
+        _trip(family)
+        return
+
+    failures_key = _key(family, 'failures')
+    cache.add(failures_key, 0, settings.GHL_BREAKER_WINDOW)
+    try:
+        failures = cache.incr(failures_key)
+    except ValueError:
+        # The window expired between add() and incr()
+        cache.add(failures_key, 1, settings.GHL_BREAKER_WINDOW)
+        failures = 1
+
+    if failures >= settings.GHL_BREAKER_FAILURE_THRESHOLD:
+        _trip(family)
+
+
+def _trip(family):
+    cooldown = settings.GHL_BREAKER_COOLDOWN
+    cache.set(_key(family, 'open_until'), time.time() + cooldown, cooldown)
+    cache.set(_key(family, 'tripped'), 1, TRIPPED_TTL)
+    cache.delete_many([_key(family, 'failures'), _key(family, 'probe')])
+    logger.error(f"✗ GHL circuit for {family} opened for {cooldown}s")
+
+
+def is_failure_response(response):
+    return response.status_code >= 500
@@ -0,0 +1,200 @@
+"""
+Shared HTTP client for the GoHighLevel (GHL) API.
+
+All GHL calls go through the module-level `ghl` client, which keeps one pooled
+keep-alive `requests.Session` per process so the TCP+TLS handshake to
+services.leadconnectorhq.com is paid once per worker instead of once per call.
+Calls are throttled per GHL location/token and priority lane, and fail fast
+while an endpoint family's circuit breaker is open.
+"""
+from functools import lru_cache
+import logging
+import os
+import threading
+import uuid
+
+from django.conf import settings
+import requests
+from requests.adapters import HTTPAdapter
+
+from .ghl_breaker import before_call, endpoint_family, is_failure_response, record_failure, record_success
+from .ghl_retry import record_call
+from .ghl_ratelimit import acquire, block, bucket_key, infer_location_id, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+GHL_API_VERSION = '2021-07-28'
+# The conversations/messages API uses an older version header
+GHL_MESSAGES_API_VERSION = '2021-04-15'
+
+# Bytes read from storage at a time when streaming an upload
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Return the per-process pooled session, creating it on first use.
+    A new session is built after a fork (e.g. gunicorn --preload) so workers
+    never share sockets with their parent.
+    """
+    global _session, _session_pid
+
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+
+    with _session_lock:
+        if _session is None or _session_pid != pid:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=settings.GHL_HTTP_POOL_CONNECTIONS,
+                pool_maxsize=settings.GHL_HTTP_POOL_MAXSIZE,
+                pool_block=False,
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+            _session_pid = pid
+            logger.info(
+                f"Created pooled GHL session (pool_connections={settings.GHL_HTTP_POOL_CONNECTIONS}, "
+                f"pool_maxsize={settings.GHL_HTTP_POOL_MAXSIZE})"
+            )
+    return _session
+
+
+@lru_cache(maxsize=32)
+def ghl_headers(api_token, version=GHL_API_VERSION, content_type='application/json'):
+    """
+    Build the auth/Version headers for a token once and reuse them.
+    The returned dict is shared - do not mutate it.
+    Pass content_type=None for multipart uploads so requests sets the boundary.
+    """
+    headers = {
+        'Authorization': f'Bearer {api_token}',
+        'Version': version,
+        'Accept': 'application/json',
+    }
+    if content_type:
+        headers['Content-Type'] = content_type
+    return headers
+
+
+class MultipartFileStream:
+    """
+    A multipart/form-data body that streams a single file in chunks.
+
+    requests' files= builds the whole body in memory (the file plus a copy for
+    the encoded body), so large uploads cost roughly twice their size in RAM.
+    Pass this as data= instead; len() gives requests the Content-Length and the
+    file is read UPLOAD_CHUNK_SIZE bytes at a time while sending. The file is
+    rewound on each iteration, so the body can be sent again (e.g. after a 429).
+    """
+
+    def __init__(self, fields, file_field, fileobj, filename, file_content_type, chunk_size=UPLOAD_CHUNK_SIZE):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={self.boundary}'
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+
+        fileobj.seek(0, os.SEEK_END)
+        self.file_size = fileobj.tell()
+        fileobj.seek(0)
+
+        filename = filename.replace('"', '%22')
+        parts = [
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+            for name, value in fields.items()
+        ]
+        parts.append(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+            f'Content-Type: {file_content_type}\r\n\r\n'
+        )
+        self._head = ''.join(parts).encode()
+        self._tail = f'\r\n--{self.boundary}--\r\n'.encode()
+
+    def __len__(self):
+        return len(self._head) + self.file_size + len(self._tail)
+
+    def __iter__(self):
+        self.fileobj.seek(0)
+        yield self._head
+        while True:
+            chunk = self.fileobj.read(self.chunk_size)
+            if not chunk:
+                break
+            yield chunk
+        yield self._tail
+
+
+def _token_from_headers(headers):
+    authorization = (headers or {}).get('Authorization', '')
+    return authorization[len('Bearer '):] if authorization.startswith('Bearer ') else ''
+
+
+class GHLClient:
+    """
+    Thin wrapper around the pooled session. Mirrors the requests API
+    (get/post/put) so call sites read the same as before.
+    Every call is checked against the endpoint family's circuit breaker
+    (onboarding/ghl_breaker.py), then takes a token from the (location, token)
+    rate-limit bucket in the caller's priority lane (onboarding/ghl_ratelimit.py).
+    """
+
+    def request(self, method, url, location_id=None, **kwargs):
+        kwargs.setdefault('timeout', settings.GHL_HTTP_TIMEOUT)
+
+        api_token = _token_from_headers(kwargs.get('headers'))
+        if location_id is None:
+            location_id = infer_location_id(
+                url, api_token, params=kwargs.get('params'), json_body=kwargs.get('json'), data=kwargs.get('data')
+            )
+        bucket = bucket_key(location_id, api_token)
+
+        # Fail fast while GHL is degraded, before waiting on the rate limiter
+        family = endpoint_family(url)
+        probe = before_call(family)
+
+        acquire(bucket)
+        response = self._send(method, url, family, probe, **kwargs)
+
+        if response.status_code == 429:
+            retry_after = parse_retry_after(response)
+            block(bucket, retry_after)
+            # The rejected call was never processed, so it is safe to send it
+            # again once the lane is allowed to wait out Retry-After
+            acquire(bucket)
+            response = self._send(method, url, family, False, **kwargs)
+            if response.status_code == 429:
+                block(bucket, parse_retry_after(response))
+
+        return response
+
+    def _send(self, method, url, family, probe, **kwargs):
+        record_call()
+        try:
+            response = get_session().request(method, url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            record_failure(family, probe)
+            raise
+
+        if is_failure_response(response):
+            record_failure(family, probe)
+        else:
+            record_success(family, probe)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+
+ghl = GHLClient()
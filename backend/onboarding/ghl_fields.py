@@ -0,0 +1,145 @@
+"""
+Shared registry of GHL contact custom-field IDs (field name -> field id).
+
+The mapping is stored in the Django cache so every worker and node shares it.
+Entries expire after GHL_CUSTOM_FIELD_CACHE_TTL seconds. When an entry is cold
+only one worker fetches it from GHL (single-flight); the others wait briefly
+for the result. `python manage.py sync_ghl_custom_fields` pre-warms or resyncs it.
+"""
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+import requests
+
+from .ghl_client import ghl, ghl_headers
+
+logger = logging.getLogger(__name__)
+
+# How long the fetching worker holds the refresh lock, and how long others wait for it
+REFRESH_LOCK_TIMEOUT = 30
+REFRESH_WAIT_INTERVAL = 0.1
+
+
+def _cache_key(location_id, api_token):
+    # Never put the token itself in a cache key
+    token_hash = hashlib.sha256(api_token.encode()).hexdigest()[:16]
+    return f"ghl:custom_fields:{location_id}:{token_hash}"
+
+
+def fetch_custom_field_ids(location_id, api_token):
+    """
+    Fetch custom field IDs from GHL API for the given location
+    Returns a dictionary mapping field name -> field id, or None on failure
+    """
+    logger.info(f"Fetching custom field IDs from GHL for location {location_id}")
+
+    headers = ghl_headers(api_token)
+
+    try:
+        # GET /locations/:locationId/customFields?model=contact
+        api_url = f"{settings.GHL_API_BASE_URL}/locations/{location_id}/customFields"
+        params = {'model': 'contact'}
+
+        response = ghl.get(api_url, headers=headers, params=params, timeout=30)
+
+        if response.status_code != 200:
+            logger.error(f"✗ Failed to fetch custom fields: {response.status_code} - {response.text}")
+            return None
+
+        custom_fields = response.json().get('customFields', [])
+
+        # Create mapping: field name -> field id
+        field_mapping = {}
+        for field in custom_fields:
+            field_name = field.get('name')
+            field_id = field.get('id')
+            field_key = field.get('fieldKey', '')  # API uses 'fieldKey' not 'key'
+
+            if field_id and field_name:
+                field_mapping[field_name] = field_id
+                logger.debug(f"Found custom field: {field_name} -> {field_id}")
+
+            # Also map by fieldKey if available (e.g., "contact.pillar_1")
+            if field_id and field_key:
+                # Extract just the field name part after "contact."
+                if '.' in field_key:
+                    key_name = field_key.split('.', 1)[1]
+                    field_mapping[key_name] = field_id
+                else:
+                    field_mapping[field_key] = field_id
+
+        logger.info(f"✓ Fetched {len(field_mapping)} custom field IDs for location {location_id}")
+        return field_mapping
+
+    except requests.exceptions.RequestException as e:
+        logger.error(f"✗ Error fetching custom fields: {str(e)}")
+        logger.exception("Full exception traceback:")
+        return None
+    except Exception as e:
+        logger.error(f"✗ Unexpected error fetching custom fields: {str(e)}")
+        logger.exception("Full exception traceback:")
+        return None
+
+
+def refresh_custom_field_ids(location_id, api_token):
+    """
+    Fetch the mapping from GHL and store it in the shared cache.
+    Returns the mapping ({} on failure; failures are not cached).
+    """
+    field_mapping = fetch_custom_field_ids(location_id, api_token)
+    if field_mapping is None:
+        return {}
+    cache.set(_cache_key(location_id, api_token), field_mapping, settings.GHL_CUSTOM_FIELD_CACHE_TTL)
+    return field_mapping
+
+
+def get_custom_field_ids(location_id, api_token):
+    """
+    Return the field name -> field id mapping for a location, from the shared
+    cache when possible. Only one worker refreshes a cold entry at a time.
+    """
+    key = _cache_key(location_id, api_token)
+    field_mapping = cache.get(key)
+    if field_mapping is not None:
+        logger.info(f"Using cached custom field IDs for location {location_id}")
+        return field_mapping
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, REFRESH_LOCK_TIMEOUT):
+        try:
+            return refresh_custom_field_ids(location_id, api_token)
+        finally:
+            cache.delete(lock_key)
+
+    # Another worker is already fetching - wait for its result instead of piling on
+    logger.info(f"Custom field IDs for location {location_id} are being refreshed by another worker, waiting")
+    deadline = time.monotonic() + REFRESH_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(REFRESH_WAIT_INTERVAL)
+        field_mapping = cache.get(key)
+        if field_mapping is not None:
+            return field_mapping
+        if cache.get(lock_key) is None:
+            # The other worker gave up (fetch failed) - try ourselves
+            break
+
+    return refresh_custom_field_ids(location_id, api_token)
+
+
+def invalidate_custom_field_ids(location_id, api_token):
+    """Drop the cached mapping so the next lookup refetches it from GHL"""
+    cache.delete(_cache_key(location_id, api_token))
+    logger.info(f"Invalidated cached custom field IDs for location {location_id}")
+
+
+def is_stale_field_error(response):
+    """
+    GHL rejects writes that reference a custom field ID which no longer exists
+    with a 400/422 mentioning the custom field.
+    """
+    if response.status_code not in (400, 422):
+        return False
+    return 'custom' in response.text.lower()
@@ -0,0 +1,215 @@
+"""
+Rate-limit aware scheduling for GHL calls.
+
+Each (location, token) pair gets a token bucket stored in the shared Django
+cache, so every worker draws from the same budget. Callers run in a priority
+lane: interactive traffic (OTP) may use the whole bucket, while default and
+bulk traffic (provisioning uploads, share fan-out) stop early and leave
+headroom for it. A 429 from GHL blocks the bucket for its Retry-After period.
+"""
+import asyncio
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from functools import wraps
+import hashlib
+import inspect
+import logging
+import re
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+import requests
+
+logger = logging.getLogger(__name__)
+
+LANE_INTERACTIVE = 'interactive'
+LANE_DEFAULT = 'default'
+LANE_BULK = 'bulk'
+
+_current_lane = ContextVar('ghl_lane', default=LANE_DEFAULT)
+
+# How long to hold the per-bucket lock while updating its state
+BUCKET_LOCK_TIMEOUT = 2
+LOCK_RETRY_INTERVAL = 0.005
+
+_location_in_path = re.compile(r'/locations/([^/?]+)')
+
+
+class GHLRateLimited(requests.exceptions.RequestException):
+    """Raised when a GHL call cannot get a rate-limit token within its lane's wait budget"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ghl_lane(ContextDecorator):
+    """
+    Run GHL calls in the given priority lane. Usable as a context manager
+    or as a decorator (of sync or async functions):
+
+        with ghl_lane(LANE_BULK):
+            ...
+    """
+
+    def __init__(self, lane):
+        self.lane = lane
+        self._tokens = []
+
+    def _recreate_cm(self):
+        # Fresh instance per decorated call so concurrent calls don't share state
+        return type(self)(self.lane)
+
+    def __call__(self, func):
+        if not inspect.iscoroutinefunction(func):
+            return super().__call__(func)
+
+        # ContextDecorator would exit before the coroutine runs
+        @wraps(func)
+        async def inner(*args, **kwargs):
+            with self._recreate_cm():
+                return await func(*args, **kwargs)
+        return inner
+
+    def __enter__(self):
+        self._tokens.append(_current_lane.set(self.lane))
+        return self
+
+    def __exit__(self, *exc):
+        _current_lane.reset(self._tokens.pop())
+        return False
+
+
+def current_lane():
+    return _current_lane.get()
+
+
+def _lane_config(lane):
+    return settings.GHL_RATE_LIMIT_LANES.get(lane) or settings.GHL_RATE_LIMIT_LANES[LANE_DEFAULT]
+
+
+def bucket_key(location_id, api_token):
+    token_hash = hashlib.sha256((api_token or '').encode()).hexdigest()[:16]
+    return f"ghl:ratelimit:{location_id or '-'}:{token_hash}"
+
+
+def infer_location_id(url, api_token, params=None, json_body=None, data=None):
+    """
+    Work out which GHL location a call is billed against: from the URL path,
+    then a locationId in the query/body, then the location the token belongs to.
+    """
+    match = _location_in_path.search(url)
+    if match:
+        return match.group(1)
+    for source in (params, json_body, data):
+        if isinstance(source, dict) and source.get('locationId'):
+            return source['locationId']
+    # The location-level PIT is scoped to the static OTP location
+    if api_token and api_token == settings.GHL_LOCATION_API_TOKEN:
+        return settings.GHL_OTP_LOCATION_ID
+    return None
+
+
+def _try_take(key, lane):
+    """
+    Try to take one token from the bucket.
+    Returns 0 on success, otherwise the number of seconds to wait before trying
+    again, or None if another worker holds the bucket lock.
+    """
+    lock_key = f"{key}:lock"
+    if not cache.add(lock_key, 1, BUCKET_LOCK_TIMEOUT):
+        return None
+
+    try:
+        now = time.time()
+        capacity = settings.GHL_RATE_LIMIT_CAPACITY
+        refill_rate = settings.GHL_RATE_LIMIT_REFILL_PER_SECOND
+
+        state = cache.get(key)
+        if state is None:
+            tokens = float(capacity)
+        else:
+            tokens = min(capacity, state['tokens'] + (now - state['ts']) * refill_rate)
+
+        # Lower lanes must leave this many tokens in the bucket for higher ones
+        reserve = capacity * (1 - _lane_config(lane)['share'])
+
+        if tokens - 1 >= reserve:
+            tokens -= 1
+            wait = 0
+        else:
+            wait = (reserve + 1 - tokens) / refill_rate
+
+        # Keep the state around long enough to refill completely
+        cache.set(key, {'tokens': tokens, 'ts': now}, int(capacity / refill_rate) + 1)
+        return wait
+    finally:
+        cache.delete(lock_key)
+
+
+def _next_wait(key, lane):
+    """Try once to take a token: 0 on success, otherwise seconds to wait before trying again"""
+    blocked_until = cache.get(f"{key}:blocked")
+    if blocked_until and blocked_until > time.time():
+        return blocked_until - time.time()
+    wait = _try_take(key, lane)
+    return LOCK_RETRY_INTERVAL if wait is None else wait
+
+
+def _check_deadline(key, lane, wait, deadline):
+    if time.monotonic() + wait > deadline:
+        logger.warning(f"GHL rate limit reached for {key} (lane={lane}), retry in {wait:.1f}s")
+        raise GHLRateLimited(f"GHL rate limit reached (lane={lane})", retry_after=wait)
+
+
+def acquire(key, lane=None):
+    """
+    Block until a token is available for this lane or raise GHLRateLimited
+    when the lane's max_wait would be exceeded.
+    """
+    lane = lane or current_lane()
+    deadline = time.monotonic() + _lane_config(lane)['max_wait']
+
+    while True:
+        wait = _next_wait(key, lane)
+        if wait == 0:
+            return
+        _check_deadline(key, lane, wait, deadline)
+        time.sleep(wait)
+
+
+async def aacquire(key, lane=None):
+    """acquire() for async callers: waits with asyncio.sleep instead of blocking the thread"""
+    lane = lane or current_lane()
+    deadline = time.monotonic() + _lane_config(lane)['max_wait']
+
+    while True:
+        # Cache backends may hit the database, so run the check off the event loop
+        wait = await sync_to_async(_next_wait, thread_sensitive=False)(key, lane)
+        if wait == 0:
+            return
+        _check_deadline(key, lane, wait, deadline)
+        await asyncio.sleep(wait)
+
+
+def parse_retry_after(response):
+    """Seconds to back off after a 429, from Retry-After (seconds or HTTP date)"""
+    value = response.headers.get('Retry-After')
+    if value:
+        try:
+            return max(float(value), 0)
+        except ValueError:
+            try:
+                return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+            except (TypeError, ValueError):
+                pass
+    return settings.GHL_RATE_LIMIT_DEFAULT_RETRY_AFTER
+
+
+def block(key, retry_after):
+    """Stop every worker from calling this bucket until Retry-After has passed"""
+    cache.set(f"{key}:blocked", time.time() + retry_after, int(retry_after) + 1)
+    logger.warning(f"GHL returned 429 for {key}, pausing calls for {retry_after:.1f}s")
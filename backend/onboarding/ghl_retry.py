@@ -0,0 +1,119 @@
+"""
+Retry policy for GHL calls.
+
+Nothing here sleeps. A retryable failure raises RetryJob, so the background
+job worker reschedules the whole job with exponential backoff and jitter
+(jobs.RetryPolicy) instead of blocking a thread. Views handle failures
+without retrying.
+
+Which failures are retried depends on whether repeating the call is safe:
+- never sent (connect errors, open circuit, local rate limit, 429, 503):
+  retried for any method
+- ambiguous (read timeouts, dropped connections, 500/502/504): retried only
+  for idempotent calls (GET/PUT, or POSTs such as /contacts/upsert that
+  GHL deduplicates)
+- other 4xx: never retried
+
+A shared retry budget caps retries at a fraction of recent GHL traffic so a
+GHL outage does not turn into a retry storm.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+import requests
+
+from .ghl_breaker import GHLCircuitOpen
+from .ghl_ratelimit import GHLRateLimited, parse_retry_after
+from .jobs import RetryJob
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'}
+
+# Status codes that mean GHL did not process the request
+NOT_PROCESSED_STATUS_CODES = {429, 503}
+# Status codes where GHL may or may not have processed the request
+AMBIGUOUS_STATUS_CODES = {500, 502, 504}
+
+BUDGET_WINDOW = 60  # seconds
+
+
+def is_retryable(method, response=None, exception=None, idempotent=None):
+    """Classify a GHL failure. Pass either the response or the raised exception."""
+    if idempotent is None:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+    if exception is not None:
+        if isinstance(exception, (GHLCircuitOpen, GHLRateLimited, requests.exceptions.ConnectTimeout)):
+            return True
+        if isinstance(exception, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+            return idempotent
+        return False
+
+    if response is not None:
+        if response.status_code in NOT_PROCESSED_STATUS_CODES:
+            return True
+        if response.status_code in AMBIGUOUS_STATUS_CODES:
+            return idempotent
+    return False
+
+
+def _suggested_delay(response=None, exception=None):
+    if isinstance(exception, (GHLCircuitOpen, GHLRateLimited)):
+        return exception.retry_after + 1
+    if response is not None and response.status_code in NOT_PROCESSED_STATUS_CODES and response.headers.get('Retry-After'):
+        return parse_retry_after(response)
+    return None
+
+
+def _budget_keys():
+    window = int(time.time() // BUDGET_WINDOW)
+    return f"ghl:retry_budget:{window}:calls", f"ghl:retry_budget:{window}:retries"
+
+
+def _incr(key):
+    cache.add(key, 0, BUDGET_WINDOW * 2)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, BUDGET_WINDOW * 2)
+        return 1
+
+
+def record_call():
+    """Count a GHL call towards the retry budget (called by the GHL client)"""
+    _incr(_budget_keys()[0])
+
+
+def spend_retry_budget():
+    """
+    Take one retry from the shared budget. Returns False when retries already
+    exceed GHL_RETRY_BUDGET_RATIO of this window's calls (plus a small floor).
+    """
+    calls_key, retries_key = _budget_keys()
+    calls = cache.get(calls_key) or 0
+    allowed = max(settings.GHL_RETRY_BUDGET_MIN, calls * settings.GHL_RETRY_BUDGET_RATIO)
+    retries = _incr(retries_key)
+    if retries > allowed:
+        cache.decr(retries_key)
+        return False
+    return True
+
+
+def raise_if_retryable(method, response=None, exception=None, idempotent=None, description='GHL call'):
+    """
+    Raise RetryJob if the failure is safe to retry and the retry budget allows it,
+    otherwise return so the caller handles it as a permanent failure.
+    """
+    if not is_retryable(method, response=response, exception=exception, idempotent=idempotent):
+        return
+
+    if not spend_retry_budget():
+        logger.warning(f"⚠ Retry budget exhausted, not retrying {description}")
+        return
+
+    reason = str(exception) if exception is not None else f"HTTP {response.status_code}"
+    logger.warning(f"{description} failed with a retryable error ({reason}), rescheduling")
+    raise RetryJob(f"{description} failed: {reason}", delay=_suggested_delay(response, exception))
@@ -0,0 +1,123 @@
+"""
+Normalization of uploaded campaign images.
+
+Phone photos arrive as 4-12 MB JPEGs with EXIF orientation and metadata
+(including GPS). Before they are pushed to GHL and served on the mirror page
+each image is rotated upright, stripped of EXIF, capped to a per-field size
+and re-encoded: JPEG for opaque images, WebP when there is transparency.
+"""
+from io import BytesIO
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .storage import delete_unreferenced
+
+logger = logging.getLogger(__name__)
+
+IMAGE_FIELDS = ['headshot', 'background_picture', 'action_shot_1', 'action_shot_2', 'action_shot_3']
+
+
+def _has_alpha(image):
+    return image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+
+
+def normalize_image(fileobj, max_size):
+    """
+    Return (content bytes, extension, (width, height)) for the normalized image,
+    or None if it should be kept as uploaded (animated images).
+    Raises UnidentifiedImageError / Image.DecompressionBombError for bad input.
+    """
+    with Image.open(fileobj) as image:
+        if getattr(image, 'is_animated', False):
+            return None
+
+        # Let the JPEG decoder downscale by a power of two while decoding, so a
+        # 12 MP photo is never fully decompressed. Square target: the image may
+        # still be rotated by its EXIF orientation.
+        longest = max(max_size)
+        image.draft('RGB', (longest, longest))
+
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(max_size, Image.LANCZOS)
+
+        output = BytesIO()
+        if _has_alpha(image):
+            image.convert('RGBA').save(output, 'WEBP', quality=settings.IMAGE_JPEG_QUALITY, method=4)
+            extension = '.webp'
+        else:
+            # No exif= argument, so no EXIF (GPS, camera data) is written
+            image.convert('RGB').save(
+                output, 'JPEG', quality=settings.IMAGE_JPEG_QUALITY, optimize=True, progressive=True
+            )
+            extension = '.jpg'
+        return output.getvalue(), extension, image.size
+
+
+def normalize_submission_images(submission):
+    """
+    Normalize every uploaded image on the submission that hasn't been processed yet,
+    replacing the stored file and recording sizes in submission.image_sizes.
+    Returns a dict of field -> error for images that could not be processed.
+    """
+    errors = {}
+    changed = False
+    replaced = []
+
+    for field_name in IMAGE_FIELDS:
+        image_field = getattr(submission, field_name)
+        if not image_field:
+            continue
+        if submission.image_sizes.get(field_name, {}).get('name') == image_field.name:
+            continue
+
+        original_name = image_field.name
+        try:
+            original_bytes = image_field.size
+            image_field.open('rb')
+            try:
+                result = normalize_image(image_field, settings.IMAGE_MAX_DIMENSIONS[field_name])
+            finally:
+                image_field.close()
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+            logger.error(f"✗ Could not normalize {field_name} ({original_name}): {str(e)}")
+            errors[field_name] = str(e)
+            continue
+
+        if result is None:
+            logger.info(f"Keeping {field_name} as uploaded (animated image)")
+            submission.image_sizes[field_name] = {
+                'name': original_name,
+                'original_bytes': original_bytes,
+                'optimized_bytes': original_bytes,
+            }
+            changed = True
+            continue
+
+        content, extension, (width, height) = result
+        base_name = os.path.splitext(os.path.basename(original_name))[0]
+        image_field.save(f"{base_name}{extension}", ContentFile(content), save=False)
+        if image_field.name != original_name:
+            replaced.append(original_name)
+
+        submission.image_sizes[field_name] = {
+            'name': image_field.name,
+            'original_bytes': original_bytes,
+            'optimized_bytes': len(content),
+            'width': width,
+            'height': height,
+        }
+        changed = True
+        logger.info(
+            f"✓ Normalized {field_name}: {original_bytes} -> {len(content)} bytes ({width}x{height})"
+        )
+
+    if changed:
+        submission.save(update_fields=IMAGE_FIELDS + ['image_sizes'])
+    # Originals may be shared with other submissions (content-addressed storage)
+    for name in replaced:
+        delete_unreferenced(name)
+    return errors
@@ -0,0 +1,221 @@
+"""
+Minimal DB-backed job queue.
+
+Work that talks to GoHighLevel is enqueued from the request path with
+`enqueue()` and executed by `python manage.py run_jobs`. Handlers are
+registered with the `@job_handler('kind')` decorator (see onboarding/tasks.py).
+
+A handler can also register an `on_failure(payload, error)` callback, run
+once when the job fails for good (attempts used up), so the records the job
+was updating aren't left looking in progress.
+
+Handlers raise RetryJob to be rescheduled and FailJob to fail without
+further attempts; any other exception is retried like RetryJob.
+
+Handlers may update their payload dict (e.g. to record a result for status
+polling); the payload is saved with the job's outcome. Values under
+payload['secrets'] are dropped once the job succeeds or fails for good.
+"""
+from datetime import timedelta
+import logging
+import os
+import random
+import socket
+import traceback
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+# kind -> callable(payload)
+_handlers = {}
+# kind -> callable(payload, error), run when a job fails permanently
+_failure_handlers = {}
+
+# Payload key removed from finished jobs (values the handler needs, but the DB shouldn't keep)
+SECRETS_KEY = 'secrets'
+
+# Priorities (lower runs first)
+PRIORITY_HIGH = 10
+PRIORITY_DEFAULT = 100
+PRIORITY_LOW = 200
+
+
+class RetryJob(Exception):
+    """Raise from a handler to reschedule the job after `delay` seconds."""
+
+    def __init__(self, message='', delay=None):
+        super().__init__(message)
+        self.delay = delay
+
+
+class FailJob(Exception):
+    """Raise from a handler to fail the job right away, without using up its retries."""
+
+
+def job_handler(kind, on_failure=None):
+    """
+    Register a function as the handler for jobs of the given kind.
+    on_failure(payload, error) is called if a job of this kind fails permanently.
+    """
+    def decorator(func):
+        _handlers[kind] = func
+        if on_failure is not None:
+            _failure_handlers[kind] = on_failure
+        return func
+    return decorator
+
+
+def enqueue(kind, payload=None, priority=PRIORITY_DEFAULT, delay=0, max_attempts=None):
+    """
+    Add a job to the queue and return it.
+    The job becomes eligible to run `delay` seconds from now.
+    """
+    job = BackgroundJob.objects.create(
+        kind=kind,
+        payload=payload or {},
+        priority=priority,
+        run_after=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+    logger.info(f"Enqueued job {job.kind} #{job.pk}")
+    return job
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_next(worker_id, kinds=None):
+    """
+    Claim the next runnable job for this worker.
+    Jobs stuck in 'running' longer than JOB_LOCK_TIMEOUT (crashed worker) are reclaimed.
+    Returns the claimed BackgroundJob or None.
+    """
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+
+    with transaction.atomic():
+        runnable = (
+            BackgroundJob.objects.select_for_update(skip_locked=True)
+            .filter(run_after__lte=now)
+            .filter(
+                Q(status=BackgroundJob.STATUS_PENDING)
+                | Q(status=BackgroundJob.STATUS_RUNNING, locked_at__lt=stale_before)
+            )
+        )
+        if kinds:
+            runnable = runnable.filter(kind__in=kinds)
+        job = runnable.order_by('priority', 'run_after', 'id').first()
+        if job is None:
+            return None
+
+        # Conditional update so two workers can never claim the same job,
+        # even on backends without SELECT ... FOR UPDATE (SQLite)
+        claimed = BackgroundJob.objects.filter(pk=job.pk, status=job.status, attempts=job.attempts).update(
+            status=BackgroundJob.STATUS_RUNNING,
+            attempts=job.attempts + 1,
+            locked_at=now,
+            locked_by=worker_id,
+            updated_at=now,
+        )
+        if not claimed:
+            return None
+
+    job.refresh_from_db()
+    return job
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter"""
+
+    def __init__(self, base_delay, max_delay):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt):
+        """
+        Delay before retry number `attempt` (1-based): random between half and all of
+        base * 2^(attempt-1), capped at max_delay. Jitter keeps jobs that failed
+        together from retrying together.
+        """
+        ceiling = min(self.base_delay * (2 ** max(attempt - 1, 0)), self.max_delay)
+        return random.uniform(ceiling / 2, ceiling)
+
+
+def retry_delay(attempts):
+    """Backoff before re-running a job that has been attempted `attempts` times"""
+    return RetryPolicy(settings.JOB_RETRY_BASE_DELAY, settings.JOB_RETRY_MAX_DELAY).backoff(attempts)
+
+
+def run_job(job):
+    """
+    Execute a claimed job and record the outcome.
+    Returns the final job status.
+    """
+    handler = _handlers.get(job.kind)
+    if handler is None:
+        logger.error(f"No handler registered for job kind '{job.kind}' (job #{job.pk})")
+        _finish(job, BackgroundJob.STATUS_FAILED, f"Unknown job kind: {job.kind}")
+        return job.status
+
+    logger.info(f"Running job {job.kind} #{job.pk} (attempt {job.attempts}/{job.max_attempts})")
+
+    try:
+        handler(job.payload)
+    except RetryJob as e:
+        delay = e.delay if e.delay is not None else retry_delay(job.attempts)
+        _retry_or_fail(job, str(e) or 'Retry requested', delay)
+    except FailJob as e:
+        logger.error(f"✗ Job {job.kind} #{job.pk} failed: {str(e)}")
+        _finish(job, BackgroundJob.STATUS_FAILED, str(e) or 'Failed')
+        _run_failure_handler(job, str(e))
+    except Exception as e:
+        logger.error(f"✗ Job {job.kind} #{job.pk} raised: {str(e)}")
+        logger.exception("Full exception traceback:")
+        _retry_or_fail(job, traceback.format_exc(), retry_delay(job.attempts))
+    else:
+        logger.info(f"✓ Job {job.kind} #{job.pk} succeeded")
+        _finish(job, BackgroundJob.STATUS_SUCCEEDED, '')
+
+    return job.status
+
+
+def _retry_or_fail(job, error, delay):
+    if job.attempts >= job.max_attempts:
+        logger.error(f"✗ Job {job.kind} #{job.pk} failed permanently after {job.attempts} attempts")
+        _finish(job, BackgroundJob.STATUS_FAILED, error)
+        _run_failure_handler(job, error)
+        return
+
+    logger.warning(f"Job {job.kind} #{job.pk} will retry in {delay:.1f}s")
+    job.status = BackgroundJob.STATUS_PENDING
+    job.run_after = timezone.now() + timedelta(seconds=delay)
+    job.last_error = error
+    job.locked_at = None
+    job.locked_by = ''
+    job.save(update_fields=['status', 'run_after', 'payload', 'last_error', 'locked_at', 'locked_by', 'updated_at'])
+
+
+def _run_failure_handler(job, error):
+    on_failure = _failure_handlers.get(job.kind)
+    if on_failure is None:
+        return
+    try:
+        on_failure(job.payload, error)
+    except Exception:
+        logger.exception(f"on_failure handler for job {job.kind} #{job.pk} raised")
+
+
+def _finish(job, status, error):
+    job.status = status
+    job.payload.pop(SECRETS_KEY, None)
+    job.last_error = error
+    job.locked_at = None
+    job.locked_by = ''
+    job.save(update_fields=['status', 'payload', 'last_error', 'locked_at', 'locked_by', 'updated_at'])
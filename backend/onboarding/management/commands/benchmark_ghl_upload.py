@@ -0,0 +1,109 @@
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import resource
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from onboarding.ghl_client import UPLOAD_CHUNK_SIZE, ghl, ghl_headers
+from onboarding.views import SubmissionCreateView
+
+
+class _SinkHandler(BaseHTTPRequestHandler):
+    """Accepts an upload, discards the body in chunks and answers like GHL"""
+
+    def do_POST(self):
+        remaining = int(self.headers.get('Content-Length', 0))
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, UPLOAD_CHUNK_SIZE)))
+
+        body = json.dumps({'uploadedFiles': {'image': f'http://{self.server.server_address[0]}/uploaded'}}).encode()
+        self.send_response(201)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure peak memory while uploading images to a local GHL stand-in at the same time. "
+        "Run once per mode (ru_maxrss is a per-process high-water mark)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=5, help='Number of concurrent uploads')
+        parser.add_argument('--size-mb', type=int, default=10, help='Size of each image in MB')
+        parser.add_argument(
+            '--buffered', action='store_true',
+            help='Read each file into memory and post it with files= (the previous behaviour), for comparison',
+        )
+
+    def handle(self, *args, **options):
+        count = options['count']
+        size = options['size_mb'] * 1024 * 1024
+
+        workdir = tempfile.mkdtemp(prefix='ghl-upload-bench-')
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _SinkHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_address[1]}'
+
+        try:
+            paths = [self._make_file(workdir, i, size) for i in range(count)]
+            upload = self._buffered_upload if options['buffered'] else self._streaming_upload
+
+            with override_settings(GHL_API_BASE_URL=base_url):
+                rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                tracemalloc.start()
+                started = time.monotonic()
+                with ThreadPoolExecutor(max_workers=count) as executor:
+                    results = list(executor.map(lambda path: upload(base_url, path), paths))
+                elapsed = time.monotonic() - started
+                _, traced_peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        finally:
+            server.shutdown()
+            server.server_close()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        mode = 'buffered' if options['buffered'] else 'streaming'
+        self.stdout.write(f"Mode: {mode}, {count} concurrent uploads of {options['size_mb']} MB")
+        self.stdout.write(f"Succeeded: {sum(1 for result in results if result)}/{count} in {elapsed:.2f}s")
+        self.stdout.write(f"Peak Python allocations (tracemalloc): {traced_peak / 1024 / 1024:.1f} MB")
+        # ru_maxrss is in KB on Linux
+        self.stdout.write(f"Peak RSS: {rss_after / 1024:.1f} MB (+{(rss_after - rss_before) / 1024:.1f} MB during uploads)")
+
+    def _make_file(self, workdir, index, size):
+        path = os.path.join(workdir, f'image_{index}.jpg')
+        with open(path, 'wb') as f:
+            for _ in range(size // UPLOAD_CHUNK_SIZE):
+                f.write(os.urandom(UPLOAD_CHUNK_SIZE))
+        return path
+
+    def _streaming_upload(self, base_url, path):
+        return SubmissionCreateView().upload_image_to_ghl_custom_field(
+            path, 'Benchmark', 'benchmark-location', None, 'benchmark-token', contact_id='benchmark-contact'
+        )
+
+    def _buffered_upload(self, base_url, path):
+        with open(path, 'rb') as f:
+            file_content = f.read()
+        response = ghl.post(
+            f'{base_url}/locations/benchmark-location/customFields/upload',
+            files={'file': (os.path.basename(path), file_content, 'image/jpeg')},
+            data={'id': 'benchmark-contact', 'maxFiles': '15'},
+            headers=ghl_headers('benchmark-token', content_type=None),
+            timeout=60,
+        )
+        return response.status_code in [200, 201]
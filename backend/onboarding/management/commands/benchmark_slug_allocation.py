@@ -0,0 +1,78 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from onboarding.models import CampaignSubmission
+
+
+class Command(BaseCommand):
+    help = (
+        "Count the queries CampaignSubmission slug allocation makes as submissions with the same name pile up. "
+        "Runs in a transaction that is rolled back, under a throwaway name that no real submission has."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--duplicates', default='10,100,1000,5000',
+            help='Comma-separated numbers of existing submissions with the same name',
+        )
+        parser.add_argument('--name', default='John Smith', help='First and last name of the submissions')
+        parser.add_argument(
+            '--legacy', action='store_true',
+            help='Also run the previous exists() loop (one query per taken slug), for comparison',
+        )
+
+    def handle(self, *args, **options):
+        first_name, _, last_name = options['name'].partition(' ')
+        # A unique prefix, so the base slug never collides with existing submissions
+        first_name = f"{uuid.uuid4().hex[:8]}{first_name}"
+        sizes = sorted(int(size) for size in options['duplicates'].split(','))
+
+        with transaction.atomic():
+            candidate = CampaignSubmission(first_name=first_name, last_name=last_name)
+            base_slug = candidate.base_slug()
+            existing = 0
+            for size in sizes:
+                self._add_duplicates(base_slug, first_name, last_name, existing, size)
+                existing = size
+
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    slug = candidate.allocate_slug()
+                    elapsed = time.perf_counter() - started
+                line = f"{size:>7} duplicates: {slug} in {len(queries)} quer{'y' if len(queries) == 1 else 'ies'}, {elapsed * 1000:.1f} ms"
+
+                if options['legacy']:
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        self._legacy_allocate(base_slug)
+                        elapsed = time.perf_counter() - started
+                    line += f" (previous loop: {len(queries)} queries, {elapsed * 1000:.1f} ms)"
+                self.stdout.write(line)
+
+            transaction.set_rollback(True)
+
+    def _add_duplicates(self, base_slug, first_name, last_name, start, stop):
+        # bulk_create skips save(), so the slugs are taken as they would be by earlier submissions
+        CampaignSubmission.objects.bulk_create(
+            [
+                CampaignSubmission(
+                    first_name=first_name, last_name=last_name, email='benchmark@example.com', phone='0',
+                    pillar_1='-', pillar_2='-', pillar_3='-', bio_text='-',
+                    slug=f"{base_slug}{index}" if index else base_slug,
+                )
+                for index in range(start, stop)
+            ],
+            batch_size=500,
+        )
+
+    def _legacy_allocate(self, base_slug):
+        slug = base_slug
+        counter = 1
+        while CampaignSubmission.objects.filter(slug=slug).exists():
+            slug = f"{base_slug}{counter}"
+            counter += 1
+        return slug
@@ -0,0 +1,33 @@
+import os
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from onboarding.prerender import prerender, shell_hash
+from onboarding.serializers import MirrorSerializer
+
+
+class Command(BaseCommand):
+    help = "Write static snapshots of all public campaign pages (run after each frontend deploy)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--slug', action='append', dest='slugs', help='Only render this campaign (repeatable)')
+        parser.add_argument('--prune', action='store_true', help='Delete snapshots built from older frontend shells')
+
+    def handle(self, *args, **options):
+        submissions = MirrorSerializer.queryset().filter(is_password_protected=False).order_by('pk')
+        if options['slugs']:
+            submissions = submissions.filter(slug__in=options['slugs'])
+
+        written = 0
+        for submission in submissions.iterator():
+            if prerender(submission):
+                written += 1
+        self.stdout.write(f"Prerendered {written} page(s) into {settings.PRERENDER_ROOT}/{shell_hash()}")
+
+        if options['prune'] and os.path.isdir(settings.PRERENDER_ROOT):
+            for name in os.listdir(settings.PRERENDER_ROOT):
+                if name != shell_hash():
+                    shutil.rmtree(os.path.join(settings.PRERENDER_ROOT, name), ignore_errors=True)
+                    self.stdout.write(f"Removed stale snapshots {name}")
@@ -0,0 +1,46 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from onboarding.jobs import claim_next, default_worker_id, run_job
+
+
+class Command(BaseCommand):
+    help = "Run the background job worker (GHL provisioning and other queued work)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Process all runnable jobs, then exit')
+        parser.add_argument('--kind', action='append', dest='kinds', help='Only run jobs of this kind (repeatable)')
+        parser.add_argument('--sleep', type=float, default=None, help='Seconds to sleep when the queue is empty')
+
+    def handle(self, *args, **options):
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        worker_id = default_worker_id()
+        poll_interval = options['sleep'] if options['sleep'] is not None else settings.JOB_POLL_INTERVAL
+        kinds = options['kinds']
+
+        self.stdout.write(f"Job worker {worker_id} started")
+
+        while not self._stopping:
+            close_old_connections()
+            job = claim_next(worker_id, kinds=kinds)
+
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            run_job(job)
+
+        self.stdout.write(f"Job worker {worker_id} stopped")
+
+    def _stop(self, signum, frame):
+        # Finish the current job, then exit
+        self._stopping = True
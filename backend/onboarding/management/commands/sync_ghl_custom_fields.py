@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from onboarding.ghl_fields import invalidate_custom_field_ids, refresh_custom_field_ids
+
+
+class Command(BaseCommand):
+    help = "Pre-warm or resync the shared GHL custom-field registry"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--location', action='append', dest='locations',
+            help='GHL location ID to sync (repeatable). Defaults to GHL_OTP_LOCATION_ID',
+        )
+        parser.add_argument('--clear', action='store_true', help='Only drop the cached mapping, do not refetch')
+
+    def handle(self, *args, **options):
+        api_token = settings.GHL_LOCATION_API_TOKEN
+        if not api_token:
+            raise CommandError("GHL_LOCATION_API_TOKEN is not configured")
+
+        locations = options['locations'] or [settings.GHL_OTP_LOCATION_ID]
+        for location_id in locations:
+            if options['clear']:
+                invalidate_custom_field_ids(location_id, api_token)
+                self.stdout.write(f"Cleared custom field IDs for location {location_id}")
+                continue
+
+            field_mapping = refresh_custom_field_ids(location_id, api_token)
+            if not field_mapping:
+                raise CommandError(f"Failed to fetch custom field IDs for location {location_id}")
+            self.stdout.write(self.style.SUCCESS(
+                f"Cached {len(field_mapping)} custom field IDs for location {location_id}"
+            ))
@@ -0,0 +1,93 @@
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.http import FileResponse
+from django.utils.cache import patch_cache_control
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .prerender import snapshot_link_header, snapshot_path
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise that also runs natively under ASGI.
+
+    WhiteNoiseMiddleware is sync-only, which makes Django run every later
+    middleware and the view through a single sync thread - async views would
+    then handle one request at a time. Static lookups are a dict hit, so only
+    serving a file is pushed to a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=None):
+        if settings is None:
+            super().__init__(get_response)
+        else:
+            super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
+
+
+class PrerenderMiddleware:
+    """
+    Serve prerendered public campaign pages (onboarding/prerender.py) for
+    GET/HEAD /temp/<slug>, before sessions, auth or the URL resolver run,
+    straight from disk with no cache or database lookup - the same as a CDN
+    pointed at PRERENDER_ROOT would. Keeping the directory right is up to the
+    writers: protecting a campaign deletes its snapshot on commit, and an edit
+    is re-rendered by the prerender_mirror job (until then the previous public
+    version is served). Slugs without a snapshot fall through to
+    CampaignPageView, which renders the page per request.
+    """
+    sync_capable = True
+    async_capable = True
+
+    path = re.compile(r'^/temp/([A-Za-z0-9_-]+)/?$')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.snapshot_response(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        response = await sync_to_async(self.snapshot_response, thread_sensitive=False)(request)
+        return response or await self.get_response(request)
+
+    def snapshot_response(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        match = self.path.match(request.path_info)
+        if not match:
+            return None
+        slug = match.group(1)
+        try:
+            f = open(snapshot_path(slug), 'rb')
+        except FileNotFoundError:
+            return None
+        response = FileResponse(f, content_type='text/html; charset=utf-8')
+        links = snapshot_link_header(slug)
+        if links:
+            response['Link'] = links
+        # The page changes whenever the campaign is edited
+        patch_cache_control(response, no_cache=True)
+        return response
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.9 on 2026-10-18 05:52
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onboarding', '0011_campaignsubmission_ghl_contact_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaignsubmission',
+            name='provisioning_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='campaignsubmission',
+            name='provisioning_steps',
+            field=models.JSONField(blank=True, default=dict, help_text='Per-step provisioning status: {step: {status, updated_at, error}}'),
+        ),
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('priority', models.SmallIntegerField(default=100)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField(default=3)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('locked_by', models.CharField(blank=True, default='', max_length=100)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['priority', 'run_after', 'id'],
+                'indexes': [models.Index(fields=['status', 'priority', 'run_after'], name='onboarding_job_claim_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 06:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onboarding', '0012_background_jobs_and_provisioning_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaignsubmission',
+            name='ghl_synced_state',
+            field=models.JSONField(blank=True, default=dict, help_text='Contact fields last written to GHL, used to send only changed fields'),
+        ),
+    ]
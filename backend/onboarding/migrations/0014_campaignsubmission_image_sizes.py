@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 06:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onboarding', '0013_campaignsubmission_ghl_synced_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaignsubmission',
+            name='image_sizes',
+            field=models.JSONField(blank=True, default=dict, help_text='Normalized images: {field: {name, original_bytes, optimized_bytes, width, height}}'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.9 on 2026-10-18 06:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onboarding', '0014_campaignsubmission_image_sizes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GHLUploadedFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64)),
+                ('location_id', models.CharField(max_length=100)),
+                ('url', models.URLField(max_length=500)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('content_hash', 'location_id'), name='onboarding_ghl_file_unique')],
+            },
+        ),
+    ]
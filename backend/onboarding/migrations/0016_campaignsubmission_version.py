@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 06:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onboarding', '0015_ghluploadedfile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaignsubmission',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
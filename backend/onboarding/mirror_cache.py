@@ -0,0 +1,112 @@
+"""
+Per-slug cache of the mirror page payload (GET /api/mirror/<slug>/).
+
+Each CampaignSubmission carries a version that save() bumps in the database,
+and the payload is cached under (slug, version). A small pointer entry holds
+the slug's current version: save() moves it forward once the transaction
+commits, so older payloads become unreachable and a request that read the
+row just before a save can never put stale data back under the new version.
+The strong ETag is derived from (pk, version), so If-None-Match is answered
+with a 304 straight from the cache.
+
+Rows changed with QuerySet.update() bypass save() and must call
+publish_version() themselves.
+
+Password-protected pages use the same entries: once a password is checked,
+MirrorView hands out a short-lived signed access token (see access_token),
+which later requests present instead of the password. The token is checked
+against the cached entry alone, and changing the password revokes it.
+"""
+import hashlib
+import hmac
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+
+# Bump when the mirror payload changes shape, so ETags from older code never match
+MIRROR_FORMAT = 4
+
+ACCESS_TOKEN_SALT = 'onboarding.mirror.access'
+
+
+def _version_key(slug):
+    return f"mirror:{MIRROR_FORMAT}:{slug}"
+
+
+def _entry_key(slug, version):
+    return f"mirror:{MIRROR_FORMAT}:{slug}:{version}"
+
+
+def mirror_etag(submission):
+    return f'"{submission.pk}-{submission.version}-{MIRROR_FORMAT}"'
+
+
+def fieldset_etag(etag, fields):
+    """ETag for a sparse fieldset (?fields=) of the payload behind etag"""
+    if not fields:
+        return etag
+    digest = hashlib.sha256(','.join(fields).encode()).hexdigest()[:8]
+    return f'{etag[:-1]}-{digest}"'
+
+
+def _password_digest(password):
+    # Only a keyed digest of the campaign password goes into the shared cache
+    return hmac.new(settings.SECRET_KEY.encode(), (password or '').encode(), hashlib.sha256).hexdigest()
+
+
+def password_matches(entry, provided_password):
+    return hmac.compare_digest(entry['password_digest'], _password_digest(provided_password))
+
+
+def access_token(slug, entry):
+    """Signed token granting access to the slug's protected page until the password changes"""
+    return signing.dumps({'slug': slug, 'pw': entry['password_digest'][:16]}, salt=ACCESS_TOKEN_SALT)
+
+
+def token_grants_access(slug, entry, token):
+    """True if token was issued for this slug and password and is younger than MIRROR_ACCESS_TOKEN_MAX_AGE"""
+    if not token:
+        return False
+    try:
+        claims = signing.loads(token, salt=ACCESS_TOKEN_SALT, max_age=settings.MIRROR_ACCESS_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return (
+        isinstance(claims, dict)
+        and claims.get('slug') == slug
+        and hmac.compare_digest(str(claims.get('pw')), entry['password_digest'][:16])
+    )
+
+
+def get_mirror(slug):
+    """Cached {etag, data, is_password_protected, password_digest} for the slug's current version, or None"""
+    version = cache.get(_version_key(slug))
+    if version is None:
+        return None
+    return cache.get(_entry_key(slug, version))
+
+
+def set_mirror(submission, data):
+    entry = {
+        'etag': mirror_etag(submission),
+        'data': dict(data),
+        'is_password_protected': submission.is_password_protected,
+        'password_digest': _password_digest(submission.password),
+    }
+    cache.set(_entry_key(submission.slug, submission.version), entry, settings.MIRROR_CACHE_TTL)
+    # Never moves the pointer: a newer version published by save() wins
+    cache.add(_version_key(submission.slug), submission.version, settings.MIRROR_CACHE_TTL)
+    return entry
+
+
+def publish_version(slug, version):
+    """Point the slug at a new version (after the saving transaction commits)"""
+    if slug:
+        transaction.on_commit(lambda: cache.set(_version_key(slug), version, settings.MIRROR_CACHE_TTL))
+
+
+def invalidate_mirror(slug):
+    if slug:
+        transaction.on_commit(lambda: cache.delete(_version_key(slug)))
@@ -1,7 +1,17 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, Max, Q, Value
+from django.db.models.functions import LPad, Substr
+from django.utils import timezone
 from django.utils.text import slugify
 import re
 
+from .mirror_cache import invalidate_mirror, publish_version
+
+# Room left after a generated base slug for the numeric suffix of a taken one ("johnsmith12")
+SLUG_SUFFIX_DIGITS = 9
+# Saves retried when a concurrent submission takes the allocated slug first
+SLUG_ALLOCATION_ATTEMPTS = 5
+
 class PillarDescription(models.Model):
     pillar_name = models.CharField(max_length=100, unique=True)
     default_description = models.TextField()
@@ -21,6 +31,24 @@ class CampaignSubmission(models.Model):
         ('traditional', 'Traditional'),
         ('bold', 'Bold'),
     ]
+    
+    PROVISIONING_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    # Columns the public mirror page renders (MirrorSerializer); saves that touch
+    # none of these or the password settings leave the version - and caches - alone
+    MIRROR_FIELDS = [
+        'slug', 'first_name', 'last_name', 'template_style', 'primary_color', 'secondary_color',
+        'pillar_1', 'pillar_1_desc', 'pillar_2', 'pillar_2_desc', 'pillar_3', 'pillar_3_desc',
+        'bio_text', 'position_running_for', 'tag_line', 'donation_url', 'event_calendar_url',
+        'riding_zone_name', 'election_date',
+        'headshot', 'background_picture', 'action_shot_1', 'action_shot_2', 'action_shot_3',
+    ]
+    MIRROR_ACCESS_FIELDS = ['is_password_protected', 'password']
 
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
@@ -69,40 +97,192 @@ class CampaignSubmission(models.Model):
     ghl_location_id = models.CharField(max_length=100, blank=True, null=True, help_text="GoHighLevel Location/Sub-Account ID")
     ghl_contact_id = models.CharField(max_length=100, blank=True, null=True, help_text="GoHighLevel Contact ID for OTP verification")
     
+    # Background GHL provisioning (see onboarding/jobs.py)
+    provisioning_status = models.CharField(max_length=20, choices=PROVISIONING_STATUS_CHOICES, default='pending')
+    provisioning_steps = models.JSONField(default=dict, blank=True, help_text="Per-step provisioning status: {step: {status, updated_at, error}}")
+    ghl_synced_state = models.JSONField(default=dict, blank=True, help_text="Contact fields last written to GHL, used to send only changed fields")
+    image_sizes = models.JSONField(default=dict, blank=True, help_text="Normalized images: {field: {name, original_bytes, optimized_bytes, width, height}}")
+    
+    # Bumped on every save; keys the mirror cache and ETag (see onboarding/mirror_cache.py)
+    version = models.PositiveIntegerField(default=1, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
 
+    @staticmethod
+    def clean_custom_slug(value):
+        """custom_slug reduced to lowercase letters and digits, or None if fewer than 3 remain"""
+        custom_cleaned = re.sub(r'[^a-zA-Z0-9]', '', (value or '').lower())
+        return custom_cleaned if len(custom_cleaned) >= 3 else None
+    
+    def base_slug(self):
+        # Always generate from first_name + last_name (ignore custom_slug for auto-generation)
+        # Simple: first_name + last_name, lowercase, remove non-alphanumeric
+        first = (self.first_name or '').strip()
+        last = (self.last_name or '').strip()
+        combined = f"{first}{last}".lower()
+        base_slug = re.sub(r'[^a-zA-Z0-9]', '', combined)
+        
+        # If custom_slug was manually provided and is valid, use it instead
+        custom_cleaned = self.clean_custom_slug(self.custom_slug)
+        if custom_cleaned:
+            base_slug = custom_cleaned
+        
+        # Ensure we have a valid slug (leaving room for a numeric suffix)
+        return base_slug[:self._meta.get_field('slug').max_length - SLUG_SUFFIX_DIGITS] or "campaign"
+    
+    def allocate_slug(self):
+        """
+        The base slug if it is free, otherwise the base plus one more than the
+        highest numeric suffix in use - found with one query over the slug index
+        """
+        base_slug = self.base_slug()
+        max_length = self._meta.get_field('slug').max_length
+        # The LIKE prefix narrows the scan on the slug index; the regex keeps only base + digits.
+        # Suffixes have no digit limit (custom slugs can end in any number), so they are
+        # compared as zero-padded strings rather than cast to an integer column.
+        taken = CampaignSubmission.objects.filter(
+            slug__startswith=base_slug, slug__regex=rf'^{base_slug}[0-9]*$'
+        ).exclude(pk=self.pk).aggregate(
+            base_taken=Count('pk', filter=Q(slug=base_slug)),
+            highest=Max(LPad(Substr('slug', len(base_slug) + 1), max_length, Value('0'))),
+        )
+        if not taken['base_taken']:
+            return base_slug
+        return f"{base_slug}{int(taken['highest'] or 0) + 1}"
+    
     def save(self, *args, **kwargs):
-        if not self.slug:
-            # Always generate from first_name + last_name (ignore custom_slug for auto-generation)
-            # Simple: first_name + last_name, lowercase, remove non-alphanumeric
-            first = (self.first_name or '').strip()
-            last = (self.last_name or '').strip()
-            combined = f"{first}{last}".lower()
-            base_slug = re.sub(r'[^a-zA-Z0-9]', '', combined)
-            
-            # If custom_slug was manually provided and is valid, use it instead
-            if self.custom_slug and self.custom_slug.strip():
-                custom_cleaned = re.sub(r'[^a-zA-Z0-9]', '', self.custom_slug.lower())
-                if custom_cleaned and len(custom_cleaned) >= 3:  # Only use if it's at least 3 chars
-                    base_slug = custom_cleaned
-            
-            # Ensure we have a valid slug
-            if not base_slug:
-                base_slug = "campaign"
-            
-            # If slug exists, add a number
-            slug = base_slug
-            counter = 1
-            while CampaignSubmission.objects.filter(slug=slug).exclude(pk=self.pk if self.pk else None).exists():
-                slug = f"{base_slug}{counter}"
-                counter += 1
-            self.slug = slug
+        allocating_slug = not self.slug
+        if allocating_slug:
+            self.slug = self.allocate_slug()
         
         # Set default password if password protection is enabled but password is not set
         if self.is_password_protected and not self.password:
             self.password = "run"
         
-        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        adding = self._state.adding
+        bump_version = not adding and (
+            update_fields is None
+            or not set(update_fields).isdisjoint(self.MIRROR_FIELDS + self.MIRROR_ACCESS_FIELDS)
+        )
+        if bump_version:
+            # Incremented in the database so concurrent saves never share a version
+            self.version = models.F('version') + 1
+            if update_fields is not None and 'version' not in update_fields:
+                kwargs['update_fields'] = [*update_fields, 'version']
+        
+        if allocating_slug:
+            self._save_with_slug_retry(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+        
+        if bump_version:
+            self.refresh_from_db(fields=['version'])
+            publish_version(self.slug, self.version)
+        if adding or bump_version:
+            # Imported here to avoid a circular import (prerender -> serializers -> models)
+            from .prerender import remove_snapshot, schedule_prerender
+            if self.is_password_protected:
+                # Right away, not in the job: a public snapshot must never outlive protection
+                slug = self.slug
+                transaction.on_commit(lambda: remove_snapshot(slug))
+            schedule_prerender(self)
+    
+    def _save_with_slug_retry(self, *args, **kwargs):
+        """Save, allocating the next slug again if a concurrent save took this one"""
+        for attempt in range(SLUG_ALLOCATION_ATTEMPTS):
+            try:
+                # Savepoint, so a collision doesn't break the caller's transaction
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                collided = CampaignSubmission.objects.filter(slug=self.slug).exclude(pk=self.pk).exists()
+                if not collided or attempt == SLUG_ALLOCATION_ATTEMPTS - 1:
+                    raise
+                self.slug = self.allocate_slug()
+    
+    def delete(self, *args, **kwargs):
+        from .prerender import remove_snapshot
+
+        slug = self.slug
+        result = super().delete(*args, **kwargs)
+        invalidate_mirror(slug)
+        transaction.on_commit(lambda: remove_snapshot(slug))
+        return result
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.slug})"
+
+
+class BackgroundJob(models.Model):
+    """
+    DB-backed job queue entry. Jobs are claimed and executed by
+    `python manage.py run_jobs` (see onboarding/jobs.py).
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    # Lower runs first
+    priority = models.SmallIntegerField(default=100)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    last_error = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    class Meta:
+        ordering = ['priority', 'run_after', 'id']
+        indexes = [
+            models.Index(fields=['status', 'priority', 'run_after'], name='onboarding_job_claim_idx'),
+        ]
+
+
+class GHLUploadedFile(models.Model):
+    """
+    Index of images already uploaded to GHL, keyed by content hash, so an
+    identical image is never sent to /customFields/upload twice
+    """
+    content_hash = models.CharField(max_length=64)
+    location_id = models.CharField(max_length=100)
+    url = models.URLField(max_length=500)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.content_hash[:12]} @ {self.location_id}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['content_hash', 'location_id'], name='onboarding_ghl_file_unique'),
+        ]
+
+
+class Counter(models.Model):
+    """
+    Expiring integer counter for rate and attempt limits when no Redis is
+    configured (see onboarding/counters.py). Changed only with single UPDATE
+    statements, so concurrent increments are never lost.
+    """
+    key = models.CharField(max_length=250, unique=True)
+    value = models.BigIntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
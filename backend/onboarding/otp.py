@@ -0,0 +1,200 @@
+"""
+Local OTP store.
+
+OTPs are kept in the shared Django cache, never in plain text: only an HMAC
+of (phone, code) keyed with SECRET_KEY is stored, together with the GHL
+contact ID. Codes expire after OTP_TTL_SECONDS, allow OTP_MAX_ATTEMPTS wrong
+guesses (an atomic counter, see onboarding/counters.py) and are single-use.
+Verification is a local cache lookup; GHL's app_otp custom field is only
+written (for the SMS workflow), never read.
+
+Requests for the same phone are single-flight: while a dispatch is in flight
+(OTP_SINGLE_FLIGHT_SECONDS) repeat requests get its request_id instead of a
+new code and new GHL calls. The request_id is issued when the slot is taken,
+before the job is queued, so repeat requests never wait for the first one.
+"""
+import hashlib
+import hmac
+import logging
+import re
+import secrets
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+from .counters import delete_counters, incr_counter
+
+logger = logging.getLogger(__name__)
+
+OTP_VERIFIED = 'verified'
+OTP_INVALID = 'invalid'
+OTP_EXPIRED = 'expired'
+OTP_LOCKED = 'locked'
+
+# Delivery status of an OTP request (the contact upsert + SMS run as a job)
+OTP_DISPATCH_PENDING = 'pending'
+OTP_DISPATCH_SENT = 'sent'
+OTP_DISPATCH_FAILED = 'failed'
+
+DISPATCH_HANDLE_SALT = 'onboarding.otp.dispatch'
+
+# What a request_id stands for before (or instead of) a queued job
+DISPATCH_QUEUEING = 'queueing'
+DISPATCH_ABANDONED = 'abandoned'
+
+
+class OTPResult:
+    def __init__(self, status, contact_id=None):
+        self.status = status
+        self.contact_id = contact_id
+
+    @property
+    def verified(self):
+        return self.status == OTP_VERIFIED
+
+
+def normalize_phone(phone):
+    """E.164-style +<digits>, so '+1 (555) 123-4567' and '15551234567' are the same phone"""
+    return f"+{re.sub(r'[^0-9]', '', phone or '')}"
+
+
+def generate_otp():
+    """Random 4-digit code from a CSPRNG"""
+    return str(1000 + secrets.randbelow(9000))
+
+
+def _phone_hash(phone):
+    return hashlib.sha256(normalize_phone(phone).encode()).hexdigest()
+
+
+def _keys(phone):
+    phone_hash = _phone_hash(phone)
+    return f"otp:{phone_hash}", f"otp:{phone_hash}:attempts"
+
+
+def _dispatch_key(phone):
+    return f"otp:{_phone_hash(phone)}:dispatch"
+
+
+def _code_hash(phone, code):
+    message = f"{normalize_phone(phone)}:{str(code).strip()}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def store_otp(phone, code, contact_id=None):
+    """Store a new OTP for the phone, replacing any previous one and resetting attempts"""
+    otp_key, attempts_key = _keys(phone)
+    delete_counters(attempts_key)
+    cache.set(otp_key, {'hash': _code_hash(phone, code), 'contact_id': contact_id}, settings.OTP_TTL_SECONDS)
+
+
+def attach_contact_id(phone, contact_id):
+    """Record the GHL contact ID on the active OTP once the background upsert finishes"""
+    otp_key, _ = _keys(phone)
+    stored = cache.get(otp_key)
+    if stored:
+        stored['contact_id'] = contact_id
+        cache.set(otp_key, stored, settings.OTP_TTL_SECONDS)
+
+
+def _handle_key(token):
+    return f"otp:dispatch:{token}"
+
+
+def dispatch_handle():
+    """New opaque, tamper-proof request_id for polling an OTP dispatch"""
+    return signing.dumps(secrets.token_urlsafe(12), salt=DISPATCH_HANDLE_SALT)
+
+
+def job_id_from_handle(handle):
+    """
+    Job ID of the dispatch behind a request_id: DISPATCH_QUEUEING until its job
+    is queued, DISPATCH_ABANDONED if it never will be, None if the handle is
+    invalid or older than the OTP itself.
+    """
+    try:
+        token = signing.loads(handle, salt=DISPATCH_HANDLE_SALT, max_age=settings.OTP_TTL_SECONDS)
+    except signing.BadSignature:
+        return None
+    return cache.get(_handle_key(token), DISPATCH_QUEUEING)
+
+
+def join_dispatch(phone):
+    """
+    Single-flight guard for OTP requests, shared by all workers through the
+    cache. Never waits: returns (request_id, joined). joined is False when the
+    caller took the slot and must queue the dispatch under request_id (then
+    call start_dispatch, or release_dispatch if that fails); otherwise
+    request_id belongs to the dispatch already in flight for this phone.
+    """
+    key = _dispatch_key(phone)
+    request_id = dispatch_handle()
+    while not cache.add(key, request_id, settings.OTP_SINGLE_FLIGHT_SECONDS):
+        in_flight = cache.get(key)
+        if in_flight is not None:
+            return in_flight, True
+        # Slot expired or was released between add() and get() - try again
+    return request_id, False
+
+
+def dispatch_in_flight(phone):
+    """request_id of the dispatch holding the phone's single-flight slot, if any"""
+    return cache.get(_dispatch_key(phone))
+
+
+def start_dispatch(request_id, job_id):
+    """Attach the queued job to request_id, for everyone polling it"""
+    token = signing.loads(request_id, salt=DISPATCH_HANDLE_SALT)
+    cache.set(_handle_key(token), job_id, settings.OTP_TTL_SECONDS)
+
+
+def release_dispatch(phone, request_id):
+    """
+    Free the slot if it still belongs to request_id (its dispatch failed), so a
+    new OTP can be sent. A request_id that never got a job is marked abandoned.
+    """
+    key = _dispatch_key(phone)
+    if cache.get(key) == request_id:
+        cache.delete(key)
+    token = signing.loads(request_id, salt=DISPATCH_HANDLE_SALT)
+    cache.add(_handle_key(token), DISPATCH_ABANDONED, settings.OTP_TTL_SECONDS)
+
+
+def _is_backup_code(code):
+    backup_code = settings.BACKUP_OTP_CODE
+    return bool(backup_code) and hmac.compare_digest(str(code).strip(), str(backup_code).strip())
+
+
+def verify_otp(phone, code):
+    """
+    Check a code against the stored OTP. A correct code consumes the OTP; after
+    OTP_MAX_ATTEMPTS wrong codes it is discarded and a new one must be requested.
+    """
+    otp_key, attempts_key = _keys(phone)
+    stored = cache.get(otp_key)
+
+    if _is_backup_code(code):
+        logger.info(f"✓ Backup OTP code used for {normalize_phone(phone)}")
+        cache.delete(otp_key)
+        delete_counters(attempts_key)
+        return OTPResult(OTP_VERIFIED, stored.get('contact_id') if stored else None)
+
+    if not stored:
+        return OTPResult(OTP_EXPIRED)
+
+    # Atomic, so parallel guesses each use up an attempt
+    attempts = incr_counter(attempts_key, settings.OTP_TTL_SECONDS)
+    if attempts > settings.OTP_MAX_ATTEMPTS:
+        cache.delete(otp_key)
+        delete_counters(attempts_key)
+        return OTPResult(OTP_LOCKED)
+
+    if not hmac.compare_digest(stored['hash'], _code_hash(phone, code)):
+        return OTPResult(OTP_INVALID)
+
+    # Only the request that actually deletes the OTP may use it
+    if not cache.delete(otp_key):
+        return OTPResult(OTP_EXPIRED)
+    delete_counters(attempts_key)
+    return OTPResult(OTP_VERIFIED, stored.get('contact_id'))
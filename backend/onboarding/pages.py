@@ -0,0 +1,103 @@
+"""
+Server-rendered HTML for public campaign pages (/temp/<slug>).
+
+The React templates only render in the browser, so the server sends the SPA
+shell (index.html) with a campaign-specific <head>: title, description,
+Open Graph / Twitter card tags for link previews (with the generated share
+card from onboarding/share_card.py), the campaign colours as CSS
+variables, preloads for the above-the-fold images and the mirror payload
+inlined as JSON for MirrorPage. The same HTML is written to disk by
+onboarding/prerender.py and rendered per request by CampaignPageView.
+
+Everything is built from the cached mirror payload (MirrorSerializer data),
+never from the model, so rendering a page needs no database read.
+"""
+import re
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.html import escape
+
+from .share_card import CARD_HEIGHT, CARD_WIDTH, share_card_url
+
+SHELL_TEMPLATE = 'index.html'
+HEAD_TEMPLATE = 'onboarding/mirror_head.html'
+# Bump when the rendered <head> changes, so prerendered snapshots are rebuilt
+PAGE_FORMAT = 2
+
+_title = re.compile(r'<title>.*?</title>', re.S)
+
+
+def absolute_url(path):
+    """Crawlers need absolute URLs for og:image / og:url"""
+    if not path or path.startswith(('http://', 'https://')):
+        return path
+    return f"{settings.BASE_URL.rstrip('/')}/{path.lstrip('/')}"
+
+
+def page_title(data):
+    title = f"{data.get('first_name') or ''} {data.get('last_name') or ''}".strip()
+    if data.get('tag_line'):
+        title = f"{title} - {data['tag_line']}"
+    return title
+
+
+def page_description(data):
+    return data.get('position_running_for') or (data.get('bio_text') or '')[:160]
+
+
+def preloads(data):
+    """Above-the-fold images: the hero background (a CSS background, so src only) and the headshot"""
+    renditions = data.get('image_renditions') or {}
+    images = []
+    if data.get('background_picture'):
+        images.append({'href': renditions.get('background_picture', {}).get('src') or data['background_picture']})
+    if data.get('headshot'):
+        headshot = renditions.get('headshot', {})
+        images.append({'href': headshot.get('src') or data['headshot'], 'srcset': headshot.get('srcset')})
+    return images
+
+
+def share_image(data):
+    """Image for link previews (og:image): the generated share card, else a campaign photo"""
+    card_url = share_card_url(data)
+    if card_url:
+        return {'url': absolute_url(card_url), 'width': CARD_WIDTH, 'height': CARD_HEIGHT}
+    renditions = data.get('image_renditions') or {}
+    for field in ('headshot', 'background_picture'):
+        if data.get(field):
+            return {'url': absolute_url(renditions.get(field, {}).get('src') or data[field])}
+    return None
+
+
+def link_header(data):
+    """Link: rel=preload header value for the page's images (CDNs can turn these into 103 Early Hints)"""
+    links = []
+    for image in preloads(data):
+        link = f"<{image['href']}>; rel=preload; as=image"
+        if image.get('srcset'):
+            link += f'; imagesrcset="{image["srcset"]}"'
+        links.append(link)
+    return ', '.join(links)
+
+
+def render_shell():
+    return render_to_string(SHELL_TEMPLATE)
+
+
+def render_page(data):
+    """Full HTML for a public (not password-protected) campaign page"""
+    title = page_title(data)
+    head = render_to_string(HEAD_TEMPLATE, {
+        'data': data,
+        'title': title,
+        'description': page_description(data),
+        'url': absolute_url(f"/temp/{data['slug']}"),
+        'image': share_image(data),
+        'preloads': preloads(data),
+        'primary_color': data.get('primary_color'),
+        'secondary_color': data.get('secondary_color'),
+    })
+    # A function replacement: the title is user input and may contain backslashes
+    shell = _title.sub(lambda _match: f'<title>{escape(title)}</title>', render_shell(), count=1)
+    return shell.replace('</head>', f'{head}</head>', 1)
@@ -0,0 +1,121 @@
+"""
+Static snapshots of public campaign pages (/temp/<slug>).
+
+When a submission is created or its mirror version changes, a background job
+writes PRERENDER_ROOT/<shell>/<slug>/index.html: the server-rendered page
+from onboarding/pages.py (SPA shell with the mirror payload inlined as JSON,
+campaign title, link-preview tags, colours and image preloads). MirrorPage
+reads the inlined payload instead of calling /api/mirror/, and
+PrerenderMiddleware (or a CDN pointed at the directory) serves the file
+without touching the cache or the database, so the directory itself must
+never hold a page that shouldn't be public: protected campaigns' snapshots are
+deleted when they are saved, and a render that a newer save overtook is
+redone. The same job renders the campaign's share
+card (onboarding/share_card.py).
+
+<shell> is a hash of the SPA shell and pages.PAGE_FORMAT, so a frontend
+deploy (new bundle names) simply stops matching older snapshots;
+`manage.py prerender_mirrors` rebuilds them. Password-protected campaigns are never snapshotted.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+
+from .jobs import enqueue
+from .pages import PAGE_FORMAT, link_header, render_page, render_shell
+from .serializers import MirrorSerializer
+from .share_card import generate_share_card, remove_share_cards
+
+logger = logging.getLogger(__name__)
+
+VERSION_FILE = 'version'
+# Link header for the snapshot (image preloads), served alongside it
+LINK_FILE = 'link'
+
+
+@lru_cache(maxsize=1)
+def shell_hash():
+    """Hash of the built SPA shell and page format, computed once per process"""
+    return hashlib.sha256(f"{PAGE_FORMAT}:{render_shell()}".encode()).hexdigest()[:12]
+
+
+def snapshot_dir(slug):
+    return os.path.join(settings.PRERENDER_ROOT, shell_hash(), slug)
+
+
+def snapshot_path(slug):
+    return os.path.join(snapshot_dir(slug), 'index.html')
+
+
+def snapshot_link_header(slug):
+    try:
+        with open(os.path.join(snapshot_dir(slug), LINK_FILE)) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return ''
+
+
+def rendered_version(slug):
+    try:
+        with open(os.path.join(snapshot_dir(slug), VERSION_FILE)) as f:
+            return int(f.read().strip())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_atomic(path, content):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def prerender(submission):
+    """
+    Write (or remove) the snapshot for the submission.
+    Returns True if a new snapshot was written.
+    """
+    if submission.is_password_protected:
+        remove_snapshot(submission.slug)
+        return False
+    if rendered_version(submission.slug) == submission.version:
+        return False
+
+    data = MirrorSerializer(submission).data
+    # The card first, so the page can point og:image at it
+    generate_share_card(submission, data)
+    html = render_page(data)
+    os.makedirs(snapshot_dir(submission.slug), exist_ok=True)
+    # Page first, then the marker: if this stops in between, the next run renders again
+    _write_atomic(snapshot_path(submission.slug), html)
+    _write_atomic(os.path.join(snapshot_dir(submission.slug), LINK_FILE), link_header(data))
+    _write_atomic(os.path.join(snapshot_dir(submission.slug), VERSION_FILE), str(submission.version))
+    logger.info(f"Prerendered /temp/{submission.slug} (version {submission.version}, {len(html)} bytes)")
+
+    # Snapshots are served without any check, so one written from data that was
+    # saved over meanwhile (an edit, or protection) must not stay: that save's own
+    # job may already have run
+    current = type(submission).objects.filter(pk=submission.pk).first()
+    if current is None:
+        remove_snapshot(submission.slug)
+    elif current.version != submission.version or current.is_password_protected:
+        prerender(current)
+    return True
+
+
+def remove_snapshot(slug):
+    """Delete the slug's page snapshot and share cards"""
+    if slug:
+        shutil.rmtree(snapshot_dir(slug), ignore_errors=True)
+        remove_share_cards(slug)
+
+
+def schedule_prerender(submission):
+    """Queue a snapshot rebuild for the submission once the current transaction commits"""
+    transaction.on_commit(lambda: enqueue('prerender_mirror', {'submission_id': submission.pk}))
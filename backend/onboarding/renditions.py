@@ -0,0 +1,206 @@
+"""
+Resized/re-encoded variants of campaign images for the mirror page.
+
+Renditions are generated on first request and kept in a size-bounded disk
+cache (RENDITION_CACHE_DIR). A hit refreshes the file's mtime; when the cache
+grows past RENDITION_CACHE_MAX_BYTES the least recently used files are
+deleted until it is back under RENDITION_CACHE_LOW_WATER of the limit.
+"""
+from io import BytesIO
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+from django.urls import reverse
+from PIL import Image, ImageOps, features
+
+from .images import IMAGE_FIELDS
+
+logger = logging.getLogger(__name__)
+
+FORMAT_JPEG = 'jpeg'
+FORMAT_WEBP = 'webp'
+FORMAT_AVIF = 'avif'
+
+FORMATS = {
+    FORMAT_JPEG: {'pil': 'JPEG', 'content_type': 'image/jpeg', 'ext': '.jpg'},
+    FORMAT_WEBP: {'pil': 'WEBP', 'content_type': 'image/webp', 'ext': '.webp'},
+    FORMAT_AVIF: {'pil': 'AVIF', 'content_type': 'image/avif', 'ext': '.avif'},
+}
+
+RENDITION_CACHE_LOW_WATER = 0.9
+# Full-bleed hero backgrounds default to a wider src than inline images
+BACKGROUND_DEFAULT_WIDTH = 1920
+# Bytes written by this process since the cache size was last checked
+_written_since_check = 0
+_evict_lock = threading.Lock()
+
+
+def supported_formats():
+    """Formats this Pillow build can encode, best first"""
+    formats = []
+    if features.check('avif'):
+        formats.append(FORMAT_AVIF)
+    if features.check('webp'):
+        formats.append(FORMAT_WEBP)
+    formats.append(FORMAT_JPEG)
+    return formats
+
+
+def negotiate_format(accept_header, requested=None):
+    """
+    Pick the output format: an explicit supported ?format= wins, otherwise the
+    best format the client lists in Accept, falling back to JPEG
+    """
+    available = supported_formats()
+    if requested in available:
+        return requested
+    accept = (accept_header or '').lower()
+    for fmt in available:
+        if FORMATS[fmt]['content_type'] in accept:
+            return fmt
+    return FORMAT_JPEG
+
+
+def snap_width(width):
+    """Round a requested width up to the nearest configured rendition width"""
+    widths = settings.IMAGE_RENDITION_WIDTHS
+    for candidate in widths:
+        if width <= candidate:
+            return candidate
+    return widths[-1]
+
+
+def clamp_quality(quality):
+    low, high = settings.IMAGE_RENDITION_QUALITY_RANGE
+    return max(low, min(high, quality))
+
+
+def image_version(image_field):
+    """Short hash of the stored file name - changes whenever the image is replaced"""
+    return hashlib.sha256(image_field.name.encode()).hexdigest()[:12]
+
+
+def _cache_path(image_field, width, quality, fmt):
+    key = hashlib.sha256(f"{image_field.name}|{width}|{quality}|{fmt}".encode()).hexdigest()
+    return os.path.join(settings.RENDITION_CACHE_DIR, key[:2], f"{key}{FORMATS[fmt]['ext']}")
+
+
+def _render(image_field, width, quality, fmt):
+    image_field.open('rb')
+    try:
+        with Image.open(image_field) as image:
+            image.draft('RGB', (width, width))
+            image = ImageOps.exif_transpose(image)
+            # Height is left unconstrained; images are never upscaled
+            image.thumbnail((width, image.height), Image.LANCZOS)
+
+            output = BytesIO()
+            if fmt == FORMAT_JPEG:
+                image.convert('RGB').save(output, 'JPEG', quality=quality, optimize=True, progressive=True)
+            else:
+                mode = 'RGBA' if image.mode in ('RGBA', 'LA', 'PA', 'P') else 'RGB'
+                image.convert(mode).save(output, FORMATS[fmt]['pil'], quality=quality)
+            return output.getvalue()
+    finally:
+        image_field.close()
+
+
+def get_rendition(image_field, width, quality, fmt):
+    """
+    Return the path of the cached rendition, generating it on a miss
+    """
+    path = _cache_path(image_field, width, quality, fmt)
+    try:
+        # Bump the mtime so LRU eviction keeps recently served renditions
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        pass
+
+    content = _render(image_field, width, quality, fmt)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temp file and rename so readers never see a partial rendition
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    logger.debug(f"Generated rendition {path} ({len(content)} bytes)")
+
+    _note_written(len(content))
+    return path
+
+
+def _note_written(size):
+    global _written_since_check
+    with _evict_lock:
+        _written_since_check += size
+        # Scanning the cache is O(files), so only do it after a meaningful amount of writes
+        if _written_since_check < settings.RENDITION_CACHE_MAX_BYTES * (1 - RENDITION_CACHE_LOW_WATER) / 2:
+            return
+        _written_since_check = 0
+    evict()
+
+
+def evict():
+    """Delete least recently used renditions until the cache fits the size limit"""
+    entries = []
+    total = 0
+    for root, _dirs, files in os.walk(settings.RENDITION_CACHE_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+    if total <= settings.RENDITION_CACHE_MAX_BYTES:
+        return 0
+
+    target = settings.RENDITION_CACHE_MAX_BYTES * RENDITION_CACHE_LOW_WATER
+    removed = 0
+    for _mtime, size, path in sorted(entries):
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        total -= size
+        removed += 1
+    logger.info(f"Evicted {removed} renditions, cache now {total} bytes")
+    return removed
+
+
+def rendition_url(submission, field_name, width=None):
+    url = reverse('image-rendition', kwargs={'slug': submission.slug, 'field': field_name})
+    image_field = getattr(submission, field_name)
+    params = f"v={image_version(image_field)}"
+    if width:
+        params += f"&w={width}"
+    return f"{url}?{params}"
+
+
+def submission_renditions(submission):
+    """
+    srcset-ready rendition URLs for each uploaded image:
+    {field: {'src': url, 'srcset': 'url 320w, url 640w, ...'}}
+    """
+    renditions = {}
+    widths = settings.IMAGE_RENDITION_WIDTHS
+    for field_name in IMAGE_FIELDS:
+        if not getattr(submission, field_name):
+            continue
+        max_width = settings.IMAGE_MAX_DIMENSIONS[field_name][0]
+        field_widths = [width for width in widths if width < max_width] + [max_width]
+        default_width = BACKGROUND_DEFAULT_WIDTH if field_name == 'background_picture' else settings.IMAGE_RENDITION_DEFAULT_WIDTH
+        renditions[field_name] = {
+            'src': rendition_url(submission, field_name, snap_width(min(max_width, default_width))),
+            'srcset': ', '.join(f"{rendition_url(submission, field_name, width)} {width}w" for width in field_widths),
+        }
+    return renditions
@@ -1,9 +1,49 @@
 from rest_framework import serializers
 from .models import CampaignSubmission
+from .renditions import submission_renditions
 
 class CampaignSubmissionSerializer(serializers.ModelSerializer):
+    # srcset-ready rendition URLs per uploaded image (see onboarding/renditions.py)
+    image_renditions = serializers.SerializerMethodField()
+    
     class Meta:
         model = CampaignSubmission
         fields = '__all__'
-        read_only_fields = ('slug', 'created_at', 'otp_verified', 'otp_code', 'ghl_location_id')
+        read_only_fields = ('slug', 'created_at', 'otp_verified', 'otp_code', 'ghl_location_id', 'provisioning_status', 'provisioning_steps', 'ghl_synced_state', 'image_sizes', 'version')
         # ghl_contact_id is now writable so it can be set from OTP verification
+    
+    def get_image_renditions(self, obj):
+        if not obj.slug:
+            return {}
+        return submission_renditions(obj)
+
+
+class MirrorSerializer(serializers.ModelSerializer):
+    """
+    Public read-only projection for the mirror page: only what the templates
+    render, none of the contact, OTP, password or GHL columns.
+    Pass fields=[...] for a sparse fieldset.
+    """
+    image_renditions = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = CampaignSubmission
+        fields = CampaignSubmission.MIRROR_FIELDS + ['image_renditions']
+        read_only_fields = fields
+    
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+    
+    def get_image_renditions(self, obj):
+        return submission_renditions(obj)
+    
+    @classmethod
+    def queryset(cls):
+        """Submissions loading only the columns the mirror payload and its access check need"""
+        return CampaignSubmission.objects.only(
+            *CampaignSubmission.MIRROR_FIELDS, *CampaignSubmission.MIRROR_ACCESS_FIELDS, 'version'
+        )
+
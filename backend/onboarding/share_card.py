@@ -0,0 +1,184 @@
+"""
+Open Graph share images (og:image) for public campaign pages.
+
+A 1200x630 card - headshot, name, position and tag line on the campaign
+colours - is rendered with Pillow by the prerender_mirror job and stored
+under MEDIA_ROOT/share_cards/<slug>/<digest>.jpg. The digest covers every
+input of the card, so a card is rendered once per content version and edits
+that don't show on it (bio, pillars, ...) reuse the existing file. Crawlers
+only ever fetch that precomputed file; until it exists pages fall back to the
+headshot rendition.
+"""
+from io import BytesIO
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from PIL import Image, ImageColor, ImageDraw, ImageFont, ImageOps
+
+logger = logging.getLogger(__name__)
+
+CARD_WIDTH = 1200
+CARD_HEIGHT = 630
+CARD_DIR = 'share_cards'
+# Bump when the card layout changes, so every campaign gets a new card
+CARD_FORMAT = 1
+CARD_FIELDS = ['first_name', 'last_name', 'position_running_for', 'tag_line', 'primary_color', 'secondary_color', 'headshot']
+
+MARGIN = 60
+HEADSHOT_SIZE = 420
+ACCENT_HEIGHT = 18
+
+
+def card_digest(data):
+    """Hash of everything drawn on the card (mirror payload fields)"""
+    values = [str(CARD_FORMAT)] + [str(data.get(name) or '') for name in CARD_FIELDS]
+    return hashlib.sha256('|'.join(values).encode()).hexdigest()[:16]
+
+
+def _card_name(data):
+    return f"{CARD_DIR}/{data['slug']}/{card_digest(data)}.jpg"
+
+
+def card_path(data):
+    return os.path.join(settings.MEDIA_ROOT, _card_name(data))
+
+
+def share_card_url(data):
+    """URL of the card for this payload, or None if it hasn't been rendered yet"""
+    if not os.path.exists(card_path(data)):
+        return None
+    return f"{settings.MEDIA_URL}{_card_name(data)}"
+
+
+def _color(value, default):
+    try:
+        return ImageColor.getrgb(value)
+    except (ValueError, AttributeError):
+        return ImageColor.getrgb(default)
+
+
+def _text_color(background):
+    # Relative luminance decides between light and dark text
+    r, g, b = background
+    return (20, 20, 20) if 0.299 * r + 0.587 * g + 0.114 * b > 160 else (255, 255, 255)
+
+
+def _font(path, size):
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError:
+        return ImageFont.load_default(size)
+
+
+def _wrap(draw, text, font, width, max_lines):
+    """Greedy word wrap to max_lines, ending with an ellipsis when cut"""
+    lines = []
+    words = text.split()
+    while words and len(lines) < max_lines:
+        line = words.pop(0)
+        while words and draw.textlength(f"{line} {words[0]}", font=font) <= width:
+            line = f"{line} {words.pop(0)}"
+        lines.append(line)
+    if words and lines:
+        last = lines[-1]
+        while last and draw.textlength(f"{last}…", font=font) > width:
+            last = last[:-1]
+        lines[-1] = f"{last.rstrip()}…"
+    return lines
+
+
+def _headshot(image_field):
+    image_field.open('rb')
+    try:
+        with Image.open(image_field) as image:
+            image.draft('RGB', (HEADSHOT_SIZE, HEADSHOT_SIZE))
+            image = ImageOps.exif_transpose(image).convert('RGB')
+            image = ImageOps.fit(image, (HEADSHOT_SIZE, HEADSHOT_SIZE), Image.LANCZOS, centering=(0.5, 0.35))
+    finally:
+        image_field.close()
+    mask = Image.new('L', (HEADSHOT_SIZE * 4, HEADSHOT_SIZE * 4), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, mask.width, mask.height), fill=255)
+    image.putalpha(mask.resize(image.size, Image.LANCZOS))
+    return image
+
+
+def render_card(submission, data):
+    """JPEG bytes of the card for a submission and its mirror payload"""
+    primary = _color(data.get('primary_color'), '#0d6efd')
+    secondary = _color(data.get('secondary_color'), '#6c757d')
+    text = _text_color(primary)
+
+    card = Image.new('RGB', (CARD_WIDTH, CARD_HEIGHT), primary)
+    draw = ImageDraw.Draw(card)
+    draw.rectangle((0, CARD_HEIGHT - ACCENT_HEIGHT, CARD_WIDTH, CARD_HEIGHT), fill=secondary)
+
+    text_left = MARGIN
+    if submission.headshot:
+        try:
+            headshot = _headshot(submission.headshot)
+            top = (CARD_HEIGHT - ACCENT_HEIGHT - HEADSHOT_SIZE) // 2
+            ring = 8
+            draw.ellipse(
+                (MARGIN - ring, top - ring, MARGIN + HEADSHOT_SIZE + ring, top + HEADSHOT_SIZE + ring), fill=secondary
+            )
+            card.paste(headshot, (MARGIN, top), headshot)
+            text_left = MARGIN * 2 + HEADSHOT_SIZE
+        except (FileNotFoundError, OSError) as e:
+            logger.warning(f"Share card for {data['slug']} drawn without headshot: {str(e)}")
+    text_width = CARD_WIDTH - text_left - MARGIN
+
+    name_font = _font(settings.SHARE_CARD_FONT_BOLD, 72)
+    position_font = _font(settings.SHARE_CARD_FONT_BOLD, 40)
+    tag_line_font = _font(settings.SHARE_CARD_FONT, 34)
+
+    name = f"{data.get('first_name') or ''} {data.get('last_name') or ''}".strip()
+    blocks = [
+        (_wrap(draw, name, name_font, text_width, 2), name_font, 84),
+        (_wrap(draw, data.get('position_running_for') or '', position_font, text_width, 2), position_font, 50),
+        (_wrap(draw, data.get('tag_line') or '', tag_line_font, text_width, 3), tag_line_font, 44),
+    ]
+    blocks = [block for block in blocks if block[0]]
+    gap = 24
+    height = sum(len(lines) * line_height for lines, _, line_height in blocks) + gap * (len(blocks) - 1)
+    # Vertically centred on the area above the accent strip
+    y = max(MARGIN, (CARD_HEIGHT - ACCENT_HEIGHT - height) // 2)
+    for lines, font, line_height in blocks:
+        for line in lines:
+            draw.text((text_left, y), line, font=font, fill=text)
+            y += line_height
+        y += gap
+
+    output = BytesIO()
+    card.save(output, 'JPEG', quality=settings.IMAGE_JPEG_QUALITY, optimize=True, progressive=True)
+    return output.getvalue()
+
+
+def generate_share_card(submission, data):
+    """
+    Render the card for the payload unless it already exists, and delete the
+    slug's older cards. Returns True if a new card was written.
+    """
+    path = card_path(data)
+    if os.path.exists(path):
+        return False
+
+    content = render_card(submission, data)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    for name in os.listdir(os.path.dirname(path)):
+        if name != os.path.basename(path) and not name.endswith('.tmp'):
+            os.remove(os.path.join(os.path.dirname(path), name))
+    logger.info(f"Rendered share card for {data['slug']} ({len(content)} bytes)")
+    return True
+
+
+def remove_share_cards(slug):
+    if slug:
+        shutil.rmtree(os.path.join(settings.MEDIA_ROOT, CARD_DIR, slug), ignore_errors=True)
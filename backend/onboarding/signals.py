@@ -0,0 +1,23 @@
+"""
+Keep this process's slug index (onboarding/slug_index.py) in step with
+CampaignSubmission saves and deletes. Connected in OnboardingConfig.ready().
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import CampaignSubmission
+from .slug_index import slug_index
+
+
+@receiver(post_save, sender=CampaignSubmission)
+def index_saved_slug(sender, instance, **kwargs):
+    slug = instance.slug
+    # Only once committed: a rolled-back save never took the slug
+    transaction.on_commit(lambda: slug_index.add(slug))
+
+
+@receiver(post_delete, sender=CampaignSubmission)
+def unindex_deleted_slug(sender, instance, **kwargs):
+    slug = instance.slug
+    transaction.on_commit(lambda: slug_index.discard(slug))
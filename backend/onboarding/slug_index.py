@@ -0,0 +1,158 @@
+"""
+Per-process index of taken campaign slugs, for the /api/slugs/check/ endpoint.
+
+Slugs are held in a Bloom filter, which answers "definitely free" for most
+candidates without any search, and in a sorted list, which confirms possible
+hits with a binary search and finds the next free numeric suffixes for
+suggestions.
+
+The index is loaded from the database on first use. Saves and deletes in this
+process update it through signals (onboarding/signals.py). Slugs taken in
+other processes are picked up by a query for rows with a higher pk, at most
+every SLUG_INDEX_REFRESH_SECONDS. A full reload every
+SLUG_INDEX_REBUILD_SECONDS also drops slugs deleted elsewhere. So an answer
+can be a few seconds stale; save() still resolves any collision by appending
+a number.
+"""
+from bisect import bisect_left, insort
+import hashlib
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+
+from .models import CampaignSubmission
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on one BLAKE2b digest)"""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class SlugIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._slugs = []
+        self._highest = {}
+        self._bloom = None
+        self._max_pk = 0
+        self._built_at = None
+        self._refreshed_at = 0
+
+    def _rebuild(self):
+        rows = list(CampaignSubmission.objects.exclude(slug='').values_list('pk', 'slug'))
+        capacity = max(settings.SLUG_INDEX_CAPACITY, len(rows) * 2)
+        bloom = BloomFilter(capacity, settings.SLUG_INDEX_ERROR_RATE)
+        for _pk, slug in rows:
+            bloom.add(slug)
+        self._bloom = bloom
+        self._slugs = sorted(slug for _pk, slug in rows)
+        self._highest = {}
+        self._max_pk = max((pk for pk, _slug in rows), default=0)
+        self._built_at = self._refreshed_at = time.monotonic()
+        logger.info(f"Slug index built with {len(rows)} slugs (Bloom filter: {len(bloom.bits)} bytes)")
+
+    def _refresh(self):
+        rows = CampaignSubmission.objects.filter(pk__gt=self._max_pk).exclude(slug='').values_list('pk', 'slug')
+        for pk, slug in rows:
+            self._add(slug)
+            self._max_pk = max(self._max_pk, pk)
+        self._refreshed_at = time.monotonic()
+
+    def _ensure_current(self):
+        now = time.monotonic()
+        if self._built_at is None or now - self._built_at > settings.SLUG_INDEX_REBUILD_SECONDS:
+            self._rebuild()
+        elif now - self._refreshed_at > settings.SLUG_INDEX_REFRESH_SECONDS:
+            self._refresh()
+
+    def _add(self, slug):
+        position = bisect_left(self._slugs, slug)
+        if position < len(self._slugs) and self._slugs[position] == slug:
+            return
+        insort(self._slugs, slug)
+        self._bloom.add(slug)
+        self._highest.clear()
+        if len(self._slugs) > self._bloom.capacity:
+            # Past capacity the false positive rate climbs; start over with a bigger filter
+            self._built_at = None
+
+    def _taken(self, slug):
+        if slug not in self._bloom:
+            return False
+        position = bisect_left(self._slugs, slug)
+        return position < len(self._slugs) and self._slugs[position] == slug
+
+    def add(self, slug):
+        """
+        Record a slug saved by this process. The pk high-water mark is left to
+        _refresh(): rows committed by other workers may still have lower pks.
+        """
+        with self._lock:
+            if self._built_at is None or not slug:
+                return
+            self._add(slug)
+
+    def discard(self, slug):
+        """Record a deleted slug (the Bloom filter keeps it; the sorted list has the final say)"""
+        with self._lock:
+            if self._built_at is None:
+                return
+            position = bisect_left(self._slugs, slug)
+            if position < len(self._slugs) and self._slugs[position] == slug:
+                del self._slugs[position]
+                self._highest.clear()
+
+    def _highest_suffix(self, slug):
+        """Highest N among taken slugs of the form slug + N (the same rule as allocate_slug)"""
+        if slug in self._highest:
+            return self._highest[slug]
+        highest = 0
+        # Slugs sharing the prefix are contiguous in the sorted list
+        start = bisect_left(self._slugs, slug)
+        for taken in self._slugs[start:bisect_left(self._slugs, slug + '{')]:
+            suffix = taken[len(slug):]
+            if suffix.isdigit():
+                highest = max(highest, int(suffix))
+        # Popular names cover long runs of the list; remember the answer until the next change
+        self._highest[slug] = highest
+        return highest
+
+    def check(self, slug, suggestions=3):
+        """
+        (available, suggestions). Suggestions continue from the highest taken
+        numeric suffix, so the first is the slug save() would pick.
+        """
+        with self._lock:
+            self._ensure_current()
+            if not self._taken(slug):
+                return True, []
+            if not suggestions:
+                return False, []
+            highest = self._highest_suffix(slug)
+            return False, [f"{slug}{highest + offset}" for offset in range(1, suggestions + 1)]
+
+
+slug_index = SlugIndex()
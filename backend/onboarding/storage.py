@@ -0,0 +1,93 @@
+"""
+Content-addressed media storage.
+
+Uploaded files are named by the SHA-256 of their bytes
+(content/<first two hex chars>/<hash><ext>), so the same image uploaded
+again - by a resubmission or another campaign - is stored once and keeps
+the same name. Since one file can be shared by several submissions, delete
+files through delete_unreferenced() rather than storage.delete().
+"""
+import hashlib
+import logging
+import os
+import re
+
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+CONTENT_DIR = 'content'
+HASH_CHUNK_SIZE = 64 * 1024
+
+# Spellings of the same format map to one extension so identical bytes get one name
+EXTENSION_ALIASES = {'.jpeg': '.jpg', '.jpe': '.jpg'}
+
+_hashed_name = re.compile(rf'^{CONTENT_DIR}/[0-9a-f]{{2}}/([0-9a-f]{{64}})\.[a-z0-9]+$')
+
+
+def hash_file(fileobj):
+    """SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    if hasattr(fileobj, 'chunks'):
+        for chunk in fileobj.chunks(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    else:
+        for chunk in iter(lambda: fileobj.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def content_hash(image_field):
+    """
+    Content hash of a stored file: taken from the name for content-addressed
+    files, otherwise computed by reading the file
+    """
+    match = _hashed_name.match(image_field.name or '')
+    if match:
+        return match.group(1)
+    image_field.open('rb')
+    try:
+        return hash_file(image_field)
+    finally:
+        image_field.close()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that stores files under their content hash"""
+
+    def __init__(self, **kwargs):
+        # Identical names mean identical bytes, so overwriting is harmless
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(**kwargs)
+
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1].lower()
+        extension = EXTENSION_ALIASES.get(extension, extension)
+        digest = hash_file(content)
+        name = f"{CONTENT_DIR}/{digest[:2]}/{digest}{extension}"
+
+        if self.exists(name):
+            logger.debug(f"Content already stored as {name}, skipping write")
+            return name
+        return super()._save(name, content)
+
+
+def delete_unreferenced(name, storage=None):
+    """
+    Delete a stored file unless a submission still uses it.
+    Returns True if the file was deleted.
+    """
+    from .images import IMAGE_FIELDS
+    from .models import CampaignSubmission
+
+    references = Q()
+    for field_name in IMAGE_FIELDS:
+        references |= Q(**{field_name: name})
+    if CampaignSubmission.objects.filter(references).exists():
+        logger.debug(f"Keeping {name}, still referenced by a submission")
+        return False
+
+    (storage or default_storage).delete(name)
+    return True
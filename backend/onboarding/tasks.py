@@ -0,0 +1,75 @@
+"""
+Background job handlers. Imported by OnboardingConfig.ready() so that the
+handlers are registered in every process that runs jobs.
+"""
+import logging
+
+from .ghl_ratelimit import LANE_BULK, LANE_INTERACTIVE, ghl_lane
+from .jobs import job_handler
+from .models import CampaignSubmission
+
+logger = logging.getLogger(__name__)
+
+
+def provisioning_failed(payload, error):
+    """
+    The provisioning job gave up: mark the submission failed, along with the
+    step it was on, instead of leaving it 'running'.
+    """
+    from .views import SubmissionCreateView
+
+    submission_id = payload.get('submission_id')
+    submission = CampaignSubmission.objects.filter(id=submission_id).first()
+    if submission is None:
+        return
+    SubmissionCreateView().fail_provisioning(submission, error)
+
+
+@job_handler('provision_submission', on_failure=provisioning_failed)
+@ghl_lane(LANE_BULK)
+def provision_submission(payload):
+    """
+    Run the GHL provisioning flow (location, contact, images, admin user,
+    credential email/SMS) for a saved CampaignSubmission.
+    """
+    # Imported here to avoid a circular import (views -> jobs -> tasks -> views)
+    from .views import SubmissionCreateView
+
+    submission_id = payload.get('submission_id')
+    try:
+        submission = CampaignSubmission.objects.get(id=submission_id)
+    except CampaignSubmission.DoesNotExist:
+        logger.error(f"Submission {submission_id} not found, skipping provisioning")
+        return
+
+    SubmissionCreateView().run_provisioning(submission)
+
+
+@job_handler('send_otp')
+@ghl_lane(LANE_INTERACTIVE)
+def send_otp(payload):
+    """
+    Upsert the GHL contact for an OTP request and send the code by SMS.
+    Queued at high priority by OTPRequestView.
+    """
+    from .views import OTPRequestView
+
+    OTPRequestView().dispatch_otp(payload)
+
+
+@job_handler('prerender_mirror')
+def prerender_mirror(payload):
+    """
+    Render the share card and static snapshot of a submission's public page. Queued by
+    CampaignSubmission.save() whenever the mirror version changes.
+    """
+    from .prerender import prerender
+    from .serializers import MirrorSerializer
+
+    submission_id = payload.get('submission_id')
+    submission = MirrorSerializer.queryset().filter(id=submission_id).first()
+    if submission is None:
+        logger.info(f"Submission {submission_id} no longer exists, skipping prerender")
+        return
+
+    prerender(submission)
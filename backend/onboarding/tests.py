@@ -1,3 +1,121 @@
+from datetime import timedelta
+from unittest import mock
+
 from django.test import TestCase
+from django.utils import timezone
+
+from .counters import decr_counter, get_counter, incr_counter
+from .models import CampaignSubmission, Counter
+from .otp import OTP_INVALID, OTP_LOCKED, OTP_VERIFIED, store_otp, verify_otp
+from .pages import render_page
+from .throttling import hit
+
+
+class RenderPageTests(TestCase):
+    def test_title_with_backslashes(self):
+        data = {'slug': 'jodoe', 'first_name': 'Jo', 'last_name': 'Doe', 'tag_line': r'Vote 1\2 C:\dir'}
+        html = render_page(data)
+        self.assertIn(r'<title>Jo Doe - Vote 1\2 C:\dir</title>', html)
+
+
+class SlugAllocationTests(TestCase):
+    def submission(self, first_name='John', last_name='Smith', **fields):
+        return CampaignSubmission(
+            first_name=first_name, last_name=last_name, email='test@example.com', phone='0',
+            pillar_1='-', pillar_2='-', pillar_3='-', bio_text='-', **fields,
+        )
+
+    def create(self, **fields):
+        submission = self.submission(**fields)
+        submission.save()
+        return submission
+
+    def test_base_slug_when_free(self):
+        self.assertEqual(self.create().slug, 'johnsmith')
+
+    def test_duplicates_continue_from_highest_suffix(self):
+        self.create()
+        self.create(custom_slug='johnsmith7')
+        self.assertEqual(self.create().slug, 'johnsmith8')
+        self.assertEqual(self.create().slug, 'johnsmith9')
+
+    def test_long_numeric_suffix_in_custom_slug(self):
+        self.create(first_name='Zed', last_name='Qux')
+        self.create(custom_slug='zedqux999999999')
+        self.assertEqual(self.create(first_name='Zed', last_name='Qux').slug, 'zedqux1000000000')
+        self.assertEqual(self.create(first_name='Zed', last_name='Qux').slug, 'zedqux1000000001')
+
+    def test_allocation_is_one_query(self):
+        for _ in range(3):
+            self.create()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.submission().allocate_slug(), 'johnsmith3')
+
+    def test_save_retries_when_slug_is_taken_concurrently(self):
+        self.create()
+        # A concurrent save took the slug between allocation and insert
+        allocations = iter(['johnsmith', 'johnsmith1'])
+        with mock.patch.object(CampaignSubmission, 'allocate_slug', side_effect=lambda: next(allocations)):
+            self.assertEqual(self.create().slug, 'johnsmith1')
+
+
+class CounterTests(TestCase):
+    def test_incr_decr_and_get(self):
+        self.assertEqual(get_counter('test:n'), 0)
+        self.assertEqual(incr_counter('test:n', 60), 1)
+        self.assertEqual(incr_counter('test:n', 60, delta=2), 3)
+        decr_counter('test:n')
+        self.assertEqual(get_counter('test:n'), 2)
+
+    def test_expired_counter_starts_over(self):
+        incr_counter('test:n', 60)
+        Counter.objects.filter(key='test:n').update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(get_counter('test:n'), 0)
+        self.assertEqual(incr_counter('test:n', 60), 1)
+
+
+class SlidingWindowTests(TestCase):
+    def test_rejected_requests_are_not_counted(self):
+        now = 1000 * 60 + 30
+        results = [hit('test:limit', 3, 60, now=now)[0] for _ in range(5)]
+        self.assertEqual(results, [True, True, True, False, False])
+        self.assertEqual(get_counter('test:limit:1000'), 3)
+
+    def test_previous_window_is_weighted(self):
+        for _ in range(4):
+            hit('test:limit', 4, 60, now=1000 * 60 + 59)
+        # Three quarters of the previous window still count: 4 * 0.75 + 1 = 4
+        self.assertTrue(hit('test:limit', 4, 60, now=1001 * 60 + 15)[0])
+        self.assertFalse(hit('test:limit', 4, 60, now=1001 * 60 + 15)[0])
+
+
+class OTPVerifyTests(TestCase):
+    phone = '+15550001111'
+
+    def test_code_is_single_use(self):
+        store_otp(self.phone, '1234')
+        self.assertEqual(verify_otp(self.phone, '1234').status, OTP_VERIFIED)
+        self.assertNotEqual(verify_otp(self.phone, '1234').status, OTP_VERIFIED)
+
+    def test_attempts_are_limited(self):
+        store_otp(self.phone, '1234')
+        with self.settings(OTP_MAX_ATTEMPTS=2):
+            self.assertEqual(verify_otp(self.phone, '0000').status, OTP_INVALID)
+            self.assertEqual(verify_otp(self.phone, '0000').status, OTP_INVALID)
+            self.assertEqual(verify_otp(self.phone, '1234').status, OTP_LOCKED)
+
+    def test_new_otp_resets_attempts(self):
+        store_otp(self.phone, '1234')
+        with self.settings(OTP_MAX_ATTEMPTS=1):
+            verify_otp(self.phone, '0000')
+            store_otp(self.phone, '5678')
+            self.assertEqual(verify_otp(self.phone, '5678').status, OTP_VERIFIED)
 
-# Create your tests here.
+    def test_verify_endpoint_is_throttled(self):
+        limits = {'otp_verify': {'ip': None, 'phone': '2/hour'}}
+        with self.settings(RATE_LIMITS=limits):
+            codes = [
+                self.client.post('/api/otp/verify/', {'phone': self.phone, 'code': '0000'}).status_code
+                for _ in range(3)
+            ]
+        self.assertEqual(codes[2], 429)
@@ -0,0 +1,166 @@
+"""
+Sliding-window rate limiting for the public endpoints that trigger GHL work
+(OTP requests, shares, submissions).
+
+Each (scope, identity) pair is counted in fixed windows held in atomic
+counters (onboarding/counters.py). The sliding-window estimate weights the
+previous window by the share of it still inside the sliding window:
+
+    count = previous * (1 - elapsed / window) + current
+
+Counting is one atomic increment per request: a Redis INCR with REDIS_URL
+set, otherwise a single UPDATE of a counter row, so concurrent requests
+can't get past a limit. Limits come from
+settings.RATE_LIMITS[scope][kind], e.g. {'otp_request': {'ip': '10/hour'}},
+and every throttled response carries RateLimit-* headers.
+"""
+import hashlib
+import logging
+import math
+import re
+import time
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+from .counters import decr_counter, get_counter, incr_counter
+from .otp import normalize_phone
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+_period = re.compile(r'(\d*)([smhd])')
+
+# Set on the request by the first throttle that rejects it
+REJECTED_ATTR = '_rate_limit_rejected'
+# Most restrictive (limit, remaining, reset) seen while checking a request
+STATUS_ATTR = '_rate_limit_status'
+
+
+def parse_rate(rate):
+    """
+    '5/hour' -> (5, 3600). Like DRF's rates but the period may carry a count,
+    e.g. '3/10m' for three per ten minutes. None disables the limit.
+    """
+    if not rate:
+        return None
+    num, period = rate.split('/')
+    count, unit = _period.match(period.strip().lower()).groups()
+    return int(num), int(count or 1) * PERIODS[unit]
+
+
+def hit(key, limit, window, now=None):
+    """
+    Count one request against key. Returns (allowed, remaining, reset) where
+    reset is the number of seconds until a request is allowed again (when
+    rejected) or until the current window rolls over.
+    """
+    now = time.time() if now is None else now
+    current_window = int(now // window)
+    elapsed = now - current_window * window
+    current_key = f"{key}:{current_window}"
+    previous_key = f"{key}:{current_window - 1}"
+
+    # Each window's counter must outlive the following window, which reads it
+    current = incr_counter(current_key, window * 2)
+    previous = get_counter(previous_key)
+
+    weight = 1 - elapsed / window
+    count = previous * weight + current
+    if count <= limit:
+        return True, int(limit - count), math.ceil(window - elapsed)
+
+    # Rejected requests don't use up the allowance
+    decr_counter(current_key)
+    if previous and current <= limit:
+        # Wait until enough of the previous window has slid out
+        wait = min((previous * weight + current - limit) / previous * window, window - elapsed)
+    else:
+        wait = window - elapsed
+    return False, 0, max(1, math.ceil(wait))
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Throttle keyed by one identity of the request (see get_identity), using
+    the view's throttle_scope to look up the limit. Safe methods (including
+    CORS preflights) are never counted.
+    """
+    kind = None
+
+    def get_identity(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.reset = None
+        if request.method in SAFE_METHODS or getattr(request, REJECTED_ATTR, False):
+            return True
+
+        scope = getattr(view, 'throttle_scope', None)
+        rate = parse_rate(settings.RATE_LIMITS.get(scope, {}).get(self.kind))
+        identity = self.get_identity(request)
+        if not rate or not identity:
+            return True
+        # Views can let requests that cause no new work through uncounted
+        exempt = getattr(view, 'rate_limit_exempt', None)
+        if exempt and exempt(request, self.kind, identity):
+            return True
+
+        limit, window = rate
+        identity_hash = hashlib.sha256(identity.encode()).hexdigest()[:32]
+        allowed, remaining, reset = hit(f"throttle:{scope}:{self.kind}:{identity_hash}", limit, window)
+        self.reset = reset
+
+        rate_status = getattr(request, STATUS_ATTR, None)
+        if rate_status is None or remaining < rate_status[1] or not allowed:
+            setattr(request, STATUS_ATTR, (limit, remaining, reset))
+        if not allowed:
+            # Later throttles skip counting a request that is already rejected
+            setattr(request, REJECTED_ATTR, True)
+            logger.warning(f"Rate limit {scope}/{self.kind} exceeded ({limit} per {window}s)")
+        return allowed
+
+    def wait(self):
+        return self.reset
+
+
+class IPRateThrottle(SlidingWindowThrottle):
+    kind = 'ip'
+
+    def get_identity(self, request):
+        # Honours X-Forwarded-For according to REST_FRAMEWORK['NUM_PROXIES']
+        return self.get_ident(request)
+
+
+class PhoneRateThrottle(SlidingWindowThrottle):
+    kind = 'phone'
+
+    def get_identity(self, request):
+        phone = request.data.get('phone')
+        return normalize_phone(phone) if phone else None
+
+
+class EmailRateThrottle(SlidingWindowThrottle):
+    kind = 'email'
+
+    def get_identity(self, request):
+        email = (request.data.get('email') or '').strip().lower()
+        return email or None
+
+
+RATE_LIMIT_THROTTLES = [IPRateThrottle, PhoneRateThrottle, EmailRateThrottle]
+
+
+class RateLimitHeadersMixin:
+    """Add RateLimit-Limit / -Remaining / -Reset headers to throttled views' responses"""
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        rate_status = getattr(request, STATUS_ATTR, None)
+        if rate_status:
+            limit, remaining, reset = rate_status
+            response['RateLimit-Limit'] = str(limit)
+            response['RateLimit-Remaining'] = str(remaining)
+            response['RateLimit-Reset'] = str(reset)
+        return response
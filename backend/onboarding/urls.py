@@ -1,11 +1,22 @@
+from django.conf import settings
 from django.urls import path
-from .views import SubmissionCreateView, MirrorView, OTPRequestView, OTPVerifyView, PillarDescriptionsView, ShareCampaignView
+from .views import SubmissionCreateView, MirrorView, ImageRenditionView, OTPRequestView, OTPStatusView, OTPVerifyView, PillarDescriptionsView, ShareCampaignView, SlugCheckView
+
+if settings.ASYNC_VIEWS:
+    # Under ASGI the GHL-bound endpoints await GHL instead of holding a thread
+    from .async_views import (
+        AsyncOTPRequestView as OTPRequestView, AsyncOTPStatusView as OTPStatusView,
+        AsyncOTPVerifyView as OTPVerifyView, AsyncShareCampaignView as ShareCampaignView,
+    )
 
 urlpatterns = [
     path('submissions/', SubmissionCreateView.as_view(), name='submission-create'),
     path('mirror/<slug:slug>/', MirrorView.as_view(), name='mirror-detail'),
+    path('images/<slug:slug>/<str:field>/', ImageRenditionView.as_view(), name='image-rendition'),
     path('otp/request/', OTPRequestView.as_view(), name='otp_request'),
     path('otp/verify/', OTPVerifyView.as_view(), name='otp_verify'),
+    path('otp/status/<str:request_id>/', OTPStatusView.as_view(), name='otp_status'),
     path('share/', ShareCampaignView.as_view(), name='share_campaign'),
     path('pillars/', PillarDescriptionsView.as_view(), name='pillar-descriptions'),
+    path('slugs/check/', SlugCheckView.as_view(), name='slug-check'),
 ]
@@ -2,31 +2,68 @@ from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
-from .models import CampaignSubmission, PillarDescription
-from .serializers import CampaignSubmissionSerializer
+from .models import BackgroundJob, CampaignSubmission, GHLUploadedFile, PillarDescription
+from .serializers import CampaignSubmissionSerializer, MirrorSerializer
+from .jobs import PRIORITY_HIGH, SECRETS_KEY, FailJob, RetryJob, enqueue
+from .ghl_client import GHL_MESSAGES_API_VERSION, MultipartFileStream, ghl, ghl_headers
+from .ghl_breaker import (
+    FAMILY_CONTACTS, FAMILY_CONVERSATIONS, FAMILY_LOCATIONS, STATE_OPEN,
+    get_state as get_breaker_state, retry_after as breaker_retry_after,
+)
+from .ghl_ratelimit import LANE_BULK, LANE_INTERACTIVE, ghl_lane
+from .ghl_retry import raise_if_retryable
+from .images import IMAGE_FIELDS, normalize_submission_images
+from .storage import content_hash
+from .pages import link_header, render_page, render_shell
+from .slug_index import slug_index
+from .mirror_cache import access_token, fieldset_etag, get_mirror, password_matches, set_mirror, token_grants_access
+from .throttling import RATE_LIMIT_THROTTLES, RateLimitHeadersMixin
+from .otp import (
+    DISPATCH_ABANDONED, DISPATCH_QUEUEING, OTP_DISPATCH_FAILED, OTP_DISPATCH_PENDING, OTP_DISPATCH_SENT,
+    OTP_EXPIRED, OTP_LOCKED, attach_contact_id, dispatch_in_flight, generate_otp, job_id_from_handle, join_dispatch,
+    normalize_phone, release_dispatch, start_dispatch, store_otp, verify_otp,
+)
+from .renditions import FORMATS, clamp_quality, get_rendition, image_version, negotiate_format, snap_width
+from .ghl_fields import get_custom_field_ids, invalidate_custom_field_ids, is_stale_field_error
 from django.conf import settings
-import random # Stub for OTP generator
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from django.views import View
+from PIL import UnidentifiedImageError
+import contextvars
 import requests
 import logging
 import os
-import time
 import json
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 logger = logging.getLogger(__name__)
 
-# Cache for custom field IDs (field_name -> field_id)
-# This will be populated when we fetch custom fields from GHL
-_custom_field_cache = {}
-
-# Simple in-memory OTP storage (for testing)
-# Format: {phone: {'code': '1234', 'expires_at': datetime}}
-otp_storage = {}
+def ghl_unavailable_response(*families):
+    """
+    Return a 503 response if the circuit breaker for any of the given GHL
+    endpoint families is open, so the view answers immediately instead of
+    waiting out GHL timeouts. Returns None when all are closed.
+    """
+    for family in families:
+        if get_breaker_state(family) == STATE_OPEN:
+            wait = int(breaker_retry_after(family)) + 1
+            logger.warning(f"GHL circuit for {family} is open, failing fast (retry in {wait}s)")
+            return Response(
+                {'error': 'Service temporarily unavailable. Please try again shortly.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(wait)}
+            )
+    return None
 
-class SubmissionCreateView(generics.CreateAPIView):
+class SubmissionCreateView(RateLimitHeadersMixin, generics.CreateAPIView):
     queryset = CampaignSubmission.objects.all()
     serializer_class = CampaignSubmissionSerializer
     parser_classes = (MultiPartParser, FormParser)
+    throttle_classes = RATE_LIMIT_THROTTLES
+    throttle_scope = 'submission'
     
     
     
@@ -56,17 +93,12 @@ class SubmissionCreateView(generics.CreateAPIView):
                 "platformLanguage": "en_US"
             }
             
-            headers = {
-                'Authorization': f'Bearer {settings.GHL_API_TOKEN}', # Agency Level Token
-                'Content-Type': 'application/json',
-                'Version': '2021-07-28',
-                'Accept': 'application/json'
-            }
+            headers = ghl_headers(settings.GHL_API_TOKEN)  # Agency Level Token
             
             api_url = f"{settings.GHL_API_BASE_URL}/users/"
             logger.info(f"POST request URL: {api_url}")
             
-            response = requests.post(api_url, json=payload, headers=headers, timeout=30)
+            response = ghl.post(api_url, json=payload, headers=headers, timeout=30)
             
             logger.info(f"Create user response status: {response.status_code}")
             
@@ -76,9 +108,18 @@ class SubmissionCreateView(generics.CreateAPIView):
                 return True
             else:
                 logger.error(f"✗ Failed to create GHL admin user: {response.status_code} - {response.text}")
+                # Creating a user is not idempotent - only retry if GHL never processed it
+                raise_if_retryable('POST', response=response, description="Admin user creation")
                 # Don't fail the whole process if user creation fails
                 return False
                 
+        except RetryJob:
+            raise
+        except requests.exceptions.RequestException as e:
+            logger.error(f"✗ GHL API request failed creating admin user: {str(e)}")
+            raise_if_retryable('POST', exception=e, description="Admin user creation")
+            logger.exception("Full exception traceback:")
+            return False
         except Exception as e:
             logger.error(f"✗ Error creating GHL admin user: {str(e)}")
             logger.exception("Full exception traceback:")
@@ -125,24 +166,27 @@ class SubmissionCreateView(generics.CreateAPIView):
                 "html": message_body
             }
             
-            headers = {
-                'Authorization': f'Bearer {api_token}',
-                'Content-Type': 'application/json',
-                'Version': '2021-07-28',
-                'Accept': 'application/json'
-            }
+            headers = ghl_headers(api_token)
             
             api_url = f"{settings.GHL_API_BASE_URL}/conversations/messages"
             
-            response = requests.post(api_url, json=payload, headers=headers, timeout=30)
+            response = ghl.post(api_url, json=payload, headers=headers, timeout=30)
             
             if response.status_code in [200, 201]:
                 logger.info(f"✓ Credential email sent successfully")
                 return True
             else:
                 logger.error(f"✗ Failed to send credential email: {response.status_code} - {response.text}")
+                # Sending a message is not idempotent - only retry if GHL never processed it
+                raise_if_retryable('POST', response=response, description="Credential email")
                 return False
                 
+        except RetryJob:
+            raise
+        except requests.exceptions.RequestException as e:
+            logger.error(f"✗ GHL API request failed sending credential email: {str(e)}")
+            raise_if_retryable('POST', exception=e, description="Credential email")
+            return False
         except Exception as e:
             logger.error(f"✗ Error sending credential email: {str(e)}")
             return False
@@ -185,24 +229,27 @@ class SubmissionCreateView(generics.CreateAPIView):
                 "status": "pending"
             }
             
-            headers = {
-                'Authorization': f'Bearer {api_token}',
-                'Content-Type': 'application/json',
-                'Version': '2021-04-15',
-                'Accept': 'application/json'
-            }
+            headers = ghl_headers(api_token, GHL_MESSAGES_API_VERSION)
             
             api_url = f"{settings.GHL_API_BASE_URL}/conversations/messages"
             
-            response = requests.post(api_url, json=payload, headers=headers, timeout=30)
+            response = ghl.post(api_url, json=payload, headers=headers, timeout=30)
             
             if response.status_code in [200, 201]:
                 logger.info(f"✓ Credential SMS sent successfully")
                 return True
             else:
                 logger.error(f"✗ Failed to send credential SMS: {response.status_code} - {response.text}")
+                # Sending a message is not idempotent - only retry if GHL never processed it
+                raise_if_retryable('POST', response=response, description="Credential SMS")
                 return False
                 
+        except RetryJob:
+            raise
+        except requests.exceptions.RequestException as e:
+            logger.error(f"✗ GHL API request failed sending credential SMS: {str(e)}")
+            raise_if_retryable('POST', exception=e, description="Credential SMS")
+            return False
         except Exception as e:
             logger.error(f"✗ Error sending credential SMS: {str(e)}")
             return False
@@ -247,149 +294,192 @@ class SubmissionCreateView(generics.CreateAPIView):
         # Create the campaign submission first
         response = super().create(request, *args, **kwargs)
         
-        # If submission was successful, create GHL sub-account
+        # GHL provisioning runs in the background job worker (manage.py run_jobs)
+        # so a slow GHL API never holds this request open
         if response.status_code == status.HTTP_201_CREATED:
-            submission_data = response.data
-            submission_id = submission_data.get('id')
-            
-            try:
-                submission = CampaignSubmission.objects.get(id=submission_id)
-                
-                # Create GHL Location (Sub-account)
-                ghl_location_id = self.create_ghl_location(submission)
-                
-                if ghl_location_id:
-                    submission.ghl_location_id = ghl_location_id
-                    # Save location_id first
-                    submission.save(update_fields=['ghl_location_id'])
-                    logger.info(f"GHL location created successfully for submission {submission_id}: {ghl_location_id}")
-                    
-                    # ALWAYS create/update contact in the static OTP location (from .env)
-                    # The contact should always be in the static location, not the newly created subaccount
-                    static_location_id = settings.GHL_OTP_LOCATION_ID
-                    if not static_location_id:
-                        logger.error("GHL_OTP_LOCATION_ID not configured. Cannot create contact.")
-                    else:
-                        logger.info(f"Creating/updating contact in static location {static_location_id} for submission {submission_id}")
-                        
-                        # If contact was already created during OTP verification, update it
-                        if submission.ghl_contact_id:
-                            logger.info(f"Updating existing contact {submission.ghl_contact_id} in static location with all custom fields")
-                            contact_updated = self.update_ghl_contact_with_custom_fields(submission, submission.ghl_contact_id)
-                            if contact_updated:
-                                logger.info(f"✓ Contact updated successfully in static location: {submission.ghl_contact_id}")
-                            else:
-                                logger.warning(f"⚠ Failed to update contact in static location for submission {submission_id}")
-                        else:
-                            # Create new contact in static location if it doesn't exist (fallback)
-                            logger.info(f"Creating new contact in static location {static_location_id} (no contact_id from OTP)")
-                            new_contact_id = self.create_ghl_contact(submission, static_location_id)
-                            
-                            if new_contact_id:
-                                logger.info(f"✓ Contact created successfully in static location: {new_contact_id}")
-                                # Save the contact ID to the submission
-                                submission.ghl_contact_id = new_contact_id
-                                submission.save(update_fields=['ghl_contact_id'])
-                            else:
-                                logger.error(f"✗ Failed to create contact in static location {static_location_id} for submission {submission_id}")
-                    
-                    # Create Admin User in the new location and send credentials
-                    # We need the company ID which we can get from settings since it's required for location creation anyway
-                    company_id = settings.GHL_COMPANY_ID
-                    if company_id:
-                        user_created = self.create_ghl_admin_user(submission, ghl_location_id, company_id)
-                        if user_created:
-                            self.send_credential_email(submission, settings.GHL_DEFAULT_ADMIN_PASSWORD)
-                            self.send_credential_sms(submission)
-
-
-                    else:
-                        logger.warning("GHL_COMPANY_ID not set, skipping admin user creation")
-
-                else:
-                    logger.warning(f"Failed to create GHL location for submission {submission_id}")
-            except CampaignSubmission.DoesNotExist:
-                logger.error(f"Submission {submission_id} not found after creation")
-            except KeyError as e:
-                logger.error(f"KeyError creating GHL location for submission {submission_id}: {str(e)}")
-                logger.exception("Full KeyError traceback:")
-            except Exception as e:
-                logger.error(f"Error creating GHL location for submission {submission_id}: {str(e)}")
-                logger.exception("Full exception traceback:")
+            submission_id = response.data.get('id')
+            enqueue('provision_submission', {'submission_id': submission_id})
+            logger.info(f"Queued GHL provisioning for submission {submission_id}")
         
         return response
     
-    def get_custom_field_ids(self, location_id, api_token):
+    def record_provisioning_step(self, submission, step, step_status, error=None):
         """
-        Fetch custom field IDs from GHL API for the given location
-        Returns a dictionary mapping field name -> field id
+        Store the status of a single provisioning step on the submission
         """
-        global _custom_field_cache
+        submission.provisioning_steps[step] = {
+            'status': step_status,
+            'updated_at': timezone.now().isoformat(),
+            'error': error,
+        }
+        submission.save(update_fields=['provisioning_steps'])
+    
+    def fail_provisioning(self, submission, error):
+        """
+        Record that provisioning stopped for good: unfinished steps become
+        'failed' (or a 'provisioning' step if none was in progress) and so does the submission
+        """
+        # Only the last line of a traceback is worth showing
+        error = (error or 'Provisioning failed').strip().splitlines()[-1]
+        unfinished = [
+            step for step, step_state in submission.provisioning_steps.items()
+            if step_state.get('status') not in ('succeeded', 'failed')
+        ]
+        for step in unfinished or ['provisioning']:
+            submission.provisioning_steps[step] = {
+                'status': 'failed',
+                'updated_at': timezone.now().isoformat(),
+                'error': error,
+            }
+        submission.provisioning_status = 'failed'
+        submission.save(update_fields=['provisioning_steps', 'provisioning_status'])
+        logger.error(f"✗ Provisioning failed for submission {submission.id}: {error}")
+    
+    def step_succeeded(self, submission, step):
+        return submission.provisioning_steps.get(step, {}).get('status') == 'succeeded'
+    
+    def run_provisioning(self, submission):
+        """
+        Create the GHL sub-account, contact, admin user and send credentials for a submission.
+        Called from the background job worker. Steps that already succeeded are skipped,
+        so a retried job picks up where the previous attempt stopped.
+        """
+        submission_id = submission.id
         
-        # Check cache first
-        cache_key = f"{location_id}_{api_token[:10]}"
-        if cache_key in _custom_field_cache:
-            logger.info(f"Using cached custom field IDs for location {location_id}")
-            return _custom_field_cache[cache_key]
+        # While GHL is degraded, put the job back on the queue instead of failing each step
+        for family in (FAMILY_LOCATIONS, FAMILY_CONTACTS):
+            if get_breaker_state(family) == STATE_OPEN:
+                raise RetryJob(f"GHL circuit for {family} is open", delay=breaker_retry_after(family) + 1)
         
-        logger.info(f"Fetching custom field IDs from GHL for location {location_id}")
+        submission.provisioning_status = 'running'
+        submission.save(update_fields=['provisioning_status'])
         
-        headers = {
-            'Authorization': f'Bearer {api_token}',
-            'Content-Type': 'application/json',
-            'Version': '2021-07-28',
-            'Accept': 'application/json'
-        }
+        # Normalize uploaded images first so GHL and the mirror page get the optimized files
+        if not self.step_succeeded(submission, 'normalize_images'):
+            normalize_errors = normalize_submission_images(submission)
+            self.record_provisioning_step(
+                submission, 'normalize_images', 'failed' if normalize_errors else 'succeeded', normalize_errors or None
+            )
         
-        try:
-            # GET /locations/:locationId/customFields?model=contact
-            api_url = f"{settings.GHL_API_BASE_URL}/locations/{location_id}/customFields"
-            params = {'model': 'contact'}
-            
-            logger.info(f"GET request URL: {api_url} with model=contact")
-            
-            response = requests.get(api_url, headers=headers, params=params, timeout=30)
+        # Create GHL Location (Sub-account)
+        if submission.ghl_location_id:
+            ghl_location_id = submission.ghl_location_id
+        else:
+            try:
+                ghl_location_id = self.create_ghl_location(submission)
+            except RetryJob as e:
+                # Transient GHL failure - the job queue reschedules us with backoff
+                self.record_provisioning_step(submission, 'location', 'retrying', str(e))
+                raise
+            
+            if not ghl_location_id:
+                logger.warning(f"Failed to create GHL location for submission {submission_id}")
+                self.record_provisioning_step(submission, 'location', 'failed', 'GHL location creation failed')
+                submission.provisioning_status = 'failed'
+                submission.save(update_fields=['provisioning_status'])
+                return
+            
+            submission.ghl_location_id = ghl_location_id
+            # Save location_id first
+            submission.save(update_fields=['ghl_location_id'])
+            logger.info(f"GHL location created successfully for submission {submission_id}: {ghl_location_id}")
+        self.record_provisioning_step(submission, 'location', 'succeeded')
+        
+        # ALWAYS create/update contact in the static OTP location (from .env)
+        # The contact should always be in the static location, not the newly created subaccount
+        static_location_id = settings.GHL_OTP_LOCATION_ID
+        if self.step_succeeded(submission, 'contact'):
+            logger.info(f"Contact already provisioned for submission {submission_id}, skipping")
+        elif not static_location_id:
+            logger.error("GHL_OTP_LOCATION_ID not configured. Cannot create contact.")
+            self.record_provisioning_step(submission, 'contact', 'failed', 'GHL_OTP_LOCATION_ID not configured')
+        else:
+            logger.info(f"Creating/updating contact in static location {static_location_id} for submission {submission_id}")
             
-            if response.status_code == 200:
-                data = response.json()
-                custom_fields = data.get('customFields', [])
-                
-                # Create mapping: field name -> field id
-                field_mapping = {}
-                for field in custom_fields:
-                    field_name = field.get('name')
-                    field_id = field.get('id')
-                    field_key = field.get('fieldKey', '')  # API uses 'fieldKey' not 'key'
-                    
-                    if field_id and field_name:
-                        field_mapping[field_name] = field_id
-                        logger.info(f"Found custom field: {field_name} -> {field_id}")
-                    
-                    # Also map by fieldKey if available (e.g., "contact.pillar_1")
-                    if field_id and field_key:
-                        # Extract just the field name part after "contact."
-                        if '.' in field_key:
-                            key_name = field_key.split('.', 1)[1]
-                            field_mapping[key_name] = field_id
-                        else:
-                            field_mapping[field_key] = field_id
-                
-                # Cache the mapping
-                _custom_field_cache[cache_key] = field_mapping
-                logger.info(f"✓ Fetched {len(field_mapping)} custom field IDs and cached them")
-                return field_mapping
+            # If contact was already created during OTP verification, update it
+            if submission.ghl_contact_id:
+                logger.info(f"Updating existing contact {submission.ghl_contact_id} in static location with all custom fields")
+                try:
+                    contact_updated = self.update_ghl_contact_with_custom_fields(submission, submission.ghl_contact_id)
+                except RetryJob as e:
+                    self.record_provisioning_step(submission, 'contact', 'retrying', str(e))
+                    raise
+                if contact_updated:
+                    logger.info(f"✓ Contact updated successfully in static location: {submission.ghl_contact_id}")
+                    self.record_provisioning_step(submission, 'contact', 'succeeded')
+                else:
+                    logger.warning(f"⚠ Failed to update contact in static location for submission {submission_id}")
+                    self.record_provisioning_step(submission, 'contact', 'failed', 'Contact update failed')
             else:
-                logger.error(f"✗ Failed to fetch custom fields: {response.status_code} - {response.text}")
-                return {}
+                # Create new contact in static location if it doesn't exist (fallback)
+                logger.info(f"Creating new contact in static location {static_location_id} (no contact_id from OTP)")
+                try:
+                    new_contact_id = self.create_ghl_contact(submission, static_location_id)
+                except RetryJob as e:
+                    self.record_provisioning_step(submission, 'contact', 'retrying', str(e))
+                    raise
                 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"✗ Error fetching custom fields: {str(e)}")
-            logger.exception("Full exception traceback:")
-            return {}
-        except Exception as e:
-            logger.error(f"✗ Unexpected error fetching custom fields: {str(e)}")
-            logger.exception("Full exception traceback:")
-            return {}
+                if new_contact_id:
+                    logger.info(f"✓ Contact created successfully in static location: {new_contact_id}")
+                    # Save the contact ID to the submission
+                    submission.ghl_contact_id = new_contact_id
+                    submission.save(update_fields=['ghl_contact_id'])
+                    self.record_provisioning_step(submission, 'contact', 'succeeded')
+                else:
+                    logger.error(f"✗ Failed to create contact in static location {static_location_id} for submission {submission_id}")
+                    self.record_provisioning_step(submission, 'contact', 'failed', 'Contact upsert failed')
+        
+        # Create Admin User in the new location and send credentials
+        # We need the company ID which we can get from settings since it's required for location creation anyway
+        company_id = settings.GHL_COMPANY_ID
+        if not company_id:
+            logger.warning("GHL_COMPANY_ID not set, skipping admin user creation")
+            self.record_provisioning_step(submission, 'admin_user', 'skipped', 'GHL_COMPANY_ID not set')
+        else:
+            if not self.step_succeeded(submission, 'admin_user'):
+                try:
+                    user_created = self.create_ghl_admin_user(submission, ghl_location_id, company_id)
+                except RetryJob as e:
+                    self.record_provisioning_step(submission, 'admin_user', 'retrying', str(e))
+                    raise
+                self.record_provisioning_step(
+                    submission, 'admin_user', 'succeeded' if user_created else 'failed',
+                    None if user_created else 'Admin user creation failed'
+                )
+            
+            if self.step_succeeded(submission, 'admin_user'):
+                if not self.step_succeeded(submission, 'credential_email'):
+                    try:
+                        email_sent = self.send_credential_email(submission, settings.GHL_DEFAULT_ADMIN_PASSWORD)
+                    except RetryJob as e:
+                        self.record_provisioning_step(submission, 'credential_email', 'retrying', str(e))
+                        raise
+                    self.record_provisioning_step(
+                        submission, 'credential_email', 'succeeded' if email_sent else 'failed',
+                        None if email_sent else 'Credential email failed'
+                    )
+                if not self.step_succeeded(submission, 'credential_sms'):
+                    try:
+                        sms_sent = self.send_credential_sms(submission)
+                    except RetryJob as e:
+                        self.record_provisioning_step(submission, 'credential_sms', 'retrying', str(e))
+                        raise
+                    self.record_provisioning_step(
+                        submission, 'credential_sms', 'succeeded' if sms_sent else 'failed',
+                        None if sms_sent else 'Credential SMS failed'
+                    )
+        
+        failed_steps = [step for step, info in submission.provisioning_steps.items() if info.get('status') == 'failed']
+        submission.provisioning_status = 'failed' if failed_steps else 'completed'
+        submission.save(update_fields=['provisioning_status'])
+        logger.info(f"Provisioning finished for submission {submission_id}: {submission.provisioning_status} (failed steps: {failed_steps})")
+    
+    def get_custom_field_ids(self, location_id, api_token):
+        """
+        Return a dictionary mapping field name -> field id for the given location
+        Backed by the shared custom-field registry (onboarding/ghl_fields.py)
+        """
+        return get_custom_field_ids(location_id, api_token)
     
     def upload_image_to_ghl_custom_field(self, image_field, field_name, location_id, custom_field_id, api_token, contact_id=None):
         """
@@ -418,40 +508,27 @@ class SubmissionCreateView(generics.CreateAPIView):
             logger.error(f"Cannot upload {field_name}: contact_id is required but was None")
             return None
         
+        fileobj = None
         try:
             logger.info(f"Uploading {field_name} to GHL custom field: {custom_field_id}")
             
-            # Read the image file
+            # Open the image file. It is streamed to GHL in chunks and never read
+            # into memory whole, so concurrent uploads of large photos stay cheap
             try:
                 if hasattr(image_field, 'read'):
-                    logger.info(f"Reading image_field as file-like object")
+                    logger.debug(f"Opening image_field as file-like object")
                     image_field.open('rb')
-                    file_content = image_field.read()
+                    fileobj = image_field
                     file_name = image_field.name
-                    image_field.close()
-                    logger.info(f"Read file: {file_name}, size: {len(file_content)} bytes")
-                elif hasattr(image_field, 'path'):
-                    # Django ImageField with path
-                    logger.info(f"Reading image_field from path: {image_field.path}")
-                    file_path = image_field.path
-                    if not os.path.exists(file_path):
-                        logger.error(f"File path does not exist: {file_path}")
-                        return None
-                    with open(file_path, 'rb') as f:
-                        file_content = f.read()
-                    file_name = os.path.basename(file_path)
-                    logger.info(f"Read file from path: {file_name}, size: {len(file_content)} bytes")
                 else:
-                    # File path string
-                    logger.info(f"Reading image_field as string path: {image_field}")
-                    file_path = str(image_field)
+                    # Django ImageField with path, or a file path string
+                    file_path = image_field.path if hasattr(image_field, 'path') else str(image_field)
+                    logger.debug(f"Opening image_field from path: {file_path}")
                     if not os.path.exists(file_path):
                         logger.error(f"File path does not exist: {file_path}")
                         return None
-                    with open(file_path, 'rb') as f:
-                        file_content = f.read()
+                    fileobj = open(file_path, 'rb')
                     file_name = os.path.basename(file_path)
-                    logger.info(f"Read file from string path: {file_name}, size: {len(file_content)} bytes")
             except Exception as e:
                 logger.error(f"✗ Error reading image file for {field_name}: {str(e)}")
                 logger.exception("Full exception traceback:")
@@ -468,48 +545,27 @@ class SubmissionCreateView(generics.CreateAPIView):
             }
             content_type = content_type_map.get(file_ext, 'image/jpeg')
             
-            # Prepare multipart form data
-            # According to GHL API docs: POST /locations/:locationId/customFields/upload
-            # The file should be sent as multipart/form-data
-            # Standard field name for file uploads is 'file'
-            files = {
-                'file': (file_name, file_content, content_type)
-            }
-            
-            # Prepare form data
             # According to GHL API docs: id can be Contact Id/Opportunity Id/Custom Field Id
             # For contact uploads, we use contact_id
-            if not contact_id:
-                logger.error(f"Cannot upload {field_name}: contact_id is required")
-                return None
-            
             data = {
                 'id': contact_id,  # Contact ID for contact-specific uploads
                 'maxFiles': '15'
             }
             
-            headers = {
-                'Authorization': f'Bearer {api_token}',
-                'Version': '2021-07-28',
-                'Accept': 'application/json'
-                # Note: Don't set Content-Type header - requests will set it automatically for multipart/form-data
-            }
+            # multipart/form-data body with the file under 'file', streamed from storage
+            body = MultipartFileStream(data, 'file', fileobj, file_name, content_type)
+            headers = {**ghl_headers(api_token, content_type=None), 'Content-Type': body.content_type}
             
             # Upload to GHL custom fields upload endpoint
             api_url = f"{settings.GHL_API_BASE_URL}/locations/{location_id}/customFields/upload"
             
-            logger.info(f"=== Uploading {field_name} ===")
-            logger.info(f"URL: {api_url}")
-            logger.info(f"Contact ID: {contact_id}, Location ID: {location_id}")
-            logger.info(f"File: {file_name}, Size: {len(file_content)} bytes, Type: {content_type}")
-            logger.info(f"Form data: {data}")
-            logger.info(f"Files dict keys: {list(files.keys())}")
+            logger.info(f"Uploading {field_name}: {file_name}, {body.file_size} bytes, type {content_type}")
+            logger.debug(f"URL: {api_url}, form data: {data}")
             
             try:
-                response = requests.post(
+                response = ghl.post(
                     api_url,
-                    files=files,
-                    data=data,
+                    data=body,
                     headers=headers,
                     timeout=60  # Longer timeout for file uploads
                 )
@@ -519,22 +575,21 @@ class SubmissionCreateView(generics.CreateAPIView):
                 return None
             
             logger.info(f"Upload response status: {response.status_code}")
-            logger.info(f"Upload response headers: {dict(response.headers)}")
+            logger.debug(f"Upload response headers: {dict(response.headers)}")
             
-            # Log full response for debugging
             response_text = response.text
-            logger.info(f"Upload response text (first 1000 chars): {response_text[:1000]}")
+            logger.debug(f"Upload response text (first 1000 chars): {response_text[:1000]}")
             
             if response.status_code in [200, 201]:
                 try:
                     response_data = response.json()
-                    logger.info(f"Upload response JSON: {response_data}")
+                    logger.debug(f"Upload response JSON: {response_data}")
                     
                     uploaded_files = response_data.get('uploadedFiles', {})
                     meta = response_data.get('meta', [])
                     
-                    logger.info(f"uploadedFiles: {uploaded_files} (type: {type(uploaded_files)})")
-                    logger.info(f"meta: {meta} (type: {type(meta)})")
+                    logger.debug(f"uploadedFiles: {uploaded_files} (type: {type(uploaded_files)})")
+                    logger.debug(f"meta: {meta} (type: {type(meta)})")
                     
                     file_url = None
                     
@@ -542,17 +597,17 @@ class SubmissionCreateView(generics.CreateAPIView):
                     if uploaded_files and isinstance(uploaded_files, dict) and len(uploaded_files) > 0:
                         # Get the first (and usually only) file URL
                         file_url = list(uploaded_files.values())[0]
-                        logger.info(f"✓ Found URL in uploadedFiles: {file_url}")
+                        logger.debug(f"✓ Found URL in uploadedFiles: {file_url}")
                     
                     # Method 2: Get URL from meta array (array of objects with 'url' field)
                     if not file_url and meta and isinstance(meta, list) and len(meta) > 0:
-                        logger.info(f"Checking meta array for URL...")
+                        logger.debug(f"Checking meta array for URL...")
                         for idx, meta_item in enumerate(meta):
-                            logger.info(f"  meta[{idx}]: {meta_item} (type: {type(meta_item)})")
+                            logger.debug(f"  meta[{idx}]: {meta_item} (type: {type(meta_item)})")
                             if isinstance(meta_item, dict):
                                 file_url = meta_item.get('url')
                                 if file_url:
-                                    logger.info(f"✓ Found URL in meta[{idx}]: {file_url}")
+                                    logger.debug(f"✓ Found URL in meta[{idx}]: {file_url}")
                                     break
                     
                     if file_url:
@@ -586,145 +641,115 @@ class SubmissionCreateView(generics.CreateAPIView):
             logger.error(f"✗ Error uploading {field_name}: {str(e)}")
             logger.exception("Full exception traceback:")
             return None
+        finally:
+            if fileobj is not None:
+                fileobj.close()
+    
+    # (model field, GHL custom field that stores the uploaded URL)
+    CONTACT_IMAGE_FIELDS = [
+        ('headshot', "Headshot URL"),
+        ('background_picture', "Background Picture URL"),
+        ('action_shot_1', "Action Shot 1 URL"),
+        ('action_shot_2', "Action Shot 2 URL"),
+        ('action_shot_3', "Action Shot 3 URL"),
+    ]
     
-    def upload_contact_images(self, submission, contact_id, location_id, api_token, field_id_mapping):
+    def upload_contact_images(self, submission, contact_id, location_id, api_token, field_id_mapping, upload_errors=None, synced_images=None):
         """
-        Upload all contact images and return a dict of field_name -> image_url
+        Upload all contact images concurrently and return a dict of field_name -> image_url
+        Failed uploads are recorded in upload_errors (field_name -> error) when a dict is passed
+        Images unchanged since the last sync (synced_images: field_name -> {file, url}) are not re-uploaded,
+        and images whose content was already uploaded to this location reuse the stored GHL URL
         """
         logger.info(f"=== upload_contact_images called ===")
         logger.info(f"Submission ID: {submission.id}, Contact ID: {contact_id}, Location ID: {location_id}")
-        logger.info(f"Has headshot: {bool(submission.headshot)}")
-        logger.info(f"Has background_picture: {bool(submission.background_picture)}")
-        logger.info(f"Has action_shot_1: {bool(submission.action_shot_1)}")
-        logger.info(f"Has action_shot_2: {bool(submission.action_shot_2)}")
-        logger.info(f"Has action_shot_3: {bool(submission.action_shot_3)}")
         
         image_urls = {}
-        
-        # Upload headshot
-        if submission.headshot:
-            logger.info("Uploading headshot...")
-            headshot_url = self.upload_image_to_ghl_custom_field(
-                submission.headshot,
-                "Headshot",
-                location_id,
-                None,  # No custom field ID - we'll store URL in text field
-                api_token,
-                contact_id
-            )
-            if headshot_url:
-                image_urls["Headshot URL"] = headshot_url
-        
-        # Upload background picture
-        if submission.background_picture:
-            logger.info("Uploading background picture...")
-            background_url = self.upload_image_to_ghl_custom_field(
-                submission.background_picture,
-                "Background Picture",
-                location_id,
-                None,
-                api_token,
-                contact_id
-            )
-            if background_url:
-                image_urls["Background Picture URL"] = background_url
-        
-        # Upload action shots
-        if submission.action_shot_1:
-            logger.info("Uploading action shot 1...")
-            action1_url = self.upload_image_to_ghl_custom_field(
-                submission.action_shot_1,
-                "Action Shot 1",
-                location_id,
-                None,
-                api_token,
-                contact_id
-            )
-            if action1_url:
-                image_urls["Action Shot 1 URL"] = action1_url
-        
-        if submission.action_shot_2:
-            logger.info("Uploading action shot 2...")
-            action2_url = self.upload_image_to_ghl_custom_field(
-                submission.action_shot_2,
-                "Action Shot 2",
-                location_id,
-                None,
-                api_token,
-                contact_id
-            )
-            if action2_url:
-                image_urls["Action Shot 2 URL"] = action2_url
-        
-        if submission.action_shot_3:
-            logger.info("Uploading action shot 3...")
-            action3_url = self.upload_image_to_ghl_custom_field(
-                submission.action_shot_3,
-                "Action Shot 3",
-                location_id,
-                None,
-                api_token,
-                contact_id
-            )
-            if action3_url:
-                image_urls["Action Shot 3 URL"] = action3_url
-        
-        logger.info(f"Uploaded {len(image_urls)} images successfully")
-        return image_urls
-    
-    def update_contact_image_urls(self, contact_id, image_urls, location_id, api_token, field_id_mapping):
-        """
-        Update contact with image URLs in custom fields
-        """
-        if not image_urls:
-            logger.warning("No image URLs provided to update")
-            return False
-        
-        logger.info(f"=== Updating contact {contact_id} with {len(image_urls)} image URLs ===")
-        logger.info(f"Available field mappings: {list(field_id_mapping.keys())[:20]}...")  # Log first 20 keys
-        logger.info(f"Image URLs to map: {list(image_urls.keys())}")
-        
-        # Build custom fields array with image URLs
-        image_custom_fields = []
-        missing_fields = []
-        
-        for field_name, image_url in image_urls.items():
-            field_id = field_id_mapping.get(field_name)
+        if upload_errors is None:
+            upload_errors = {}
+        
+        synced_images = synced_images or {}
+        # content hash -> (image_field, [url_field, ...]); identical images upload once
+        uploads = {}
+        for model_field, url_field in self.CONTACT_IMAGE_FIELDS:
+            image_field = getattr(submission, model_field)
+            logger.info(f"Has {model_field}: {bool(image_field)}")
+            if not image_field:
+                continue
+            synced = synced_images.get(url_field)
+            if synced and synced.get('file') == image_field.name:
+                # Same file as the last sync - reuse the URL GHL already has
+                image_urls[url_field] = synced['url']
+                continue
             
-            if field_id:
-                image_custom_fields.append({
-                    "id": field_id,
-                    "field_value": image_url  # Use "field_value" to match upsert endpoint format
-                })
-                logger.info(f"✓ Mapped image URL field: '{field_name}' -> {field_id} = {image_url[:50]}...")
-            else:
-                missing_fields.append(field_name)
-                logger.warning(f"⚠ Image URL field '{field_name}' not found in GHL field mapping")
-                # Try to find similar field names
-                similar_fields = [k for k in field_id_mapping.keys() if field_name.lower() in k.lower() or k.lower() in field_name.lower()]
-                if similar_fields:
-                    logger.warning(f"  Similar fields found: {similar_fields}")
-        
-        if missing_fields:
-            logger.warning(f"⚠ The following image URL fields are missing in GHL: {', '.join(missing_fields)}")
-            logger.warning(f"⚠ Available custom fields: {sorted(list(field_id_mapping.keys()))}")
-            logger.warning(f"⚠ Please create these custom fields in GHL for location {location_id}")
-        
-        if not image_custom_fields:
-            logger.error("✗ No image URL fields to update - all fields were missing!")
-            return False
-        
-        # Update contact with image URLs using the standard method
-        # This method handles both "value" and "field_value" formats
-        logger.info(f"=== Updating contact {contact_id} with {len(image_custom_fields)} image URLs ===")
-        success = self.set_contact_custom_fields(contact_id, location_id, image_custom_fields, api_token)
-        
-        if success:
-            logger.info(f"✓ Image URLs updated successfully for contact {contact_id}")
-        else:
-            logger.error(f"✗ Failed to update image URLs for contact {contact_id}")
+            try:
+                digest = content_hash(image_field)
+            except OSError as e:
+                logger.error(f"✗ Could not read {model_field}: {str(e)}")
+                upload_errors[url_field] = str(e)
+                continue
+            uploads.setdefault(digest, (image_field, []))[1].append(url_field)
+        
+        # Skip the upload round-trip for content GHL already has
+        known_urls = dict(
+            GHLUploadedFile.objects.filter(content_hash__in=list(uploads), location_id=location_id)
+            .values_list('content_hash', 'url')
+        )
+        for digest, url in known_urls.items():
+            _, url_fields = uploads.pop(digest)
+            for url_field in url_fields:
+                logger.info(f"✓ {url_field} already uploaded to GHL, reusing {url}")
+                image_urls[url_field] = url
+        
+        if not uploads:
+            logger.info("No images to upload")
+            return image_urls
+        
+        # Each upload is an independent round-trip, so run them in parallel.
+        # Wall time is roughly the slowest single upload instead of the sum.
+        max_workers = min(settings.GHL_UPLOAD_MAX_WORKERS, len(uploads))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ghl-upload') as executor:
+            # copy_context() carries the caller's GHL priority lane into the worker threads
+            futures = {
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self.upload_image_to_ghl_custom_field,
+                    image_field,
+                    url_fields[0].replace(" URL", ""),
+                    location_id,
+                    None,  # No custom field ID - we'll store URL in text field
+                    api_token,
+                    contact_id
+                ): digest
+                for digest, (image_field, url_fields) in uploads.items()
+            }
+            
+            for future in as_completed(futures):
+                digest = futures[future]
+                url_fields = uploads[digest][1]
+                try:
+                    image_url = future.result()
+                except Exception as e:
+                    logger.error(f"✗ Upload for {', '.join(url_fields)} raised: {str(e)}")
+                    for url_field in url_fields:
+                        upload_errors[url_field] = str(e)
+                    continue
+                
+                if image_url:
+                    for url_field in url_fields:
+                        image_urls[url_field] = image_url
+                    # DB access stays on this thread; upload threads don't hold connections
+                    GHLUploadedFile.objects.get_or_create(
+                        content_hash=digest, location_id=location_id, defaults={'url': image_url}
+                    )
+                else:
+                    for url_field in url_fields:
+                        upload_errors[url_field] = "Upload failed"
         
-        return success
+        logger.info(f"Uploaded {len(uploads)} images, {len(image_urls)} image URLs available")
+        if upload_errors:
+            logger.warning(f"⚠ Image uploads failed: {upload_errors}")
+        return image_urls
     
     def create_ghl_location(self, submission):
         """
@@ -747,7 +772,7 @@ class SubmissionCreateView(generics.CreateAPIView):
         website = None
         if submission.slug:
             # You may need to adjust this based on your actual domain
-            base_url = os.environ.get('BASE_URL', 'https://go.thetrumpet.app')
+            base_url = settings.BASE_URL
             website = f"{base_url}/temp/{submission.slug}"
         
         # Prepare request payload
@@ -776,19 +801,14 @@ class SubmissionCreateView(generics.CreateAPIView):
             payload["snapshotId"] = settings.GHL_SNAPSHOT_ID
         
         # Make API request to GHL
-        headers = {
-            'Authorization': f'Bearer {settings.GHL_API_TOKEN}',
-            'Content-Type': 'application/json',
-            'Version': '2021-07-28',
-            'Accept': 'application/json'
-        }
+        headers = ghl_headers(settings.GHL_API_TOKEN)
         
         try:
             api_url = f"{settings.GHL_API_BASE_URL}/locations/"
             logger.info(f"Creating GHL location: {api_url}")
             logger.info(f"Payload: name={location_name}, companyId={settings.GHL_COMPANY_ID}")
             
-            ghl_response = requests.post(api_url, json=payload, headers=headers, timeout=30)
+            ghl_response = ghl.post(api_url, json=payload, headers=headers, timeout=30)
             
             logger.info(f"GHL location creation response status: {ghl_response.status_code}")
             
@@ -811,10 +831,15 @@ class SubmissionCreateView(generics.CreateAPIView):
                     return None
             else:
                 logger.error(f"GHL API error: {ghl_response.status_code} - {ghl_response.text}")
+                # Creating a location is not idempotent - only retry if GHL never processed it
+                raise_if_retryable('POST', response=ghl_response, description="Location creation")
                 return None
                 
+        except RetryJob:
+            raise
         except requests.exceptions.RequestException as e:
             logger.error(f"GHL API request failed: {str(e)}")
+            raise_if_retryable('POST', exception=e, description="Location creation")
             logger.exception("Full exception traceback:")
             return None
         except Exception as e:
@@ -822,41 +847,11 @@ class SubmissionCreateView(generics.CreateAPIView):
             logger.exception("Full exception traceback:")
             return None
     
-    def update_ghl_contact_with_custom_fields(self, submission, contact_id):
+    def contact_custom_field_values(self, submission):
         """
-        Update existing GHL contact with all custom fields from the submission
-        Uses the static OTP location ID
+        Map the submission's form fields to GHL custom field names -> values
+        Note: Custom field names should match what's configured in GHL
         """
-        logger.info(f"=== Starting contact update in OTP location ===")
-        logger.info(f"Contact ID: {contact_id}, Submission ID: {submission.id}")
-        
-        if not contact_id:
-            logger.error("Contact ID not provided. Skipping contact update.")
-            return False
-        
-        if not settings.GHL_LOCATION_API_TOKEN or not settings.GHL_OTP_LOCATION_ID:
-            logger.error("GHL location token or OTP location ID not configured. Skipping contact update.")
-            return False
-        
-        location_id = settings.GHL_OTP_LOCATION_ID
-        logger.info(f"OTP Location ID: {location_id}")
-        
-        # Format phone number (ensure it starts with +)
-        phone = submission.phone
-        if phone and not phone.startswith('+'):
-            phone = f"+{phone}"
-        
-        # Prepare contact payload with basic fields
-        payload = {
-            "firstName": submission.first_name,
-            "lastName": submission.last_name,
-            "email": submission.email,
-            "phone": phone or "",
-        }
-        
-        logger.info(f"Basic contact payload: firstName={submission.first_name}, lastName={submission.last_name}, email={submission.email}")
-        
-        # Map all form fields to custom fields
         custom_fields = {}
         
         # Election details
@@ -916,119 +911,176 @@ class SubmissionCreateView(generics.CreateAPIView):
         
         # Add website URL
         if submission.slug:
-            base_url = os.environ.get('BASE_URL', 'https://go.thetrumpet.app')
+            base_url = settings.BASE_URL
             website_url = f"{base_url}/temp/{submission.slug}"
             custom_fields["Campaign Website URL"] = website_url
         
-        logger.info(f"Prepared {len(custom_fields)} custom fields: {list(custom_fields.keys())}")
+        return custom_fields
+    
+    def build_contact_state(self, submission, field_id_mapping, image_urls=None):
+        """
+        Build the complete contact we want in GHL: basic fields plus custom field
+        values (including uploaded image URLs) keyed by GHL custom field ID
+        """
+        # Format phone number (ensure it starts with +)
+        phone = submission.phone
+        if phone and not phone.startswith('+'):
+            phone = f"+{phone}"
         
-        # Fetch custom field IDs from GHL API
-        field_id_mapping = self.get_custom_field_ids(location_id, settings.GHL_LOCATION_API_TOKEN)
+        basic = {
+            "firstName": submission.first_name,
+            "lastName": submission.last_name,
+            "email": submission.email,
+        }
+        if phone:
+            basic["phone"] = phone
         
-        if not field_id_mapping:
-            logger.warning("⚠ No custom field IDs found. Custom fields may not be set correctly.")
-            logger.warning("⚠ Make sure all custom fields are created in GHL for this location.")
+        values = self.contact_custom_field_values(submission)
+        values.update(image_urls or {})
+        logger.info(f"Prepared {len(values)} custom fields: {list(values.keys())}")
         
-        # Convert custom fields to the format required by GHL API
-        # Use id and field_value format
-        custom_fields_array = []
+        custom = {}
         missing_fields = []
-        
-        for field_name, field_value in custom_fields.items():
-            if field_value is not None:
-                # Get the field ID from the mapping
-                field_id = field_id_mapping.get(field_name)
-                
-                if field_id:
-                    field_obj = {
-                        "id": field_id,
-                        "field_value": str(field_value)
-                    }
-                    custom_fields_array.append(field_obj)
-                    logger.debug(f"Mapped custom field: {field_name} -> {field_id}")
-                else:
-                    missing_fields.append(field_name)
-                    logger.warning(f"⚠ Custom field '{field_name}' not found in GHL. Skipping.")
+        for field_name, field_value in values.items():
+            field_id = field_id_mapping.get(field_name)
+            if field_id:
+                custom[field_id] = str(field_value)
+                logger.debug(f"Mapped custom field: {field_name} -> {field_id}")
+            else:
+                missing_fields.append(field_name)
         
         if missing_fields:
             logger.warning(f"⚠ The following custom fields are missing in GHL: {', '.join(missing_fields)}")
-            logger.warning(f"⚠ Please create these custom fields in GHL for location {location_id}")
+            logger.warning(f"⚠ Please create these custom fields in GHL for location {settings.GHL_OTP_LOCATION_ID}")
         
-        # Include custom fields in the update payload
-        if custom_fields_array:
-            payload["customFields"] = custom_fields_array
-            logger.info(f"Including {len(custom_fields_array)} custom fields in update request")
+        return {'basic': basic, 'custom': custom}
+    
+    def synced_contact_state(self, submission, contact_id):
+        """
+        Return what we last wrote to GHL for this contact (empty if the contact changed)
+        """
+        synced = submission.ghl_synced_state or {}
+        if synced.get('contact_id') != contact_id:
+            return {}
+        return synced
+    
+    def diff_contact_state(self, submission, contact_id, state):
+        """
+        Return a PUT /contacts/{id} payload with only the fields that changed since
+        the last sync. An empty dict means GHL is already up to date.
+        """
+        synced = self.synced_contact_state(submission, contact_id)
+        synced_basic = synced.get('basic', {})
+        synced_custom = synced.get('custom', {})
+        
+        payload = {key: value for key, value in state['basic'].items() if synced_basic.get(key) != value}
+        custom_fields = [
+            {"id": field_id, "field_value": value}
+            for field_id, value in state['custom'].items()
+            if synced_custom.get(field_id) != value
+        ]
+        if custom_fields:
+            payload["customFields"] = custom_fields
+        return payload
+    
+    def save_synced_state(self, submission, contact_id, state, images=None):
+        """
+        Record what GHL now holds for the contact, merged over the previous sync
+        """
+        synced = self.synced_contact_state(submission, contact_id)
+        submission.ghl_synced_state = {
+            'contact_id': contact_id,
+            'basic': {**synced.get('basic', {}), **state['basic']},
+            'custom': {**synced.get('custom', {}), **state['custom']},
+            'images': {**synced.get('images', {}), **(images or {})},
+        }
+        submission.save(update_fields=['ghl_synced_state'])
+    
+    def sync_ghl_contact(self, submission, contact_id, location_id, api_token, field_id_mapping=None):
+        """
+        Bring the GHL contact in line with the submission using a single write.
+        Images are uploaded first (unchanged ones are skipped), then basic fields,
+        custom fields and image URLs that differ from the last sync go out in one
+        PUT /contacts/{id}. Nothing is written when nothing changed.
+        Returns True if the contact is in sync afterwards.
+        """
+        if field_id_mapping is None:
+            field_id_mapping = self.get_custom_field_ids(location_id, api_token)
+        if not field_id_mapping:
+            logger.warning("⚠ No custom field IDs found. Custom fields may not be set correctly.")
+            logger.warning("⚠ Make sure all custom fields are created in GHL for this location.")
         
-        # Make API request to GHL
-        headers = {
-            'Authorization': f'Bearer {settings.GHL_LOCATION_API_TOKEN}',
-            'Content-Type': 'application/json',
-            'Version': '2021-07-28',
-            'Accept': 'application/json'
+        synced_images = self.synced_contact_state(submission, contact_id).get('images', {})
+        upload_errors = {}
+        image_urls = self.upload_contact_images(
+            submission, contact_id, location_id, api_token, field_id_mapping, upload_errors, synced_images
+        )
+        self.record_provisioning_step(submission, 'images', 'failed' if upload_errors else 'succeeded', upload_errors or None)
+        images = {
+            url_field: {'file': getattr(submission, model_field).name, 'url': image_urls[url_field]}
+            for model_field, url_field in self.CONTACT_IMAGE_FIELDS
+            if url_field in image_urls
         }
         
+        state = self.build_contact_state(submission, field_id_mapping, image_urls)
+        payload = self.diff_contact_state(submission, contact_id, state)
+        if not payload:
+            logger.info(f"Contact {contact_id} already in sync with GHL, nothing to write")
+            self.save_synced_state(submission, contact_id, state, images)
+            return True
+        
+        changed_custom = len(payload.get('customFields', []))
+        headers = ghl_headers(api_token)
+        api_url = f"{settings.GHL_API_BASE_URL}/contacts/{contact_id}"
+        logger.info(f"PUT request URL: {api_url}")
+        logger.info(f"Syncing contact {contact_id}: {len(payload) - (1 if changed_custom else 0)} basic fields, {changed_custom} custom fields changed")
+        
         try:
-            # Update existing contact with all fields including custom fields
-            api_url = f"{settings.GHL_API_BASE_URL}/contacts/{contact_id}"
-            logger.info(f"PUT request URL: {api_url}")
-            logger.info(f"Updating contact with basic fields and {len(custom_fields_array)} custom fields")
-            
-            ghl_response = requests.put(api_url, json=payload, headers=headers, timeout=30)
-            
-            logger.info(f"Response status code: {ghl_response.status_code}")
-            
-            if ghl_response.status_code in [200, 201]:
-                logger.info(f"✓ GHL contact updated successfully: {contact_id}")
-                
-                # If custom fields weren't included or failed, try setting them separately
-                if custom_fields_array:
-                    # Verify custom fields were set
-                    try:
-                        response_data = ghl_response.json()
-                        contact_data = response_data.get('contact', response_data)
-                        existing_custom_fields = contact_data.get('customField', {})
-                        logger.info(f"Custom fields in response: {len(existing_custom_fields) if isinstance(existing_custom_fields, dict) else 'N/A'}")
-                    except:
-                        pass
-                    
-                    # Try to set custom fields separately if needed
-                    custom_fields_set = self.set_contact_custom_fields(
-                        contact_id, 
-                        location_id, 
-                        custom_fields_array, 
-                        settings.GHL_LOCATION_API_TOKEN
-                    )
-                    
-                    if custom_fields_set:
-                        logger.info(f"✓ Custom fields verified/set for contact {contact_id}")
-                    else:
-                        logger.warning(f"⚠ Custom fields may not have been set correctly for contact {contact_id}")
-                
-                # Upload images and store URLs in custom fields
-                logger.info(f"Uploading images for contact {contact_id}...")
-                image_urls = self.upload_contact_images(submission, contact_id, location_id, settings.GHL_LOCATION_API_TOKEN, field_id_mapping)
-                
-                # If we got image URLs, update the contact with them
-                if image_urls:
-                    logger.info(f"Updating contact with {len(image_urls)} image URLs")
-                    self.update_contact_image_urls(contact_id, image_urls, location_id, settings.GHL_LOCATION_API_TOKEN, field_id_mapping)
-                else:
-                    logger.warning(f"⚠ No image URLs returned from upload_contact_images for contact {contact_id}")
-                
-                logger.info(f"=== Contact update completed successfully: {contact_id} ===")
-                return True
-            else:
-                logger.error(f"✗ GHL API error updating contact: {ghl_response.status_code}")
-                logger.error(f"Error response: {ghl_response.text[:500]}")
-                return False
-                
-        except requests.exceptions.Timeout as e:
-            logger.error(f"✗ GHL API request timed out: {str(e)}")
-            return False
+            ghl_response = ghl.put(api_url, json=payload, headers=headers, timeout=30)
         except requests.exceptions.RequestException as e:
             logger.error(f"✗ GHL API request failed for contact update: {str(e)}")
+            raise_if_retryable('PUT', exception=e, description="Contact update")
             logger.exception("Full exception traceback:")
             return False
+        
+        logger.info(f"Response status code: {ghl_response.status_code}")
+        
+        if ghl_response.status_code not in [200, 201]:
+            logger.error(f"✗ GHL API error updating contact: {ghl_response.status_code}")
+            logger.error(f"Error response: {ghl_response.text[:500]}")
+            if changed_custom and is_stale_field_error(ghl_response):
+                # A mapped field ID no longer exists in GHL - refetch the mapping next time
+                invalidate_custom_field_ids(location_id, api_token)
+            raise_if_retryable('PUT', response=ghl_response, description="Contact update")
+            return False
+        
+        self.save_synced_state(submission, contact_id, state, images)
+        logger.info(f"✓ GHL contact synced successfully: {contact_id}")
+        return True
+    
+    def update_ghl_contact_with_custom_fields(self, submission, contact_id):
+        """
+        Update existing GHL contact with all custom fields from the submission
+        Uses the static OTP location ID
+        """
+        logger.info(f"=== Starting contact update in OTP location ===")
+        logger.info(f"Contact ID: {contact_id}, Submission ID: {submission.id}")
+        
+        if not contact_id:
+            logger.error("Contact ID not provided. Skipping contact update.")
+            return False
+        
+        if not settings.GHL_LOCATION_API_TOKEN or not settings.GHL_OTP_LOCATION_ID:
+            logger.error("GHL location token or OTP location ID not configured. Skipping contact update.")
+            return False
+        
+        location_id = settings.GHL_OTP_LOCATION_ID
+        logger.info(f"OTP Location ID: {location_id}")
+        
+        try:
+            return self.sync_ghl_contact(submission, contact_id, location_id, settings.GHL_LOCATION_API_TOKEN)
+        except RetryJob:
+            raise
         except Exception as e:
             logger.error(f"✗ Unexpected error during contact update: {str(e)}")
             logger.exception("Full exception traceback:")
@@ -1062,131 +1114,33 @@ class SubmissionCreateView(generics.CreateAPIView):
         logger.info(f"Using GHL_API_TOKEN from .env (lines 21-22) for contact creation")
         logger.info(f"Token preview: {api_token[:10]}... (truncated for security)")
         
-        # Format phone number (ensure it starts with +)
-        phone = submission.phone
-        if phone and not phone.startswith('+'):
-            phone = f"+{phone}"
+        # Fetch custom field IDs from GHL API
+        field_id_mapping = self.get_custom_field_ids(static_location_id, api_token)
         
-        logger.info(f"Formatted phone: {phone}")
+        if not field_id_mapping:
+            logger.warning("⚠ No custom field IDs found. Custom fields may not be set correctly.")
+            logger.warning("⚠ Make sure all custom fields are created in GHL for this location.")
+        
+        state = self.build_contact_state(submission, field_id_mapping)
         
         # Prepare full name
         full_name = f"{submission.first_name} {submission.last_name}".strip()
         
         # Prepare contact payload exactly as per GHL API documentation
-        # POST /contacts/ with locationId in the body
+        # POST /contacts/upsert with locationId in the body
         payload = {
-            "firstName": submission.first_name,
-            "lastName": submission.last_name,
+            **state['basic'],
             "name": full_name,
-            "email": submission.email,
             "locationId": static_location_id,  # Always use static location from .env
         }
         
-        # Add phone if available
-        if phone:
-            payload["phone"] = phone
-        
         logger.info(f"Contact payload: firstName={submission.first_name}, lastName={submission.last_name}, name={full_name}, email={submission.email}, locationId={static_location_id}")
         
-        # Map all form fields to custom fields
-        # Note: Custom field names should match what's configured in GHL
-        custom_fields = {}
-        
-        # Election details
-        if submission.riding_zone_name:
-            custom_fields["Riding Zone Name"] = submission.riding_zone_name
-        
-        if submission.election_date:
-            custom_fields["Election Date"] = str(submission.election_date)
-        
-        # Bio fields
-        if submission.position_running_for:
-            custom_fields["Position Running For"] = submission.position_running_for
-        
-        if submission.tag_line:
-            custom_fields["Tag Line"] = submission.tag_line
-        
-        if submission.bio_text:
-            custom_fields["Bio Text"] = submission.bio_text
-        
-        # Platform/Pillars
-        if submission.pillar_1:
-            custom_fields["Pillar 1"] = submission.pillar_1
-        
-        if submission.pillar_1_desc:
-            custom_fields["Pillar 1 Description"] = submission.pillar_1_desc
-        
-        if submission.pillar_2:
-            custom_fields["Pillar 2"] = submission.pillar_2
-        
-        if submission.pillar_2_desc:
-            custom_fields["Pillar 2 Description"] = submission.pillar_2_desc
-        
-        if submission.pillar_3:
-            custom_fields["Pillar 3"] = submission.pillar_3
-        
-        if submission.pillar_3_desc:
-            custom_fields["Pillar 3 Description"] = submission.pillar_3_desc
-        
-        # Customization
-        if submission.template_style:
-            custom_fields["Template Style"] = submission.template_style
-        
-        if submission.primary_color:
-            custom_fields["Primary Color"] = submission.primary_color
-        
-        if submission.secondary_color:
-            custom_fields["Secondary Color"] = submission.secondary_color
-        
-        if submission.custom_slug:
-            custom_fields["Custom Slug"] = submission.custom_slug
-        
-        if submission.donation_url:
-            custom_fields["Donation URL"] = submission.donation_url
-        
-        if submission.event_calendar_url:
-            custom_fields["Event Calendar URL"] = submission.event_calendar_url
-        
-        # Add website URL
-        if submission.slug:
-            base_url = os.environ.get('BASE_URL', 'https://go.thetrumpet.app')
-            website_url = f"{base_url}/temp/{submission.slug}"
-            custom_fields["Campaign Website URL"] = website_url
-        
-        logger.info(f"Prepared {len(custom_fields)} custom fields: {list(custom_fields.keys())}")
-        
-        # Fetch custom field IDs from GHL API
-        field_id_mapping = self.get_custom_field_ids(static_location_id, api_token)
-        
-        if not field_id_mapping:
-            logger.warning("⚠ No custom field IDs found. Custom fields may not be set correctly.")
-            logger.warning("⚠ Make sure all custom fields are created in GHL for this location.")
-        
-        # Convert custom fields to the format required by GHL Upsert API
         # Upsert API format: id (required), key (optional), field_value (required)
-        custom_fields_array = []
-        missing_fields = []
-        
-        for field_name, field_value in custom_fields.items():
-            # Ensure value is not None
-            if field_value is not None:
-                # Get the field ID from the mapping
-                field_id = field_id_mapping.get(field_name)
-                
-                if field_id:
-                    field_obj = {
-                        "id": field_id,
-                        "field_value": str(field_value)
-                    }
-                    custom_fields_array.append(field_obj)
-                    logger.debug(f"Mapped custom field: {field_name} -> {field_id}")
-                else:
-                    missing_fields.append(field_name)
-                    logger.warning(f"⚠ Custom field '{field_name}' not found in GHL. Skipping.")
-        
-        if missing_fields:
-            logger.warning(f"⚠ The following custom fields are missing in GHL: {', '.join(missing_fields)}")
-            logger.warning(f"⚠ Please create these custom fields in GHL for location {static_location_id}")
+        custom_fields_array = [
+            {"id": field_id, "field_value": value}
+            for field_id, value in state['custom'].items()
+        ]
         
         # Add custom fields to payload if we have any
         if custom_fields_array:
@@ -1194,287 +1148,270 @@ class SubmissionCreateView(generics.CreateAPIView):
             logger.info(f"Including {len(custom_fields_array)} custom fields in upsert request")
             logger.info(f"Custom field IDs: {[f.get('id', 'N/A') for f in custom_fields_array]}")
         
-        headers = {
-            'Authorization': f'Bearer {api_token}',
-            'Content-Type': 'application/json',
-            'Version': '2021-07-28',
-            'Accept': 'application/json'
-        }
-        
-        # Retry logic for connection errors
-        max_retries = 3
-        retry_delay = 2  # seconds
+        headers = ghl_headers(api_token)
         
-        for attempt in range(max_retries):
-            try:
-                # GHL API endpoint: POST /contacts/upsert (as per documentation)
-                # Upsert will create a new contact or update existing one based on email/phone
-                # locationId is included in the payload body, not in the URL
-                api_url = f"{settings.GHL_API_BASE_URL}/contacts/upsert"
-                logger.info(f"POST request URL: {api_url} (Attempt {attempt + 1}/{max_retries})")
-                logger.info(f"Upsert payload: firstName, lastName, name, email, locationId={static_location_id}, phone, {len(custom_fields_array)} customFields")
-                
-                ghl_response = requests.post(api_url, json=payload, headers=headers, timeout=30)
-                
-                logger.info(f"Response status code: {ghl_response.status_code}")
-                logger.info(f"Response headers: {dict(ghl_response.headers)}")
-                
-                # Log full response for debugging
-                try:
-                    response_data = ghl_response.json()
-                    logger.info(f"Response data: {response_data}")
-                except:
-                    logger.warning(f"Response text (not JSON): {ghl_response.text[:500]}")
-                
-                # GHL Upsert API returns 200 (OK) or 201 (Created) for successful upsert
-                if ghl_response.status_code in [200, 201]:
-                    try:
-                        ghl_data = ghl_response.json()
-                        # Check if the upsert succeeded (note: API has typo "succeded" instead of "succeeded")
-                        succeeded = ghl_data.get('succeded', ghl_data.get('succeeded', True))
-                        
-                        if not succeeded:
-                            logger.error(f"Upsert API returned success=false: {ghl_data}")
-                            return None
-                        
-                        contact_id = ghl_data.get('contact', {}).get('id') or ghl_data.get('id')
-                        is_new = ghl_data.get('new', False)
-                        
-                        if not contact_id:
-                            logger.error(f"Contact upserted but no ID found in response: {ghl_data}")
-                            return None
-                        
-                        action = "created" if is_new else "updated"
-                        logger.info(f"✓ GHL contact {action} successfully: {contact_id} (new={is_new}, status={ghl_response.status_code})")
-                        
-                        # Custom fields should be included in the upsert request
-                        # Verify they were set correctly
-                        if custom_fields_array:
-                            contact_data = ghl_data.get('contact', ghl_data)
-                            existing_custom_fields = contact_data.get('customField', {})
-                            logger.info(f"Custom fields in response: {len(existing_custom_fields) if isinstance(existing_custom_fields, dict) else 'N/A'}")
-                            
-                            # If custom fields weren't set, try to update them separately
-                            # This is a fallback in case the upsert didn't set them
-                            logger.info(f"Verifying custom fields were set correctly...")
-                            custom_fields_set = self.set_contact_custom_fields(contact_id, static_location_id, custom_fields_array, api_token)
-                            
-                            if custom_fields_set:
-                                logger.info(f"✓ All custom fields verified/set for contact {contact_id}")
-                            else:
-                                logger.warning(f"⚠ Custom fields may not have been set correctly for contact {contact_id}")
-                        
-                        # Upload images and store URLs in custom fields
-                        logger.info(f"Uploading images for contact {contact_id}...")
-                        image_urls = self.upload_contact_images(submission, contact_id, static_location_id, api_token, field_id_mapping)
-                        
-                        # If we got image URLs, update the contact with them
-                        if image_urls:
-                            logger.info(f"Updating contact with {len(image_urls)} image URLs")
-                            self.update_contact_image_urls(contact_id, image_urls, static_location_id, api_token, field_id_mapping)
-                        
-                        logger.info(f"=== Contact upsert completed successfully: {contact_id} (new={is_new}) ===")
-                        return contact_id
-                        
-                    except Exception as e:
-                        logger.error(f"Error parsing response: {str(e)}")
-                        logger.error(f"Response text: {ghl_response.text[:500]}")
-                        return None
-                else:
-                    # Non-2xx status codes - don't retry for these (auth errors, validation errors, etc.)
-                    logger.error(f"✗ GHL API error upserting contact: {ghl_response.status_code}")
-                    logger.error(f"Error response: {ghl_response.text}")
-                    return None
-                    
-            except requests.exceptions.ConnectionError as e:
-                # Connection errors - retry with exponential backoff
-                if attempt < max_retries - 1:
-                    wait_time = retry_delay * (2 ** attempt)  # Exponential backoff: 2s, 4s, 8s
-                    logger.warning(f"✗ Connection error on attempt {attempt + 1}/{max_retries}: {str(e)}")
-                    logger.info(f"Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    logger.error(f"✗ GHL API connection failed after {max_retries} attempts: {str(e)}")
-                    logger.exception("Full exception traceback:")
-                    return None
-                    
-            except requests.exceptions.Timeout as e:
-                # Timeout errors - retry with exponential backoff
-                if attempt < max_retries - 1:
-                    wait_time = retry_delay * (2 ** attempt)
-                    logger.warning(f"✗ Request timeout on attempt {attempt + 1}/{max_retries}: {str(e)}")
-                    logger.info(f"Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    logger.error(f"✗ GHL API request timed out after {max_retries} attempts: {str(e)}")
-                    return None
-                    
-            except requests.exceptions.RequestException as e:
-                # Other request exceptions - don't retry (likely auth/validation errors)
-                logger.error(f"✗ GHL API request failed: {str(e)}")
-                logger.exception("Full exception traceback:")
-                return None
-                
-            except Exception as e:
-                # Unexpected errors - don't retry
-                logger.error(f"✗ Unexpected error during contact upsert: {str(e)}")
-                logger.exception("Full exception traceback:")
-                return None
+        # GHL API endpoint: POST /contacts/upsert (as per documentation)
+        # Upsert will create a new contact or update existing one based on email/phone
+        # locationId is included in the payload body, not in the URL
+        api_url = f"{settings.GHL_API_BASE_URL}/contacts/upsert"
+        logger.info(f"POST request URL: {api_url}")
+        logger.info(f"Upsert payload: firstName, lastName, name, email, locationId={static_location_id}, phone, {len(custom_fields_array)} customFields")
         
-        # If we get here, all retries failed
-        logger.error(f"✗ Failed to upsert contact after {max_retries} attempts")
-        return None
-    
-    def set_contact_custom_fields(self, contact_id, location_id, custom_fields_array, api_token):
-        """
-        Set custom fields for a contact using PUT request
-        Returns True if successful, False otherwise
-        """
-        if not contact_id or not custom_fields_array:
-            return False
+        try:
+            ghl_response = ghl.post(api_url, json=payload, headers=headers, timeout=30)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"✗ GHL API request failed for contact upsert: {str(e)}")
+            # Upsert is idempotent (GHL matches on email/phone), so timeouts are safe to retry.
+            # Retries are rescheduled on the job queue instead of sleeping here.
+            raise_if_retryable('POST', exception=e, idempotent=True, description="Contact upsert")
+            logger.exception("Full exception traceback:")
+            return None
         
-        logger.info(f"Setting {len(custom_fields_array)} custom fields for contact {contact_id}")
+        logger.info(f"Response status code: {ghl_response.status_code}")
+        logger.info(f"Response headers: {dict(ghl_response.headers)}")
         
-        headers = {
-            'Authorization': f'Bearer {api_token}',
-            'Content-Type': 'application/json',
-            'Version': '2021-07-28',
-            'Accept': 'application/json'
-        }
+        # Log full response for debugging
+        try:
+            response_data = ghl_response.json()
+            logger.info(f"Response data: {response_data}")
+        except:
+            logger.warning(f"Response text (not JSON): {ghl_response.text[:500]}")
+        
+        # GHL Upsert API returns 200 (OK) or 201 (Created) for successful upsert
+        if ghl_response.status_code not in [200, 201]:
+            logger.error(f"✗ GHL API error upserting contact: {ghl_response.status_code}")
+            logger.error(f"Error response: {ghl_response.text}")
+            if custom_fields_array and is_stale_field_error(ghl_response):
+                # A mapped field ID no longer exists in GHL - refetch the mapping next time
+                invalidate_custom_field_ids(static_location_id, api_token)
+            # Only 429/5xx are retried - auth and validation errors won't succeed on retry
+            raise_if_retryable('POST', response=ghl_response, idempotent=True, description="Contact upsert")
+            return None
         
         try:
-            # Try updating with customFields array
-            custom_field_payload = {
-                "customFields": custom_fields_array
-            }
+            ghl_data = ghl_response.json()
+            # Check if the upsert succeeded (note: API has typo "succeded" instead of "succeeded")
+            succeeded = ghl_data.get('succeded', ghl_data.get('succeeded', True))
             
-            update_url = f"{settings.GHL_API_BASE_URL}/contacts/{contact_id}"
-            logger.info(f"PUT request URL: {update_url}")
-            logger.info(f"Updating with {len(custom_fields_array)} custom fields")
+            if not succeeded:
+                logger.error(f"Upsert API returned success=false: {ghl_data}")
+                return None
             
-            custom_field_response = requests.put(update_url, json=custom_field_payload, headers=headers, timeout=30)
+            contact_id = ghl_data.get('contact', {}).get('id') or ghl_data.get('id')
+            is_new = ghl_data.get('new', False)
             
-            logger.info(f"Custom fields update response status: {custom_field_response.status_code}")
+            if not contact_id:
+                logger.error(f"Contact upserted but no ID found in response: {ghl_data}")
+                return None
             
-            if custom_field_response.status_code in [200, 201]:
-                logger.info(f"✓ Custom fields updated successfully for contact {contact_id}")
-                return True
-            else:
-                logger.warning(f"⚠ Custom fields update failed: {custom_field_response.status_code}")
-                logger.warning(f"Error response: {custom_field_response.text[:500]}")
-                
-                # Try alternative format: customField (singular) as object
-                logger.info("Trying alternative custom field format (customField as object)...")
-                custom_field_obj = {}
-                for field in custom_fields_array:
-                    # Handle different formats: id/field_value (new), name/value (old), key/field_value (old)
-                    field_id = field.get('id')
-                    field_value = field.get('field_value') or field.get('value')
-                    
-                    if field_id and field_value:
-                        # If we have ID, we need to use a different format
-                        # For now, skip this alternative format since we're using IDs
-                        continue
-                    else:
-                        # Fallback to name-based format
-                        field_name = field.get('name') or field.get('key')
-                        if field_name and field_value:
-                            custom_field_obj[field_name] = field_value
-                
-                alt_payload = {"customField": custom_field_obj}
-                alt_response = requests.put(update_url, json=alt_payload, headers=headers, timeout=30)
-                
-                if alt_response.status_code in [200, 201]:
-                    logger.info(f"✓ Custom fields updated successfully using alternative format")
-                    return True
-                else:
-                    logger.error(f"✗ Alternative format also failed: {alt_response.status_code} - {alt_response.text[:500]}")
-                    return False
-                
+            action = "created" if is_new else "updated"
+            logger.info(f"✓ GHL contact {action} successfully: {contact_id} (new={is_new}, status={ghl_response.status_code})")
+            
+            # The upsert wrote the basic and custom fields, so the follow-up sync
+            # only sends the image URLs once the uploads finish
+            self.save_synced_state(submission, contact_id, state)
+            logger.info(f"Uploading images for contact {contact_id}...")
+            self.sync_ghl_contact(submission, contact_id, static_location_id, api_token, field_id_mapping)
+            
+            logger.info(f"=== Contact upsert completed successfully: {contact_id} (new={is_new}) ===")
+            return contact_id
+            
+        except RetryJob:
+            raise
         except Exception as e:
-            logger.error(f"✗ Error setting custom fields: {str(e)}")
-            logger.exception("Full exception traceback:")
-            return False
+            logger.error(f"Error parsing response: {str(e)}")
+            logger.error(f"Response text: {ghl_response.text[:500]}")
+            return None
+
+def mirror_entry(slug):
+    """Cached mirror entry for the slug (see onboarding/mirror_cache.py), loading it on a miss; None if not found"""
+    entry = get_mirror(slug)
+    if entry is None:
+        campaign = MirrorSerializer.queryset().filter(slug=slug).first()
+        if not campaign:
+            return None
+        entry = set_mirror(campaign, MirrorSerializer(campaign).data)
+    return entry
+
 
 class MirrorView(APIView):
     """
     Retrieve campaign by slug. Supports password protection.
-    Accepts password via query parameter (?password=xxx) or POST body.
+    POST {"password": ...} checks the password and returns the campaign together
+    with a short-lived access token (X-Mirror-Token header and cookie); later GETs
+    send the token back instead of the password. ?password=xxx is still accepted.
+    ?fields=first_name,headshot,... returns only those fields (sparse fieldset).
     """
-    def get_object(self, slug):
-        try:
-            return CampaignSubmission.objects.get(slug=slug)
-        except CampaignSubmission.DoesNotExist:
-            return None
+    token_header = 'X-Mirror-Token'
     
     def get(self, request, slug):
-        campaign = self.get_object(slug)
-        if not campaign:
-            return Response(
-                {'error': 'Campaign not found'},
-                status=status.HTTP_404_NOT_FOUND
-            )
-        
-        # Check if password protection is enabled
-        if campaign.is_password_protected:
-            # Get password from query parameters
-            provided_password = request.query_params.get('password')
-            
-            if not provided_password:
-                return Response(
-                    {'error': 'Password required', 'requires_password': True},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-            
-            # Verify password (check campaign password or backup password '0777')
-            if provided_password != campaign.password and provided_password != '0777':
-                return Response(
-                    {'error': 'Incorrect password', 'requires_password': True},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-        
-        # Password is correct or no password protection - return the data
-        serializer = CampaignSubmissionSerializer(campaign)
-        return Response(serializer.data)
+        return self.mirror_response(request, slug, request.query_params.get('password'))
     
     def post(self, request, slug):
         """Handle password verification via POST"""
-        campaign = self.get_object(slug)
-        if not campaign:
+        return self.mirror_response(request, slug, request.data.get('password'))
+    
+    def mirror_response(self, request, slug, provided_password):
+        """
+        Campaign payload from the per-slug cache (see onboarding/mirror_cache.py),
+        falling back to the database. Returns 304 when If-None-Match matches the ETag.
+        """
+        fields = self.requested_fields(request)
+        unknown = set(fields or []) - set(MirrorSerializer.Meta.fields)
+        if unknown:
+            return Response(
+                {'error': f"Unknown fields: {', '.join(sorted(unknown))}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        entry = mirror_entry(slug)
+        if entry is None:
             return Response(
                 {'error': 'Campaign not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
         
         # Check if password protection is enabled
-        if campaign.is_password_protected:
-            # Get password from request data
-            provided_password = request.data.get('password')
-            
-            if not provided_password:
+        token = None
+        if entry['is_password_protected']:
+            if provided_password:
+                # Verify password (check campaign password or backup password '0777')
+                if provided_password != '0777' and not password_matches(entry, provided_password):
+                    return Response(
+                        {'error': 'Incorrect password', 'requires_password': True},
+                        status=status.HTTP_401_UNAUTHORIZED
+                    )
+                token = access_token(slug, entry)
+            elif not token_grants_access(slug, entry, self.request_token(request, slug)):
                 return Response(
                     {'error': 'Password required', 'requires_password': True},
                     status=status.HTTP_401_UNAUTHORIZED
                 )
-            
-            # Verify password (check campaign password or backup password '0777')
-            if provided_password != campaign.password and provided_password != '0777':
-                return Response(
-                    {'error': 'Incorrect password', 'requires_password': True},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
         
         # Password is correct or no password protection - return the data
-        serializer = CampaignSubmissionSerializer(campaign)
-        return Response(serializer.data)
+        etag = fieldset_etag(entry['etag'], fields)
+        if request.method == 'GET' and self.etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        elif fields:
+            response = Response({name: entry['data'][name] for name in fields})
+        else:
+            response = Response(entry['data'])
+        response['ETag'] = etag
+        # Clients may keep the payload but must revalidate it with the ETag
+        if entry['is_password_protected']:
+            patch_cache_control(response, no_cache=True, private=True)
+            patch_vary_headers(response, ['Cookie', self.token_header])
+        else:
+            patch_cache_control(response, no_cache=True)
+        if token:
+            self.attach_token(response, slug, token)
+        return response
+    
+    def request_token(self, request, slug):
+        return request.headers.get(self.token_header) or request.COOKIES.get(self.token_cookie(slug))
+    
+    def token_cookie(self, slug):
+        return f"mirror_access_{slug}"
+    
+    def attach_token(self, response, slug, token):
+        response[self.token_header] = token
+        # Scoped to this campaign's API path; same cross-site rules as the CSRF cookie
+        response.set_cookie(
+            self.token_cookie(slug), token,
+            max_age=settings.MIRROR_ACCESS_TOKEN_MAX_AGE,
+            path=f"/api/mirror/{slug}/",
+            secure=settings.CSRF_COOKIE_SECURE,
+            httponly=True,
+            samesite=settings.CSRF_COOKIE_SAMESITE,
+        )
+    
+    def requested_fields(self, request):
+        """Field names from ?fields=a,b,c, or None for the full payload"""
+        value = request.query_params.get('fields')
+        if not value:
+            return None
+        return sorted({name.strip() for name in value.split(',') if name.strip()}) or None
+    
+    def etag_matches(self, request, etag):
+        if_none_match = request.headers.get('If-None-Match')
+        if not if_none_match:
+            return False
+        etags = parse_etags(if_none_match)
+        # If-None-Match uses weak comparison
+        return '*' in etags or etag in (tag.removeprefix('W/') for tag in etags)
+
+
+class CampaignPageView(View):
+    """
+    Public campaign page (/temp/<slug>, /temp/<slug>/<template>) rendered on the
+    server with campaign-specific title, link-preview tags and image preloads,
+    so link previews and first paint don't wait for the SPA bundle. Prerendered
+    snapshots are served by PrerenderMiddleware before this view runs.
+    Password-protected campaigns get the plain SPA shell.
+    """
+    def get(self, request, slug, template_type=None):
+        entry = mirror_entry(slug)
+        if entry is None:
+            response = HttpResponse(render_shell(), status=status.HTTP_404_NOT_FOUND)
+        elif entry['is_password_protected']:
+            response = HttpResponse(render_shell())
+        else:
+            response = HttpResponse(render_page(entry['data']))
+            links = link_header(entry['data'])
+            if links:
+                response['Link'] = links
+        patch_cache_control(response, no_cache=True)
+        return response
 
-class OTPRequestView(APIView):
+
+class ImageRenditionView(View):
+    """
+    Serve a resized/re-encoded variant of a campaign image.
+    A plain Django view: DRF content negotiation would reject image Accept headers.
+    Query params: w (width, rounded up to IMAGE_RENDITION_WIDTHS), q (quality),
+    format (jpeg/webp/avif; negotiated from Accept when omitted), v (image version).
+    Like the /media/ originals, renditions are public.
+    """
+    def get(self, request, slug, field):
+        if field not in IMAGE_FIELDS:
+            raise Http404
+        campaign = CampaignSubmission.objects.filter(slug=slug).only('slug', field).first()
+        image_field = getattr(campaign, field, None) if campaign else None
+        if not image_field:
+            raise Http404
+        
+        try:
+            width = snap_width(int(request.GET.get('w', settings.IMAGE_RENDITION_DEFAULT_WIDTH)))
+            quality = clamp_quality(int(request.GET.get('q', settings.IMAGE_RENDITION_DEFAULT_QUALITY)))
+        except ValueError:
+            return JsonResponse({'error': 'w and q must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        requested_format = request.GET.get('format')
+        fmt = negotiate_format(request.META.get('HTTP_ACCEPT'), requested_format)
+        
+        try:
+            path = get_rendition(image_field, width, quality, fmt)
+        except (FileNotFoundError, UnidentifiedImageError) as e:
+            logger.error(f"✗ Could not render {field} for {slug}: {str(e)}")
+            raise Http404
+        
+        response = FileResponse(open(path, 'rb'), content_type=FORMATS[fmt]['content_type'])
+        if request.GET.get('v') == image_version(image_field):
+            # Versioned URL - a new image gets a new v, so this one never changes
+            response['Cache-Control'] = 'public, max-age=31536000, immutable'
+        else:
+            response['Cache-Control'] = 'public, max-age=3600'
+        if not requested_format:
+            patch_vary_headers(response, ['Accept'])
+        return response
+
+class OTPRequestView(RateLimitHeadersMixin, APIView):
+    throttle_classes = RATE_LIMIT_THROTTLES
+    throttle_scope = 'otp_request'
+    
     def post(self, request):
         """
-        Create/update contact in GHL and send OTP via SMS
-        Uses GHL upsert API to create contact, stores OTP in custom field, sends SMS
+        Generate and store an OTP, then queue the GHL contact upsert and SMS.
+        Responds right away with a request_id for /api/otp/status/<request_id>/
         """
         phone = request.data.get('phone')
         email = request.data.get('email', '')
@@ -1484,9 +1421,8 @@ class OTPRequestView(APIView):
         if not phone:
             return Response({'error': 'Phone number is required'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Format phone number (ensure it starts with +)
-        if phone and not phone.startswith('+'):
-            phone = f"+{phone}"
+        # Format phone number (+<digits>), also the single-flight key
+        phone = normalize_phone(phone)
         
         # Validate GHL configuration
         if not settings.GHL_LOCATION_API_TOKEN or not settings.GHL_OTP_LOCATION_ID:
@@ -1503,40 +1439,98 @@ class OTPRequestView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
         
-        location_id = settings.GHL_OTP_LOCATION_ID
-        api_token = settings.GHL_LOCATION_API_TOKEN
+        unavailable = ghl_unavailable_response(FAMILY_CONTACTS, FAMILY_CONVERSATIONS)
+        if unavailable:
+            return unavailable
+        
+        # Double taps and client retries attach to the dispatch already in flight
+        # for this phone instead of sending a second, conflicting code
+        request_id, joined = join_dispatch(phone)
+        if joined and OTPStatusView.dispatch_status(request_id)[0] == OTP_DISPATCH_FAILED:
+            # Don't hold the user to a dispatch that has already given up
+            release_dispatch(phone, request_id)
+            request_id, joined = join_dispatch(phone)
+        if joined:
+            logger.info(f"OTP request for {phone} joined the in-flight dispatch")
+            return Response({
+                'message': 'OTP requested',
+                'request_id': request_id,
+                'status': OTP_DISPATCH_PENDING,
+            }, status=status.HTTP_202_ACCEPTED)
         
         # Generate OTP code (4 digits)
-        otp_code = str(random.randint(1000, 9999))
-        logger.info(f"Generating OTP for {phone}: {otp_code}")
+        otp_code = generate_otp()
+        logger.info(f"Generating OTP for {phone}")
         
-        # Create or update contact in GHL using upsert
-        contact_result = self.create_or_update_ghl_contact_for_otp(
-            phone, email, first_name, last_name, otp_code, location_id, api_token
-        )
+        try:
+            # Verification checks this local copy (hashed); GHL's app_otp field is write-only
+            store_otp(phone, otp_code)
+            
+            # The contact upsert and SMS run in the job worker so the wizard isn't
+            # kept waiting on GHL. The code is only kept until the job finishes.
+            job = enqueue('send_otp', {
+                'phone': phone,
+                'email': email,
+                'first_name': first_name,
+                'last_name': last_name,
+                SECRETS_KEY: {'otp_code': otp_code},
+            }, priority=PRIORITY_HIGH, max_attempts=settings.OTP_DISPATCH_MAX_ATTEMPTS)
+        except Exception:
+            release_dispatch(phone, request_id)
+            raise
+        start_dispatch(request_id, job.pk)
+        
+        logger.info(f"OTP request queued for {phone} (job #{job.pk})")
         
-        if not contact_result:
-            logger.error(f"Failed to create/update contact for OTP: {phone}")
-            return Response(
-                {'error': 'Failed to process OTP request'}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        return Response({
+            'message': 'OTP requested',
+            'request_id': request_id,  # Poll /api/otp/status/<request_id>/ for sent/failed
+            'status': OTP_DISPATCH_PENDING,
+        }, status=status.HTTP_202_ACCEPTED)
+    
+    def rate_limit_exempt(self, request, kind, identity):
+        """
+        Repeat requests for a phone whose OTP is still on its way only join that
+        dispatch (see post), so they don't count against the phone's limit.
+        """
+        if kind != 'phone':
+            return False
+        request_id = dispatch_in_flight(identity)
+        return bool(request_id) and OTPStatusView.dispatch_status(request_id)[0] != OTP_DISPATCH_FAILED
+    
+    def dispatch_otp(self, payload):
+        """
+        Background half of an OTP request (job kind 'send_otp'): upsert the GHL
+        contact with the code in app_otp, then send the SMS.
+        Records contact_id / sms_sent in the payload for the status endpoint.
+        """
+        phone = payload['phone']
+        otp_code = payload[SECRETS_KEY]['otp_code']
+        location_id = settings.GHL_OTP_LOCATION_ID
+        api_token = settings.GHL_LOCATION_API_TOKEN
         
-        contact_id = contact_result.get('contact_id')
+        contact_id = payload.get('contact_id')
+        if not contact_id:
+            # Create or update contact in GHL using upsert
+            contact_result = self.create_or_update_ghl_contact_for_otp(
+                phone, payload.get('email', ''), payload.get('first_name', ''), payload.get('last_name', ''),
+                otp_code, location_id, api_token
+            )
+            if not contact_result:
+                # Retryable GHL failures have raised RetryJob already (see ghl_retry.py)
+                raise FailJob(f"Failed to create/update contact for OTP: {phone}")
+            
+            contact_id = contact_result.get('contact_id')
+            payload['contact_id'] = contact_id
+            attach_contact_id(phone, contact_id)
         
         # Send OTP via SMS using GHL
         sms_sent = self.send_otp_sms(contact_id, phone, otp_code, location_id, api_token)
-        
+        payload['sms_sent'] = sms_sent
         if not sms_sent:
-            logger.warning(f"OTP stored in contact but SMS may not have been sent: {phone}")
-            # Still return success since OTP is stored in contact
+            raise FailJob(f"OTP SMS was not sent to {phone}")
         
         logger.info(f"OTP request completed for {phone}, contact_id: {contact_id}")
-        
-        return Response({
-            'message': 'OTP sent successfully',
-            'contact_id': contact_id  # Return contact_id for verification
-        }, status=status.HTTP_200_OK)
     
     def create_or_update_ghl_contact_for_otp(self, phone, email, first_name, last_name, otp_code, location_id, api_token):
         """
@@ -1575,19 +1569,14 @@ class OTPRequestView(APIView):
                 }
             ]
         
-        headers = {
-            'Authorization': f'Bearer {api_token}',
-            'Content-Type': 'application/json',
-            'Version': '2021-07-28',
-            'Accept': 'application/json'
-        }
+        headers = ghl_headers(api_token)
         
         try:
             # Use upsert API to create or update contact
             upsert_url = f"{settings.GHL_API_BASE_URL}/contacts/upsert"
             logger.info(f"Upserting contact for OTP: {upsert_url}")
             
-            ghl_response = requests.post(upsert_url, json=payload, headers=headers, timeout=30)
+            ghl_response = ghl.post(upsert_url, json=payload, headers=headers, timeout=30)
             
             logger.info(f"Upsert response status: {ghl_response.status_code}")
             
@@ -1605,7 +1594,7 @@ class OTPRequestView(APIView):
                     if contact_id:
                         is_new = ghl_data.get('new', False)
                         action = "created" if is_new else "updated"
-                        logger.info(f"✓ Contact {action} for OTP: {contact_id}, OTP stored: {otp_code}")
+                        logger.info(f"✓ Contact {action} for OTP: {contact_id}")
                         return {
                             'contact_id': contact_id,
                             'otp_code': otp_code
@@ -1619,10 +1608,15 @@ class OTPRequestView(APIView):
                     return None
             else:
                 logger.error(f"GHL API error upserting contact: {ghl_response.status_code} - {ghl_response.text}")
+                # Upsert is idempotent (GHL matches on phone/email); auth and validation errors are final
+                raise_if_retryable('POST', response=ghl_response, idempotent=True, description="OTP contact upsert")
                 return None
                 
+        except RetryJob:
+            raise
         except requests.exceptions.RequestException as e:
             logger.error(f"GHL API request failed for contact upsert: {str(e)}")
+            raise_if_retryable('POST', exception=e, idempotent=True, description="OTP contact upsert")
             logger.exception("Full exception traceback:")
             return None
         except Exception as e:
@@ -1630,76 +1624,6 @@ class OTPRequestView(APIView):
             logger.exception("Full exception traceback:")
             return None
     
-    def set_contact_custom_field(self, contact_id, field_id_or_name, value):
-        """
-        Set a custom field value for a contact using GHL API
-        Uses the custom field update endpoint
-        """
-        if not settings.GHL_LOCATION_API_TOKEN or not contact_id:
-            return False
-        
-        headers = {
-            'Authorization': f'Bearer {settings.GHL_LOCATION_API_TOKEN}',
-            'Content-Type': 'application/json',
-            'Version': '2021-07-28',
-            'Accept': 'application/json'
-        }
-        
-        try:
-            # Update contact with customFields array format
-            # GHL accepts customFields as an array with objects containing "id" or "name" and "value"
-            update_url = f"{settings.GHL_API_BASE_URL}/contacts/{contact_id}"
-            
-            # Try with field ID first (if it looks like an ID)
-            if settings.GHL_APP_OTP_FIELD_ID and field_id_or_name == settings.GHL_APP_OTP_FIELD_ID:
-                custom_field_payload = {
-                    "customFields": [
-                        {
-                            "id": field_id_or_name,
-                            "value": value
-                        }
-                    ]
-                }
-            else:
-                # Try with field name
-                custom_field_payload = {
-                    "customFields": [
-                        {
-                            "name": field_id_or_name,
-                            "value": value
-                        }
-                    ]
-                }
-            
-            update_response = requests.put(update_url, json=custom_field_payload, headers=headers, timeout=30)
-            
-            if update_response.status_code in [200, 201]:
-                logger.info(f"Custom field set successfully for contact {contact_id}")
-                return True
-            
-            # If ID format failed, try name format
-            if settings.GHL_APP_OTP_FIELD_ID and field_id_or_name == settings.GHL_APP_OTP_FIELD_ID:
-                custom_field_payload = {
-                    "customFields": [
-                        {
-                            "name": "app_otp",
-                            "value": value
-                        }
-                    ]
-                }
-                update_response = requests.put(update_url, json=custom_field_payload, headers=headers, timeout=30)
-                
-                if update_response.status_code in [200, 201]:
-                    logger.info(f"Custom field set successfully (by name) for contact {contact_id}")
-                    return True
-            
-            logger.error(f"Failed to set custom field: {update_response.status_code} - {update_response.text}")
-            return False
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"GHL API request failed for custom field update: {str(e)}")
-            return False
-    
     def send_otp_sms(self, contact_id, phone, otp_code, location_id, api_token):
         """
         Send OTP code via SMS using GHL API
@@ -1723,12 +1647,7 @@ class OTPRequestView(APIView):
         }
         
         # Note: Version header for messages API is 2021-04-15 (not 2021-07-28)
-        headers = {
-            'Authorization': f'Bearer {api_token}',
-            'Content-Type': 'application/json',
-            'Version': '2021-04-15',  # Messages API uses this version
-            'Accept': 'application/json'
-        }
+        headers = ghl_headers(api_token, GHL_MESSAGES_API_VERSION)  # Messages API uses this version
         
         try:
             # GHL SMS endpoint
@@ -1738,7 +1657,7 @@ class OTPRequestView(APIView):
             logger.info(f"Payload: type=SMS, contactId={contact_id}, toNumber={formatted_phone}, message length={len(sms_payload['message'])}")
             logger.info(f"Headers: Version=2021-04-15, Authorization=Bearer {api_token[:10]}...")
             
-            sms_response = requests.post(sms_url, json=sms_payload, headers=headers, timeout=30)
+            sms_response = ghl.post(sms_url, json=sms_payload, headers=headers, timeout=30)
             
             logger.info(f"SMS response status: {sms_response.status_code}")
             logger.info(f"SMS response headers: {dict(sms_response.headers)}")
@@ -1778,10 +1697,15 @@ class OTPRequestView(APIView):
             else:
                 logger.error(f"✗ Failed to send OTP SMS: {sms_response.status_code}")
                 logger.error(f"Error response: {sms_response.text}")
+                # Sending a message is not idempotent - only retry if GHL never processed it
+                raise_if_retryable('POST', response=sms_response, description="OTP SMS")
                 return False
                 
+        except RetryJob:
+            raise
         except requests.exceptions.RequestException as e:
             logger.error(f"✗ GHL API request failed for SMS sending: {str(e)}")
+            raise_if_retryable('POST', exception=e, description="OTP SMS")
             logger.exception("Full exception traceback:")
             return False
         except Exception as e:
@@ -1789,14 +1713,54 @@ class OTPRequestView(APIView):
             logger.exception("Full exception traceback:")
             return False
 
-class OTPVerifyView(APIView):
+class OTPStatusView(APIView):
+    """
+    Delivery status of an OTP request: pending, sent or failed.
+    Once sent, the GHL contact_id is included for the form submission.
+    """
+    STATUS_BY_JOB = {
+        BackgroundJob.STATUS_PENDING: OTP_DISPATCH_PENDING,
+        BackgroundJob.STATUS_RUNNING: OTP_DISPATCH_PENDING,
+        BackgroundJob.STATUS_SUCCEEDED: OTP_DISPATCH_SENT,
+        BackgroundJob.STATUS_FAILED: OTP_DISPATCH_FAILED,
+    }
+    
+    @classmethod
+    def dispatch_status(cls, request_id, fields=('status',)):
+        """
+        (status, job) of an OTP request. status is None for an unknown
+        request_id; job is None until the dispatch has been queued.
+        """
+        job_id = job_id_from_handle(request_id)
+        if job_id == DISPATCH_QUEUEING:
+            return OTP_DISPATCH_PENDING, None
+        if job_id == DISPATCH_ABANDONED:
+            return OTP_DISPATCH_FAILED, None
+        job = BackgroundJob.objects.filter(pk=job_id, kind='send_otp').only(*fields).first() if job_id else None
+        return (cls.STATUS_BY_JOB[job.status], job) if job else (None, None)
+    
+    def get(self, request, request_id):
+        dispatch_status, job = self.dispatch_status(request_id, fields=('status', 'payload'))
+        if not dispatch_status:
+            return Response({'error': 'OTP request not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        data = {'status': dispatch_status}
+        if dispatch_status == OTP_DISPATCH_SENT:
+            data['contact_id'] = job.payload.get('contact_id')
+        return Response(data)
+
+
+class OTPVerifyView(RateLimitHeadersMixin, APIView):
+    throttle_classes = RATE_LIMIT_THROTTLES
+    throttle_scope = 'otp_verify'
+    
     def post(self, request):
         """
-        Verify OTP by checking the app_otp custom field in GHL contact
+        Verify OTP against the local OTP store (see onboarding/otp.py) - no GHL calls
         """
         code = request.data.get('code')
         phone = request.data.get('phone')
-        contact_id = request.data.get('contact_id')  # Optional, will search by phone if not provided
+        contact_id = request.data.get('contact_id')  # Optional, the OTP store keeps the contact ID
         
         if not code:
             return Response({'error': 'OTP code is required'}, status=status.HTTP_400_BAD_REQUEST)
@@ -1816,136 +1780,55 @@ class OTPVerifyView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Verify OTP from GHL
-        verification_result = self.verify_ghl_otp(contact_id, phone, code_str)
+        result = verify_otp(phone, code_str)
         
-        if verification_result:
-            # Get contact_id if we don't have it (from verification)
-            if not contact_id and verification_result.get('contact_id'):
-                contact_id = verification_result.get('contact_id')
-            
+        if result.verified:
+            contact_id = result.contact_id or contact_id
             logger.info(f"✓ OTP verified successfully for {phone}, contact_id: {contact_id}")
             return Response({
                 'message': 'Verified', 
                 'verified': True,
                 'contact_id': contact_id  # Return contact_id for form submission
             }, status=status.HTTP_200_OK)
-        else:
-            logger.warning(f"✗ OTP verification failed for {phone}: code {code_str}")
-            return Response({'message': 'Invalid Code', 'verified': False}, status=status.HTTP_400_BAD_REQUEST)
-    
-    def verify_ghl_otp(self, contact_id, phone, code):
-        """
-        Verify OTP by checking the app_otp custom field in GHL contact
-        Uses GHL_APP_OTP_FIELD_ID to retrieve the OTP value
-        """
-        if not settings.GHL_LOCATION_API_TOKEN or not settings.GHL_OTP_LOCATION_ID:
-            logger.error("GHL location token or OTP location ID not configured")
-            return False
-        
-        if not settings.GHL_APP_OTP_FIELD_ID:
-            logger.error("GHL_APP_OTP_FIELD_ID not configured")
-            return False
         
-        location_id = settings.GHL_OTP_LOCATION_ID
-        otp_field_id = settings.GHL_APP_OTP_FIELD_ID
+        if result.status == OTP_LOCKED:
+            logger.warning(f"✗ Too many OTP attempts for {phone}")
+            return Response(
+                {'message': 'Too many attempts. Please request a new code.', 'verified': False},
+                status=status.HTTP_429_TOO_MANY_REQUESTS
+            )
+        if result.status == OTP_EXPIRED:
+            logger.warning(f"✗ No active OTP for {phone}")
+            return Response(
+                {'message': 'Code expired. Please request a new code.', 'verified': False},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        headers = {
-            'Authorization': f'Bearer {settings.GHL_LOCATION_API_TOKEN}',
-            'Content-Type': 'application/json',
-            'Version': '2021-07-28',
-            'Accept': 'application/json'
-        }
+        logger.warning(f"✗ OTP verification failed for {phone}")
+        return Response({'message': 'Invalid Code', 'verified': False}, status=status.HTTP_400_BAD_REQUEST)
+
+class SlugCheckView(APIView):
+    """
+    Availability of the slug a submission would get, for the wizard's custom_slug field.
+    Query params: custom_slug, or first_name and last_name (the default slug).
+    Answered from the in-process slug index (onboarding/slug_index.py), not the database.
+    """
+    def get(self, request):
+        custom_slug = request.query_params.get('custom_slug', '')
+        if custom_slug.strip() and not CampaignSubmission.clean_custom_slug(custom_slug):
+            return Response(
+                {'error': 'Custom slug needs at least 3 letters or numbers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        try:
-            # If contact_id not provided, search by phone
-            if not contact_id and phone:
-                formatted_phone = phone if phone.startswith('+') else f"+{phone}"
-                logger.info(f"Searching for contact by phone: {formatted_phone}")
-                
-                search_url = f"{settings.GHL_API_BASE_URL}/contacts/"
-                search_params = {
-                    "phone": formatted_phone,
-                    "locationId": location_id
-                }
-                search_response = requests.get(search_url, params=search_params, headers=headers, timeout=30)
-                
-                if search_response.status_code == 200:
-                    search_data = search_response.json()
-                    contacts = search_data.get('contacts', [])
-                    if contacts:
-                        contact_id = contacts[0].get('id')
-                        logger.info(f"Found contact by phone: {contact_id}")
-                    else:
-                        logger.warning(f"No contact found for phone: {formatted_phone}")
-                        return False
-                else:
-                    logger.error(f"Failed to search for contact: {search_response.status_code} - {search_response.text}")
-                    return False
-            
-            if not contact_id:
-                logger.error("Contact ID not found for OTP verification")
-                return False
-            
-            # Get contact details to check app_otp custom field
-            get_url = f"{settings.GHL_API_BASE_URL}/contacts/{contact_id}"
-            logger.info(f"Getting contact details: {get_url}")
-            
-            get_response = requests.get(get_url, headers=headers, timeout=30)
-            
-            if get_response.status_code == 200:
-                contact_data = get_response.json()
-                contact = contact_data.get('contact', contact_data)
-                
-                # Check custom fields for app_otp
-                # GHL returns custom fields in different formats
-                custom_fields = contact.get('customField', {})
-                custom_fields_array = contact.get('customFields', [])
-                
-                # Try to get OTP value from custom fields
-                app_otp = None
-                
-                # Method 1: Check customField object (field ID as key)
-                if isinstance(custom_fields, dict):
-                    app_otp = custom_fields.get(otp_field_id)
-                    if not app_otp:
-                        app_otp = custom_fields.get('app_otp')
-                
-                # Method 2: Check customFields array
-                if not app_otp and isinstance(custom_fields_array, list):
-                    for field in custom_fields_array:
-                        if isinstance(field, dict):
-                            field_id = field.get('id')
-                            field_name = field.get('name')
-                            field_value = field.get('value') or field.get('field_value')
-                            
-                            if field_id == otp_field_id or field_name == 'app_otp':
-                                app_otp = field_value
-                                break
-                
-                logger.info(f"Retrieved OTP from contact: {app_otp} (expected: {code})")
-                
-                # Verify OTP (check stored OTP OR backup code)
-                is_backup_code = str(code).strip() == str(settings.BACKUP_OTP_CODE).strip()
-                
-                if (app_otp and str(app_otp).strip() == str(code).strip()) or is_backup_code:
-                    logger.info(f"✓ OTP verified successfully for contact {contact_id} (Backup code: {is_backup_code})")
-                    return {'verified': True, 'contact_id': contact_id}
-                else:
-                    logger.warning(f"✗ OTP mismatch. Stored: {app_otp}, Provided: {code}")
-                    return False
-            else:
-                logger.error(f"✗ Failed to get contact: {get_response.status_code} - {get_response.text[:500]}")
-                return False
-                
-        except requests.exceptions.RequestException as e:
-            logger.error(f"✗ GHL API request failed for OTP verification: {str(e)}")
-            logger.exception("Full exception traceback:")
-            return False
-        except Exception as e:
-            logger.error(f"✗ Unexpected error verifying OTP: {str(e)}")
-            logger.exception("Full exception traceback:")
-            return False
+        slug = CampaignSubmission(
+            first_name=request.query_params.get('first_name', ''),
+            last_name=request.query_params.get('last_name', ''),
+            custom_slug=custom_slug,
+        ).base_slug()
+        available, suggestions = slug_index.check(slug)
+        return Response({'slug': slug, 'available': available, 'suggestions': suggestions})
+
 
 class PillarDescriptionsView(APIView):
     def get(self, request):
@@ -1954,7 +1837,11 @@ class PillarDescriptionsView(APIView):
         descriptions_dict = {pillar.pillar_name: pillar.default_description for pillar in pillars}
         return Response(descriptions_dict, status=status.HTTP_200_OK)
 
-class ShareCampaignView(APIView):
+class ShareCampaignView(RateLimitHeadersMixin, APIView):
+    throttle_classes = RATE_LIMIT_THROTTLES
+    throttle_scope = 'share'
+    
+    @ghl_lane(LANE_BULK)
     def post(self, request):
         """
         Share campaign via SMS or Email using GHL
@@ -1963,22 +1850,16 @@ class ShareCampaignView(APIView):
         email = request.data.get('email')
         message = request.data.get('message')
         
-        if not message:
-            return Response({'error': 'Message content is required'}, status=status.HTTP_400_BAD_REQUEST)
-            
-        if not phone and not email:
-            return Response({'error': 'Phone number or email is required'}, status=status.HTTP_400_BAD_REQUEST)
-            
-        # Get location settings
+        error = self.validate_share(phone, email, message)
+        if error:
+            return error
+        
         location_id = settings.GHL_OTP_LOCATION_ID
         api_token = settings.GHL_LOCATION_API_TOKEN
         
-        if not location_id or not api_token:
-            logger.error("GHL location ID or API token not configured")
-            # For debugging, log what is missing
-            if not location_id: logger.error("Missing GHL_OTP_LOCATION_ID")
-            if not api_token: logger.error("Missing GHL_LOCATION_API_TOKEN")
-            return Response({'error': 'Server configuration error'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        unavailable = ghl_unavailable_response(FAMILY_CONTACTS, FAMILY_CONVERSATIONS)
+        if unavailable:
+            return unavailable
             
         # Upsert contact
         contact_id = self.upsert_contact(phone, email, message, location_id, api_token)
@@ -1994,32 +1875,46 @@ class ShareCampaignView(APIView):
             subject = request.data.get('subject')
             success = self.send_email(contact_id, email, message, api_token, subject)
             
+        return self.share_response(contact_id, success)
+    
+    def validate_share(self, phone, email, message):
+        """Return an error response for an invalid request or missing GHL configuration, else None"""
+        if not message:
+            return Response({'error': 'Message content is required'}, status=status.HTTP_400_BAD_REQUEST)
+            
+        if not phone and not email:
+            return Response({'error': 'Phone number or email is required'}, status=status.HTTP_400_BAD_REQUEST)
+            
+        # Get location settings
+        location_id = settings.GHL_OTP_LOCATION_ID
+        api_token = settings.GHL_LOCATION_API_TOKEN
+        
+        if not location_id or not api_token:
+            logger.error("GHL location ID or API token not configured")
+            # For debugging, log what is missing
+            if not location_id: logger.error("Missing GHL_OTP_LOCATION_ID")
+            if not api_token: logger.error("Missing GHL_LOCATION_API_TOKEN")
+            return Response({'error': 'Server configuration error'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return None
+    
+    def share_response(self, contact_id, success):
         if success:
             return Response({'message': 'Shared successfully', 'contact_id': contact_id}, status=status.HTTP_200_OK)
         else:
             return Response({'error': 'Failed to send message'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def upsert_contact(self, phone, email, message, location_id, api_token):
+    def contact_payload(self, phone, email, message):
         """
-        Create or update contact in GHL with necessary tags and custom fields
+        Contact fields for the share upsert: trial_lead tag, phone/email and the custom message
         """
-        headers = {
-            'Authorization': f'Bearer {api_token}',
-            'Content-Type': 'application/json',
-            'Version': '2021-07-28',
-            'Accept': 'application/json'
-        }
-        
-        # Prepare payload - DON'T include locationId in initial payload
-        # GHL PUT (update) rejects locationId, only POST (create) needs it
+        # DON'T include locationId here - GHL PUT (update) rejects it, only POST (create) needs it
         payload = {
             "tags": ["trial_lead"],
             "customFields": []
         }
         
         if phone:
-            formatted_phone = phone if phone.startswith('+') else f"+{phone}"
-            payload["phone"] = formatted_phone
+            payload["phone"] = normalize_phone(phone)
             
         if email:
             payload["email"] = email
@@ -2030,14 +1925,41 @@ class ShareCampaignView(APIView):
                 "id": settings.GHL_CUSTOM_MESSAGE_FIELD_ID,
                 "value": message
             })
+        return payload
+    
+    def contact_search_query(self, phone, email):
+        if phone:
+            return normalize_phone(phone)
+        return email or None
+    
+    def sms_payload(self, contact_id, phone, message):
+        return {
+            "type": "SMS",
+            "contactId": contact_id,
+            "toNumber": normalize_phone(phone),
+            "message": message,
+            "status": "pending"
+        }
+    
+    def email_payload(self, contact_id, email, message, subject=None):
+        return {
+            "type": "Email",
+            "contactId": contact_id,
+            "to": email,
+            "html": message.replace('\n', '<br>'),
+            "subject": subject or "Check out my campaign site",
+            "status": "pending"
+        }
+    
+    def upsert_contact(self, phone, email, message, location_id, api_token):
+        """
+        Create or update contact in GHL with necessary tags and custom fields
+        """
+        headers = ghl_headers(api_token)
+        payload = self.contact_payload(phone, email, message)
         
         # Determine search query
-        search_query = None
-        if phone:
-            search_query = phone if phone.startswith('+') else f"+{phone}"
-        elif email:
-            search_query = email
-
+        search_query = self.contact_search_query(phone, email)
         if not search_query:
             return None
 
@@ -2052,7 +1974,7 @@ class ShareCampaignView(APIView):
         try:
             # Search
             logger.info(f"Searching for contact: {search_query}")
-            response = requests.get(search_url, headers=headers, params=params, timeout=10)
+            response = ghl.get(search_url, headers=headers, params=params, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 contacts = data.get('contacts', [])
@@ -2065,13 +1987,13 @@ class ShareCampaignView(APIView):
                 # Update existing
                 url = f"{settings.GHL_API_BASE_URL}/contacts/{contact_id}"
                 logger.info(f"Updating contact {contact_id}")
-                response = requests.put(url, json=payload, headers=headers, timeout=10)
+                response = ghl.put(url, json=payload, headers=headers, timeout=10)
             else:
                 # Create new - Add locationId to payload for creation
                 payload["locationId"] = location_id
                 url = f"{settings.GHL_API_BASE_URL}/contacts/"
                 logger.info(f"Creating new contact")
-                response = requests.post(url, json=payload, headers=headers, timeout=10)
+                response = ghl.post(url, json=payload, headers=headers, timeout=10)
                 
             if response.status_code in [200, 201]:
                 data = response.json()
@@ -2086,27 +2008,13 @@ class ShareCampaignView(APIView):
             return None
 
     def send_sms(self, contact_id, phone, message, api_token):
-        headers = {
-            'Authorization': f'Bearer {api_token}',
-            'Content-Type': 'application/json',
-            'Version': '2021-04-15',
-            'Accept': 'application/json'
-        }
-        
-        formatted_phone = phone if phone.startswith('+') else f"+{phone}"
-        
-        payload = {
-            "type": "SMS",
-            "contactId": contact_id,
-            "toNumber": formatted_phone,
-            "message": message,
-            "status": "pending"
-        }
+        headers = ghl_headers(api_token, GHL_MESSAGES_API_VERSION)
+        payload = self.sms_payload(contact_id, phone, message)
         
         try:
             url = f"{settings.GHL_API_BASE_URL}/conversations/messages"
-            logger.info(f"Sending SMS to {formatted_phone}")
-            response = requests.post(url, json=payload, headers=headers, timeout=10)
+            logger.info(f"Sending SMS to {payload['toNumber']}")
+            response = ghl.post(url, json=payload, headers=headers, timeout=10)
             
             if response.status_code in [200, 201]:
                 logger.info(f"SMS shared successfully")
@@ -2119,26 +2027,13 @@ class ShareCampaignView(APIView):
             return False
 
     def send_email(self, contact_id, email, message, api_token, subject=None):
-        headers = {
-            'Authorization': f'Bearer {api_token}',
-            'Content-Type': 'application/json',
-            'Version': '2021-04-15',
-            'Accept': 'application/json'
-        }
-        
-        payload = {
-            "type": "Email",
-            "contactId": contact_id,
-            "to": email,
-            "html": message.replace('\n', '<br>'),
-            "subject": subject or "Check out my campaign site",
-            "status": "pending"
-        }
+        headers = ghl_headers(api_token, GHL_MESSAGES_API_VERSION)
+        payload = self.email_payload(contact_id, email, message, subject)
         
         try:
             url = f"{settings.GHL_API_BASE_URL}/conversations/messages"
             logger.info(f"Sending Email to {email}")
-            response = requests.post(url, json=payload, headers=headers, timeout=10)
+            response = ghl.post(url, json=payload, headers=headers, timeout=10)
             
             if response.status_code in [200, 201]:
                 logger.info(f"Email shared successfully")
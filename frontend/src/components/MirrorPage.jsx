@@ -2,23 +2,35 @@ import React, { useEffect, useState, useCallback } from 'react';
 import { useParams } from 'react-router-dom';
 import axios from 'axios';
 
+// Payload inlined by the server into prerendered pages (backend/onboarding/prerender.py)
+const readInlinedCampaign = (slug) => {
+    const el = document.getElementById('mirror-data');
+    if (!el) return null;
+    try {
+        const inlined = JSON.parse(el.textContent);
+        return inlined && inlined.slug === slug ? inlined : null;
+    } catch {
+        return null;
+    }
+};
+
 const MirrorPage = () => {
     const { slug, templateType } = useParams();
-    const [data, setData] = useState(null);
+    const [inlined] = useState(() => readInlinedCampaign(slug));
+    const [data, setData] = useState(inlined);
     const [error, setError] = useState(false);
     const [requiresPassword, setRequiresPassword] = useState(false);
     const [password, setPassword] = useState('');
     const [passwordError, setPasswordError] = useState('');
-    const [loading, setLoading] = useState(true);
+    const [loading, setLoading] = useState(!inlined);
 
-    // Get stored password from localStorage
-    const getStoredPassword = () => {
-        return localStorage.getItem(`campaign_password_${slug}`) || '';
+    // Access token issued by the server after a correct password (short-lived, signed)
+    const getStoredToken = () => {
+        return localStorage.getItem(`campaign_token_${slug}`) || '';
     };
 
-    // Store password in localStorage
-    const storePassword = (pwd) => {
-        localStorage.setItem(`campaign_password_${slug}`, pwd);
+    const storeToken = (token) => {
+        localStorage.setItem(`campaign_token_${slug}`, token);
     };
 
     // Load campaign data
@@ -27,16 +39,17 @@ const MirrorPage = () => {
         setPasswordError('');
 
         try {
-            const storedPwd = pwd || getStoredPassword();
-            const url = storedPwd
-                ? `/api/mirror/${slug}/?password=${encodeURIComponent(storedPwd)}`
-                : `/api/mirror/${slug}/`;
-
-            const res = await axios.get(url);
+            // The password is only ever sent in a POST body; later visits present the token
+            const storedToken = getStoredToken();
+            const res = pwd
+                ? await axios.post(`/api/mirror/${slug}/`, { password: pwd })
+                : await axios.get(`/api/mirror/${slug}/`, {
+                    headers: storedToken ? { 'X-Mirror-Token': storedToken } : {},
+                });
             setData(res.data);
             setRequiresPassword(false);
-            if (storedPwd) {
-                storePassword(storedPwd);
+            if (res.headers['x-mirror-token']) {
+                storeToken(res.headers['x-mirror-token']);
             }
             setError(false);
         } catch (err) {
@@ -44,9 +57,10 @@ const MirrorPage = () => {
                 // Password required or incorrect
                 setRequiresPassword(true);
                 setError(false);
-                // Clear stored password if it was incorrect
+                // Drop an expired or revoked token, and any password saved by older builds
+                localStorage.removeItem(`campaign_token_${slug}`);
+                localStorage.removeItem(`campaign_password_${slug}`);
                 if (err.response.data.error === 'Incorrect password') {
-                    localStorage.removeItem(`campaign_password_${slug}`);
                     setPasswordError('Incorrect password. Please try again.');
                 } else {
                     setPasswordError('');
@@ -64,9 +78,11 @@ const MirrorPage = () => {
     }, [slug]);
 
     useEffect(() => {
-        // Try to load with stored password first
+        // Prerendered pages already carry the campaign, no request needed
+        if (inlined && inlined.slug === slug) return;
+        // Try to load with the stored access token first
         loadCampaign();
-    }, [slug, loadCampaign]);
+    }, [slug, inlined, loadCampaign]);
 
     const handlePasswordSubmit = async (e) => {
         e.preventDefault();
@@ -264,7 +280,7 @@ const MirrorPage = () => {
                 </nav>
 
                 <header id="about" className="hero-modern text-white position-relative" style={{
-                    backgroundImage: data.background_picture ? `url(${data.background_picture})` : 'none',
+                    backgroundImage: data.background_picture ? `url(${data.image_renditions?.background_picture?.src || data.background_picture})` : 'none',
                     backgroundSize: 'cover',
                     backgroundPosition: 'center',
                     backgroundRepeat: 'no-repeat',
@@ -322,7 +338,9 @@ const MirrorPage = () => {
                             <div className="col-lg-5 offset-lg-1 text-center">
                                 {data.headshot && (
                                     <img
-                                        src={data.headshot}
+                                        src={data.image_renditions?.headshot?.src || data.headshot}
+                                        srcSet={data.image_renditions?.headshot?.srcset}
+                                        sizes="(max-width: 992px) 90vw, 40vw"
                                         alt={data.first_name}
                                         className="img-fluid rounded-4 shadow-lg"
                                     />
@@ -340,9 +358,9 @@ const MirrorPage = () => {
                         </div>
                         <div className="row g-4">
                             {[
-                                { title: data.pillar_1, desc: data.pillar_1_desc, img: data.action_shot_1 },
-                                { title: data.pillar_2, desc: data.pillar_2_desc, img: data.action_shot_2 },
-                                { title: data.pillar_3, desc: data.pillar_3_desc, img: data.action_shot_3 },
+                                { title: data.pillar_1, desc: data.pillar_1_desc, img: data.image_renditions?.action_shot_1?.src || data.action_shot_1 },
+                                { title: data.pillar_2, desc: data.pillar_2_desc, img: data.image_renditions?.action_shot_2?.src || data.action_shot_2 },
+                                { title: data.pillar_3, desc: data.pillar_3_desc, img: data.image_renditions?.action_shot_3?.src || data.action_shot_3 },
                             ].filter(p => p.title).map((pillar, idx) => (
                                 <div key={idx} className="col-md-4">
                                     <div className="card card-modern h-100" style={{ border: '2px solid var(--secondary)' }}>
@@ -554,7 +572,9 @@ const MirrorPage = () => {
                                     {data.headshot && (
                                         <div className="bg-white p-4 shadow-sm mx-auto" style={{ border: '3px solid var(--primary)', maxWidth: '300px' }}>
                                             <img
-                                                src={data.headshot}
+                                                src={data.image_renditions?.headshot?.src || data.headshot}
+                                                srcSet={data.image_renditions?.headshot?.srcset}
+                                                sizes="(max-width: 992px) 90vw, 40vw"
                                                 alt={data.first_name}
                                                 className="img-fluid"
                                             />
@@ -660,9 +680,9 @@ const MirrorPage = () => {
                         </div>
                         <div className="row">
                             {[
-                                { title: data.pillar_1, desc: data.pillar_1_desc, img: data.action_shot_1 },
-                                { title: data.pillar_2, desc: data.pillar_2_desc, img: data.action_shot_2 },
-                                { title: data.pillar_3, desc: data.pillar_3_desc, img: data.action_shot_3 },
+                                { title: data.pillar_1, desc: data.pillar_1_desc, img: data.image_renditions?.action_shot_1?.src || data.action_shot_1 },
+                                { title: data.pillar_2, desc: data.pillar_2_desc, img: data.image_renditions?.action_shot_2?.src || data.action_shot_2 },
+                                { title: data.pillar_3, desc: data.pillar_3_desc, img: data.image_renditions?.action_shot_3?.src || data.action_shot_3 },
                             ].filter(p => p.title).map((pillar, idx) => (
                                 <div key={idx} className="col-md-4 mb-4">
                                     <div className="card card-traditional h-100">
@@ -692,7 +712,7 @@ const MirrorPage = () => {
 
                 <footer className="bg-primary-traditional text-white py-5 position-relative" style={{
                     borderTop: `4px solid var(--secondary)`,
-                    backgroundImage: data.background_picture ? `url(${data.background_picture})` : 'none',
+                    backgroundImage: data.background_picture ? `url(${data.image_renditions?.background_picture?.src || data.background_picture})` : 'none',
                     backgroundSize: 'cover',
                     backgroundPosition: 'center',
                     backgroundRepeat: 'no-repeat'
@@ -910,7 +930,9 @@ const MirrorPage = () => {
                                 {data.headshot && (
                                     <div className="p-4" style={{ border: '6px solid var(--secondary)', boxShadow: '15px 15px 0 rgba(0, 0, 0, 0.4)', background: 'transparent' }}>
                                         <img
-                                            src={data.headshot}
+                                            src={data.image_renditions?.headshot?.src || data.headshot}
+                                            srcSet={data.image_renditions?.headshot?.srcset}
+                                            sizes="(max-width: 992px) 90vw, 40vw"
                                             alt={data.first_name}
                                             className="img-fluid"
                                         />
@@ -924,7 +946,7 @@ const MirrorPage = () => {
                 <section id="platform" className="py-5 bg-primary-bold text-white position-relative" style={{
                     borderTop: '8px solid var(--secondary)',
                     borderBottom: '8px solid var(--secondary)',
-                    backgroundImage: data.background_picture ? `url(${data.background_picture})` : 'none',
+                    backgroundImage: data.background_picture ? `url(${data.image_renditions?.background_picture?.src || data.background_picture})` : 'none',
                     backgroundSize: 'cover',
                     backgroundPosition: 'center',
                     backgroundRepeat: 'no-repeat'
@@ -949,9 +971,9 @@ const MirrorPage = () => {
                         </div>
                         <div className="row g-0">
                             {[
-                                { title: data.pillar_1, desc: data.pillar_1_desc, img: data.action_shot_1 },
-                                { title: data.pillar_2, desc: data.pillar_2_desc, img: data.action_shot_2 },
-                                { title: data.pillar_3, desc: data.pillar_3_desc, img: data.action_shot_3 },
+                                { title: data.pillar_1, desc: data.pillar_1_desc, img: data.image_renditions?.action_shot_1?.src || data.action_shot_1 },
+                                { title: data.pillar_2, desc: data.pillar_2_desc, img: data.image_renditions?.action_shot_2?.src || data.action_shot_2 },
+                                { title: data.pillar_3, desc: data.pillar_3_desc, img: data.image_renditions?.action_shot_3?.src || data.action_shot_3 },
                             ].filter(p => p.title).map((pillar, idx) => {
                                 const isEven = idx % 2 === 1;
                                 return (
@@ -106,6 +106,7 @@ const Wizard = () => {
     const [customSlugManuallyEdited, setCustomSlugManuallyEdited] = useState(savedData.customSlugManuallyEdited);
     const [electionDateError, setElectionDateError] = useState('');
     const [customSlugError, setCustomSlugError] = useState('');
+    const [slugAvailability, setSlugAvailability] = useState(null);
     const [customPillarMode, setCustomPillarMode] = useState(savedData.customPillarMode);
     const [hoveredTemplate, setHoveredTemplate] = useState(null);
 
@@ -233,6 +234,36 @@ const Wizard = () => {
         }
     }, [formData.first_name, formData.last_name, customSlugManuallyEdited]);
 
+    // Check custom_slug availability as the user types (debounced)
+    useEffect(() => {
+        const slug = formData.custom_slug;
+        if (step !== 5 || !slug || slug.length < 3) {
+            setSlugAvailability(null);
+            return;
+        }
+        let cancelled = false;
+        const timer = setTimeout(() => {
+            axios.get('/api/slugs/check/', { params: { custom_slug: slug } })
+                .then(res => {
+                    // Keep the typed slug: the response carries the cleaned one
+                    if (!cancelled) setSlugAvailability({ ...res.data, query: slug });
+                })
+                .catch(() => {
+                    if (!cancelled) setSlugAvailability(null);
+                });
+        }, 300);
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [formData.custom_slug, step]);
+
+    const pickSuggestedSlug = (slug) => {
+        setCustomSlugManuallyEdited(true);
+        setCustomSlugError('');
+        setFormData(prev => ({ ...prev, custom_slug: slug }));
+    };
+
     const handleChange = (e) => {
         const { name, value, type, checked } = e.target;
         let processedValue = value;
@@ -526,6 +557,8 @@ const Wizard = () => {
                                 formData={formData}
                                 handleChange={handleChange}
                                 customSlugError={customSlugError}
+                                slugAvailability={slugAvailability}
+                                pickSuggestedSlug={pickSuggestedSlug}
                                 hoveredTemplate={hoveredTemplate}
                                 setHoveredTemplate={setHoveredTemplate}
                                 setFormData={setFormData}
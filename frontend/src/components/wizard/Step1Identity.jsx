@@ -119,7 +119,13 @@ const Step1Identity = ({ formData, handleChange, otpSent, setOtpSent, showAlert,
                 setFormData(prev => ({ ...prev, ghl_contact_id: res.data.contact_id }));
             }
             setOtpSent(true);
-            showAlert('OTP Sent', 'success');
+            if (res.data.request_id) {
+                // SMS is sent in the background; follow its progress without blocking the form
+                showAlert('Sending OTP...', 'info');
+                pollOtpStatus(res.data.request_id);
+            } else {
+                showAlert('OTP Sent', 'success');
+            }
         } catch (error) {
             showAlert('Failed to send OTP. Please try again.', 'danger');
         } finally {
@@ -127,6 +133,28 @@ const Step1Identity = ({ formData, handleChange, otpSent, setOtpSent, showAlert,
         }
     };
 
+    const pollOtpStatus = async (requestId, attempt = 0) => {
+        if (attempt >= 10) return;
+        await new Promise(resolve => setTimeout(resolve, 1500));
+        try {
+            const res = await axios.get(`/api/otp/status/${encodeURIComponent(requestId)}/`);
+            if (res.data.status === 'sent') {
+                if (res.data.contact_id) {
+                    setFormData(prev => ({ ...prev, ghl_contact_id: res.data.contact_id }));
+                }
+                showAlert('OTP Sent', 'success');
+                return;
+            }
+            if (res.data.status === 'failed') {
+                showAlert('Failed to send OTP. Please try again.', 'danger');
+                return;
+            }
+        } catch (error) {
+            // Transient error - keep polling
+        }
+        pollOtpStatus(requestId, attempt + 1);
+    };
+
     const verifyOtp = async () => {
         try {
             // Combine country code and phone number for verification
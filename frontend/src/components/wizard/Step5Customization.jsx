@@ -5,6 +5,8 @@ const Step5Customization = ({
     formData,
     handleChange,
     customSlugError,
+    slugAvailability,
+    pickSuggestedSlug,
     hoveredTemplate,
     setHoveredTemplate,
     setFormData,
@@ -249,6 +251,25 @@ const Step5Customization = ({
             {customSlugError && (
                 <div className="text-danger small mb-2">{customSlugError}</div>
             )}
+            {!customSlugError && slugAvailability?.query === formData.custom_slug && (
+                slugAvailability.available ? (
+                    <div className="text-success small mb-2">This URL is available</div>
+                ) : (
+                    <div className="small mb-2" style={{ color: '#4a5568' }}>
+                        This URL is taken. Try:{' '}
+                        {slugAvailability.suggestions.map(suggestion => (
+                            <button
+                                key={suggestion}
+                                type="button"
+                                className="btn btn-link btn-sm p-0 me-2 align-baseline"
+                                onClick={() => pickSuggestedSlug(suggestion)}
+                            >
+                                {suggestion}
+                            </button>
+                        ))}
+                    </div>
+                )
+            )}
             <small className="text-muted mb-3 d-block">
                 Your site will be at: {window.location.origin}/temp/{formData.custom_slug || 'yourname'}
             </small>